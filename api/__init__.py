@@ -0,0 +1,6 @@
+"""
+Response pipeline dùng chung cho API
+- renderers.py: FastJSONRenderer (orjson nếu có cài, output giống JSONRenderer của DRF)
+- compression.py: CompressionMiddleware (brotli / gzip theo Accept-Encoding, cả response stream)
+- streaming.py: StreamingListMixin (list lớn được serialize + gửi theo lô thay vì dựng cả body)
+"""
@@ -0,0 +1,74 @@
+"""
+CompressionMiddleware - Nén response theo Accept-Encoding
+- Client nhận br (và có cài package brotli) -> brotli cho JSON / NDJSON / CSV
+- Còn lại -> gzip (GZipMiddleware của Django, có chống BREACH bằng byte ngẫu nhiên)
+- Response stream được nén theo từng chunk (client nhận dần, không đợi cả body)
+- Bỏ qua response quá nhỏ hoặc đã có Content-Encoding (vd: snapshot catalog nén sẵn)
+
+Đặt ngay sau SecurityMiddleware để nén body cuối cùng.
+"""
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # brotli là dependency tùy chọn
+    brotli = None
+
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+# Không đáng nén body nhỏ hơn ngưỡng này (giống GZipMiddleware)
+MIN_SIZE = 200
+# Quality 4-5: gần tỉ lệ nén gzip -9 với tốc độ nhanh hơn (quality 11 chỉ dùng cho file dựng sẵn)
+BROTLI_QUALITY = 5
+# HTML (admin) có thể chứa CSRF token -> chỉ nén gzip có chống BREACH
+BROTLI_CONTENT_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+
+def compress_sequence(sequence):
+    """Nén brotli từng chunk, flush sau mỗi chunk để client nhận được ngay"""
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+
+    def process_response(self, request, response):
+        if not self.use_brotli(request, response):
+            return super().process_response(request, response)
+
+        if not response.streaming and len(response.content) < MIN_SIZE:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            response.streaming_content = compress_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed_content = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+    def use_brotli(self, request, response):
+        if brotli is None or (response.streaming and response.is_async):
+            return False
+        if not re_accepts_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return False
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        return content_type in BROTLI_CONTENT_TYPES
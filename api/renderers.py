@@ -0,0 +1,47 @@
+"""
+Renderer JSON nhanh cho DRF
+- Có cài orjson -> serialize bằng orjson (nhanh hơn json + JSONEncoder của DRF nhiều lần)
+- Output giống JSONRenderer compact: UTF-8 không escape, \u2028 / \u2029 được escape
+- Kiểu orjson không tự xử lý (Decimal, lazy string, QuerySet...) -> JSONEncoder của DRF
+- Không cài orjson, có indent (browsable API, ?indent) hoặc cấu hình khác mặc định -> JSONRenderer của DRF
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson là dependency tùy chọn
+    orjson = None
+
+
+if orjson is not None:
+    # datetime / date / time đi qua JSONEncoder của DRF -> cùng định dạng (mili giây, 'Z' cho UTC)
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_drf_encoder = JSONEncoder()
+
+
+def _default(obj):
+    return _drf_encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer dùng orjson khi có thể"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.encoder_class is not JSONEncoder
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # Số nguyên ngoài phạm vi 64 bit, key không hỗ trợ... -> đường chậm
+            return super().render(data, accepted_media_type, renderer_context)
+        # Giống DRF: \u2028 / \u2029 hợp lệ trong JSON nhưng không hợp lệ trong JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,106 @@
+"""
+StreamingListMixin - list() trả về StreamingHttpResponse cho payload lớn
+- Envelope phân trang ("count" / "next" / "previous") được render trước,
+  "results" được serialize + render theo lô stream_chunk_size bản ghi rồi gửi ngay
+- PageNumberPagination: trang được đọc bằng queryset.iterator(chunk_size) -> prefetch_related chạy theo lô,
+  bộ nhớ chỉ giữ 1 lô object + 1 lô JSON
+- CursorPagination (keyset): trang cần được đọc trước để tính cursor, phần serialize / render vẫn theo lô
+- Body giống hệt Response thường; chỉ stream khi renderer là JSON không indent
+  (browsable API, ?format=api -> list() của DRF)
+"""
+from itertools import islice
+
+from django.core.paginator import InvalidPage
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+
+
+class StreamingListMixin:
+    """Mixin cho ViewSet có list() trả về nhiều object lớn (serializer lồng nhau, text dài)"""
+    stream_chunk_size = 20
+
+    def should_stream(self, request):
+        renderer = getattr(request, 'accepted_renderer', None)
+        if not isinstance(renderer, JSONRenderer):
+            return False
+        return renderer.get_indent(request.accepted_media_type, self.get_renderer_context()) is None
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        envelope = None
+        if self.paginator is not None:
+            objects = self.paginate_queryset_lazily(queryset)
+            if objects is not None:
+                # Envelope với results rỗng -> các key còn lại giữ nguyên thứ tự, results luôn ở cuối
+                envelope = self.paginator.get_paginated_response([]).data
+                envelope.pop('results', None)
+            else:
+                objects = queryset
+        else:
+            objects = queryset
+
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        return StreamingHttpResponse(
+            self.stream_results(envelope, objects, renderer, request.accepted_media_type),
+            content_type=content_type,
+        )
+
+    def paginate_queryset_lazily(self, queryset):
+        """
+        Như paginate_queryset nhưng không đọc trang vào bộ nhớ với PageNumberPagination
+        (trả về queryset đã cắt; paginator vẫn có .page / .request cho get_paginated_response)
+        """
+        paginator = self.paginator
+        if not isinstance(paginator, PageNumberPagination):
+            return paginator.paginate_queryset(queryset, self.request, view=self)
+
+        page_size = paginator.get_page_size(self.request)
+        if not page_size:
+            return None
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        page_number = paginator.get_page_number(self.request, django_paginator)
+        try:
+            paginator.page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = paginator.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        paginator.request = self.request
+        return paginator.page.object_list
+
+    def iter_chunks(self, objects):
+        if isinstance(objects, list):
+            for start in range(0, len(objects), self.stream_chunk_size):
+                yield objects[start:start + self.stream_chunk_size]
+            return
+        iterator = objects.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            chunk = list(islice(iterator, self.stream_chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def stream_results(self, envelope, objects, renderer, accepted_media_type):
+        renderer_context = self.get_renderer_context()
+        if envelope is None:
+            head, tail = b'[', b']'
+        else:
+            rendered = renderer.render(envelope, accepted_media_type, renderer_context)
+            head, tail = rendered[:-1] + (b',' if envelope else b'') + b'"results":[', b']}'
+
+        yield head
+        separator = b''
+        for chunk in self.iter_chunks(objects):
+            data = self.get_serializer(chunk, many=True).data
+            yield separator + b','.join(
+                renderer.render(item, accepted_media_type, renderer_context) for item in data
+            )
+            separator = b','
+        yield tail
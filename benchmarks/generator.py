@@ -0,0 +1,386 @@
+"""
+Sinh dữ liệu giả lập (synthetic curriculum) cho benchmark
+- Dữ liệu có seed -> chạy lại cho ra cùng một bộ dữ liệu
+- Ghi bằng bulk_create theo từng bảng (không phát signals)
+- Tương thích MySQL (custom_db không trả id sau bulk insert): id được đọc lại theo khóa tự nhiên
+- Mọi bản ghi được đánh dấu bằng tiền tố 'bench' để có thể xóa sạch (--reset)
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from classes.models import Class, ClassTeacher, ClassEnrollment
+from content.models import (
+    Program, Subcourse, Lesson, UserProgress,
+    Media, LessonObjective, LessonModel, Preparation,
+    BuildBlock, PreparationBuildBlock, LessonContentBlock, LessonAttachment,
+    Challenge, AssemblyGuide, Quiz, QuizQuestion, QuestionOption,
+)
+from content import catalog_cache, progress_summary, search_index
+from user_auth import entitlements
+from user_auth.models import UserProfile, AuthAssignment
+
+
+SLUG_PREFIX = 'bench'
+USERNAME_PREFIX = 'bench_'
+CLASS_CODE_PREFIX = 'BENCH-'
+PASSWORD = 'bench-password'
+BATCH_SIZE = 1000
+# Kịch bản quiz_submit nộp lặp lại cùng quiz -> không để giới hạn số lần làm chặn benchmark
+QUIZ_MAX_ATTEMPTS = 1000000
+
+WORDS = [
+    'robot', 'động cơ', 'cảm biến', 'màu sắc', 'khoảng cách', 'bánh xe', 'vòng lặp',
+    'điều kiện', 'biến', 'hàm', 'âm thanh', 'ánh sáng', 'lực', 'tốc độ', 'góc quay',
+]
+
+
+def _bulk_create(model, objects, key_fields):
+    """
+    bulk_create rồi gán lại pk (MySQL không trả id)
+    key_fields: các attname xác định duy nhất 1 dòng trong bộ dữ liệu sinh ra
+    """
+    for start in range(0, len(objects), BATCH_SIZE):
+        model.objects.bulk_create(objects[start:start + BATCH_SIZE])
+
+    missing = [obj for obj in objects if obj.pk is None]
+    if not missing:
+        return objects
+
+    first = key_fields[0]
+    values = {getattr(obj, first) for obj in missing}
+    ids = {}
+    value_list = list(values)
+    for start in range(0, len(value_list), BATCH_SIZE):
+        rows = model.objects.filter(
+            **{f'{first}__in': value_list[start:start + BATCH_SIZE]}
+        ).values_list('id', *key_fields)
+        for row in rows:
+            ids[tuple(row[1:])] = row[0]
+    for obj in missing:
+        obj.pk = ids[tuple(getattr(obj, field) for field in key_fields)]
+    return objects
+
+
+class CurriculumGenerator:
+    """
+    Sinh chương trình học + học viên + lớp + tiến độ với số lượng cấu hình được
+    Mặc định: 2 programs × 20 subcourses × 15 lessons (nội dung lồng nhau đầy đủ),
+    2000 học viên, mỗi subcourse 1 lớp
+    """
+
+    def __init__(self, seed=42, programs=2, subcourses=20, lessons=15, students=2000,
+                 students_per_class=40, questions=5, progress_ratio=0.5, stdout=None):
+        self.random = random.Random(seed)
+        self.programs = programs
+        self.subcourses = subcourses
+        self.lessons = lessons
+        self.students = students
+        self.students_per_class = students_per_class
+        self.questions = questions
+        self.progress_ratio = progress_ratio
+        self.stdout = stdout
+        self.counts = {}
+
+    def log(self, message):
+        if self.stdout:
+            self.stdout.write(message)
+
+    def _text(self, words=8):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def _count(self, name, objects):
+        self.counts[name] = self.counts.get(name, 0) + len(objects)
+
+    @staticmethod
+    def reset():
+        """Xóa toàn bộ dữ liệu benchmark (cascade qua Program và User)"""
+        Program.objects.filter(slug__startswith=f'{SLUG_PREFIX}-').delete()
+        Media.objects.filter(url__contains=f'/{SLUG_PREFIX}/').delete()
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    @transaction.atomic
+    def generate(self):
+        lessons = self._generate_catalog()
+        self._generate_lesson_content(lessons)
+        self._generate_people_and_progress(lessons)
+
+        # Dữ liệu ghi bằng bulk_create không đi qua signals -> làm mới các bảng/cache dẫn xuất
+        subcourse_ids = list({lesson.subcourse_id for lesson in lessons})
+        transaction.on_commit(lambda: progress_summary.rebuild_summaries(subcourse_ids))
+        transaction.on_commit(lambda: search_index.rebuild_index([lesson.id for lesson in lessons]))
+        transaction.on_commit(entitlements.invalidate_all)
+        transaction.on_commit(catalog_cache.bump_version)
+        return self.counts
+
+    # ------------------------------------------------------------------
+    # Catalog: Program -> Subcourse -> Lesson
+    # ------------------------------------------------------------------
+
+    def _generate_catalog(self):
+        programs = _bulk_create(Program, [
+            Program(
+                title=f'Benchmark Program {p + 1}',
+                slug=f'{SLUG_PREFIX}-p{p + 1}',
+                description=self._text(30),
+                kit_type=self.random.choice(['SPIKE_ESSENTIAL', 'SPIKE_PRIME']),
+                status='PUBLISHED',
+                sort_order=p + 1,
+            )
+            for p in range(self.programs)
+        ], ['slug'])
+        self._count('programs', programs)
+
+        subcourses = _bulk_create(Subcourse, [
+            Subcourse(
+                program=program,
+                title=f'{program.title} - Module {s + 1}',
+                slug=f'{program.slug}-s{s + 1}',
+                description=self._text(30),
+                objective=self._text(15),
+                coding_language=self.random.choice(['ICON_BLOCKS', 'WORD_BLOCKS', 'PYTHON']),
+                status='PUBLISHED',
+                sort_order=s + 1,
+                level_number=(s % 10) + 1,
+            )
+            for program in programs for s in range(self.subcourses)
+        ], ['program_id', 'slug'])
+        self._count('subcourses', subcourses)
+
+        lessons = _bulk_create(Lesson, [
+            Lesson(
+                subcourse=subcourse,
+                title=f'Bài {n + 1}: {self._text(4)}',
+                slug=f'{subcourse.slug}-l{n + 1}',
+                objective=self._text(20),
+                knowledge_skills=self._text(20),
+                content_text=self._text(200),
+                # ~10% bài học nháp để kiểm tra các bộ lọc PUBLISHED
+                status='DRAFT' if self.random.random() < 0.1 else 'PUBLISHED',
+                sort_order=n + 1,
+            )
+            for subcourse in subcourses for n in range(self.lessons)
+        ], ['subcourse_id', 'slug'])
+        self._count('lessons', lessons)
+        self.log(f'  catalog: {len(programs)} programs, {len(subcourses)} subcourses, {len(lessons)} lessons')
+        return lessons
+
+    # ------------------------------------------------------------------
+    # Nội dung lồng nhau của từng bài học
+    # ------------------------------------------------------------------
+
+    def _generate_lesson_content(self, lessons):
+        media = _bulk_create(Media, [
+            Media(
+                url=f'https://cdn.example.com/{SLUG_PREFIX}/media-{i}.png',
+                media_type='image',
+                caption=self._text(3),
+                order=i,
+            )
+            for i in range(200)
+        ], ['url'])
+        self._count('media', media)
+
+        program_ids = sorted({lesson.subcourse.program_id for lesson in lessons})
+        build_blocks = _bulk_create(BuildBlock, [
+            BuildBlock(program_id=program_id, title=f'Khối {b + 1}', order=b)
+            for program_id in program_ids for b in range(20)
+        ], ['program_id', 'order'])
+        blocks_by_program = {}
+        for block in build_blocks:
+            blocks_by_program.setdefault(block.program_id, []).append(block)
+        self._count('build_blocks', build_blocks)
+
+        objectives = [
+            LessonObjective(lesson=lesson, objective_type=objective_type, text=self._text(10), order=0)
+            for lesson in lessons for objective_type in ('knowledge', 'thinking', 'skills')
+        ]
+        _bulk_create(LessonObjective, objectives, ['lesson_id', 'objective_type', 'order'])
+        self._count('objectives', objectives)
+
+        lesson_models = _bulk_create(LessonModel, [
+            LessonModel(lesson=lesson, title=f'Mô hình {m + 1}', description=self._text(15), order=m)
+            for lesson in lessons for m in range(2)
+        ], ['lesson_id', 'order'])
+        self._count('lesson_models', lesson_models)
+
+        content_blocks = _bulk_create(LessonContentBlock, [
+            LessonContentBlock(
+                lesson=lesson,
+                title=f'Nội dung {c + 1}',
+                content_type='text_media',
+                description=self._text(40),
+                example_text='motor.run_for_degrees(90)',
+                order=c,
+            )
+            for lesson in lessons for c in range(3)
+        ], ['lesson_id', 'order'])
+        self._count('content_blocks', content_blocks)
+
+        self._link_media(LessonModel, lesson_models, media, 'lessonmodel_id')
+        self._link_media(LessonContentBlock, content_blocks, media, 'lessoncontentblock_id')
+
+        assembly_guides = _bulk_create(AssemblyGuide, [
+            AssemblyGuide(
+                lesson=lesson,
+                title=f'Lắp ráp {g + 1}',
+                description=self._text(20),
+                pdf_url=f'https://cdn.example.com/{SLUG_PREFIX}/{lesson.slug}-guide-{g + 1}.pdf',
+            )
+            for lesson in lessons for g in range(2)
+        ], ['lesson_id', 'title'])
+        self._count('assembly_guides', assembly_guides)
+        self._link_media(AssemblyGuide, assembly_guides, media, 'assemblyguide_id')
+
+        attachments = [
+            LessonAttachment(
+                lesson=lesson,
+                file_url=f'https://cdn.example.com/{SLUG_PREFIX}/{lesson.slug}.pdf',
+                name='Tài liệu bài học',
+                file_type='document',
+                order=0,
+            )
+            for lesson in lessons
+        ]
+        LessonAttachment.objects.bulk_create(attachments, batch_size=BATCH_SIZE)
+        self._count('attachments', attachments)
+
+        challenges = [
+            Challenge(
+                lesson=lesson,
+                title=f'Thử thách {lesson.sort_order}',
+                instructions=self._text(30),
+                difficulty=self.random.choice(['easy', 'medium', 'hard']),
+                status='published',
+                order=0,
+            )
+            for lesson in lessons
+        ]
+        Challenge.objects.bulk_create(challenges, batch_size=BATCH_SIZE)
+        self._count('challenges', challenges)
+
+        preparations = _bulk_create(Preparation, [
+            Preparation(lesson=lesson) for lesson in lessons
+        ], ['lesson_id'])
+        preparation_blocks = []
+        for preparation, lesson in zip(preparations, lessons):
+            blocks = self.random.sample(blocks_by_program[lesson.subcourse.program_id], 3)
+            preparation_blocks.extend(
+                PreparationBuildBlock(preparation=preparation, build_block=block, quantity=self.random.randint(1, 4))
+                for block in blocks
+            )
+        PreparationBuildBlock.objects.bulk_create(preparation_blocks, batch_size=BATCH_SIZE)
+        self._count('preparation_build_blocks', preparation_blocks)
+
+        self._generate_quizzes(lessons)
+        self.log(f'  lesson content: {self.counts["content_blocks"]} content blocks, {self.counts["quiz_questions"]} quiz questions')
+
+    def _link_media(self, model, owners, media, owner_field):
+        through = model.media.through
+        links = []
+        for owner in owners:
+            for item in self.random.sample(media, 2):
+                links.append(through(**{owner_field: owner.pk, 'media_id': item.pk}))
+        through.objects.bulk_create(links, batch_size=BATCH_SIZE)
+
+    def _generate_quizzes(self, lessons):
+        quizzes = _bulk_create(Quiz, [
+            Quiz(
+                lesson=lesson, title=f'Kiểm tra: {lesson.title}', status='published', passing_score=60,
+                max_attempts=QUIZ_MAX_ATTEMPTS, order=0,
+            )
+            for lesson in lessons
+        ], ['lesson_id', 'order'])
+        self._count('quizzes', quizzes)
+
+        questions = _bulk_create(QuizQuestion, [
+            QuizQuestion(
+                quiz=quiz,
+                question_text=self._text(12),
+                question_type='multiple' if q == self.questions - 1 else 'single',
+                points=self.random.randint(1, 3),
+                order=q,
+            )
+            for quiz in quizzes for q in range(self.questions)
+        ], ['quiz_id', 'order'])
+        self._count('quiz_questions', questions)
+
+        options = []
+        for question in questions:
+            correct = {0, 1} if question.question_type == 'multiple' else {self.random.randrange(4)}
+            options.extend(
+                QuestionOption(question=question, option_text=self._text(4), is_correct=o in correct, order=o)
+                for o in range(4)
+            )
+        QuestionOption.objects.bulk_create(options, batch_size=BATCH_SIZE)
+        self._count('question_options', options)
+
+    # ------------------------------------------------------------------
+    # Người dùng, lớp học, phân quyền, tiến độ
+    # ------------------------------------------------------------------
+
+    def _generate_people_and_progress(self, lessons):
+        password = make_password(PASSWORD)
+        subcourse_ids = sorted({lesson.subcourse_id for lesson in lessons})
+        lessons_by_subcourse = {}
+        for lesson in lessons:
+            if lesson.status == 'PUBLISHED':
+                lessons_by_subcourse.setdefault(lesson.subcourse_id, []).append(lesson)
+
+        teacher_count = max(1, len(subcourse_ids) // 5)
+        users = _bulk_create(User, [
+            User(username=f'{USERNAME_PREFIX}teacher{t + 1}', password=password)
+            for t in range(teacher_count)
+        ] + [
+            User(username=f'{USERNAME_PREFIX}st{s + 1}', password=password)
+            for s in range(self.students)
+        ], ['username'])
+        teachers, students = users[:teacher_count], users[teacher_count:]
+
+        profiles = [UserProfile(user=user, role='TEACHER', full_name=f'Giáo viên {i + 1}') for i, user in enumerate(teachers)]
+        profiles += [UserProfile(user=user, role='STUDENT', full_name=f'Học viên {i + 1}') for i, user in enumerate(students)]
+        UserProfile.objects.bulk_create(profiles, batch_size=BATCH_SIZE)
+        self._count('teachers', teachers)
+        self._count('students', students)
+
+        today = timezone.now().date()
+        classes = _bulk_create(Class, [
+            Class(
+                name=f'Lớp benchmark {i + 1}',
+                code=f'{CLASS_CODE_PREFIX}{i + 1}',
+                subcourse_id=subcourse_id,
+                status='ACTIVE',
+                start_date=today,
+                max_students=self.students_per_class,
+            )
+            for i, subcourse_id in enumerate(subcourse_ids)
+        ], ['code'])
+        self._count('classes', classes)
+
+        ClassTeacher.objects.bulk_create([
+            ClassTeacher(class_obj=class_obj, teacher=teachers[i % teacher_count], role='LEAD')
+            for i, class_obj in enumerate(classes)
+        ], batch_size=BATCH_SIZE)
+
+        enrollments, assignments, progresses = [], [], []
+        now = timezone.now()
+        for index, student in enumerate(students):
+            class_obj = classes[index % len(classes)]
+            enrollments.append(ClassEnrollment(class_obj=class_obj, student=student))
+            assignments.append(AuthAssignment(user=student, subcourse_id=class_obj.subcourse_id, valid_from=now))
+
+            class_lessons = lessons_by_subcourse.get(class_obj.subcourse_id, [])
+            done = int(len(class_lessons) * self.random.uniform(0, 2 * self.progress_ratio))
+            for lesson in class_lessons[:min(done, len(class_lessons))]:
+                progresses.append(UserProgress(user=student, lesson=lesson, is_completed=True, completed_at=now))
+
+        ClassEnrollment.objects.bulk_create(enrollments, batch_size=BATCH_SIZE)
+        AuthAssignment.objects.bulk_create(assignments, batch_size=BATCH_SIZE)
+        UserProgress.objects.bulk_create(progresses, batch_size=BATCH_SIZE)
+        self._count('enrollments', enrollments)
+        self._count('assignments', assignments)
+        self._count('progress_rows', progresses)
+        self.log(f'  people: {len(students)} students, {len(classes)} classes, {len(progresses)} progress rows')
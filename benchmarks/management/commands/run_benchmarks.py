@@ -0,0 +1,69 @@
+"""
+Benchmark các endpoint chính, lưu kết quả JSON để so sánh giữa các lần chạy
+
+Sử dụng:
+    python manage.py run_benchmarks
+    python manage.py run_benchmarks --iterations 100 --scenario lesson_detail --scenario quiz_submit
+    python manage.py run_benchmarks --cold --compare benchmarks/results/before.json
+"""
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from benchmarks.runner import BenchmarkRunner, compare
+
+
+DEFAULT_OUTPUT_DIR = Path(settings.BASE_DIR) / 'benchmarks' / 'results'
+
+
+class Command(BaseCommand):
+    help = 'Đo p50/p95 latency và số query của các endpoint chính (cần chạy seed_curriculum trước)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            choices=BenchmarkRunner.SCENARIOS,
+                            help='Chỉ chạy kịch bản này (có thể lặp lại). Mặc định: tất cả')
+        parser.add_argument('--cold', action='store_true', help='Xóa cache trước mỗi request')
+        parser.add_argument('--output', help='File JSON kết quả (mặc định: benchmarks/results/<thời gian>.json)')
+        parser.add_argument('--compare', help='File JSON của lần chạy trước để so sánh')
+
+    def handle(self, *args, **options):
+        try:
+            runner = BenchmarkRunner(
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                seed=options['seed'],
+                cold=options['cold'],
+                stdout=self.stdout,
+            )
+            result = runner.run(options['scenarios'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write('')
+        self.stdout.write(f'{"scenario":<20} {"p50 ms":>9} {"p95 ms":>9} {"queries":>8}  status')
+        for name, scenario in result['scenarios'].items():
+            self.stdout.write(
+                f'{name:<20} {scenario["p50_ms"]:>9} {scenario["p95_ms"]:>9} '
+                f'{scenario["queries_avg"]:>8}  {scenario["status_codes"]}'
+            )
+
+        output = Path(options['output']) if options['output'] else (
+            DEFAULT_OUTPUT_DIR / f'{timezone.now():%Y%m%d-%H%M%S}.json'
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'Đã lưu kết quả: {output}'))
+
+        if options['compare']:
+            previous = json.loads(Path(options['compare']).read_text(encoding='utf-8'))
+            self.stdout.write('')
+            self.stdout.write(f'So sánh với {options["compare"]}:')
+            for name, metric, before, after, delta in compare(result, previous):
+                self.stdout.write(f'  {name:<20} {metric:<12} {before:>9} -> {after:>9} ({delta:+.1f}%)')
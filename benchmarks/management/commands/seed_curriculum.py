@@ -0,0 +1,49 @@
+"""
+Sinh dữ liệu benchmark (có seed, chạy lại cho cùng kết quả)
+
+Sử dụng:
+    python manage.py seed_curriculum --reset
+    python manage.py seed_curriculum --programs 3 --subcourses 20 --lessons 15 --students 5000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.generator import CurriculumGenerator
+
+
+class Command(BaseCommand):
+    help = 'Sinh chương trình học, học viên, lớp và tiến độ giả lập cho benchmark'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--programs', type=int, default=2)
+        parser.add_argument('--subcourses', type=int, default=20, help='Số subcourse mỗi program')
+        parser.add_argument('--lessons', type=int, default=15, help='Số bài học mỗi subcourse')
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--questions', type=int, default=5, help='Số câu hỏi mỗi quiz')
+        parser.add_argument('--progress-ratio', type=float, default=0.5,
+                            help='Tỉ lệ bài học trung bình học viên đã hoàn thành')
+        parser.add_argument('--reset', action='store_true', help='Xóa dữ liệu benchmark cũ trước khi sinh')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            self.stdout.write('Xóa dữ liệu benchmark cũ...')
+            CurriculumGenerator.reset()
+
+        generator = CurriculumGenerator(
+            seed=options['seed'],
+            programs=options['programs'],
+            subcourses=options['subcourses'],
+            lessons=options['lessons'],
+            students=options['students'],
+            questions=options['questions'],
+            progress_ratio=options['progress_ratio'],
+            stdout=self.stdout,
+        )
+        start = time.perf_counter()
+        counts = generator.generate()
+        elapsed = time.perf_counter() - start
+
+        summary = ', '.join(f'{name}={count}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Đã sinh dữ liệu trong {elapsed:.1f}s: {summary}'))
@@ -0,0 +1,255 @@
+"""
+Chạy benchmark các endpoint chính trên database đang cấu hình (SQLite / MySQL)
+- Mỗi kịch bản gọi endpoint qua APIClient với JWT thật (tính cả query xác thực)
+- Đo latency (p50/p95/mean/max) và số SQL query mỗi request
+- Kết quả dạng dict -> lưu JSON để so sánh giữa các lần chạy
+"""
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from classes.models import Class
+from content.models import Program, Lesson, Quiz, QuestionOption
+from user_auth.entitlements import valid_assignment_q
+from user_auth.models import AuthAssignment
+
+from .generator import SLUG_PREFIX, USERNAME_PREFIX, CLASS_CODE_PREFIX
+
+
+LESSON_PAGE_SIZE = 100
+
+
+class BenchmarkError(ValueError):
+    """Kịch bản nhận response không mong đợi -> số đo không đại diện cho đường đi cần đo"""
+
+
+def percentile(values, percent):
+    """Percentile theo nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(percent / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class BenchmarkRunner:
+    """
+    Các kịch bản: catalog_programs, catalog_subcourses, catalog_lessons, lesson_detail,
+    quiz_submit, student_progress, my_subcourses
+    cold=True: xóa cache trước mỗi request (đo đường đi không có cache)
+    Kịch bản trong REQUIRE_SUCCESS gặp response không phải 2xx -> BenchmarkError
+    """
+
+    def __init__(self, iterations=50, warmup=5, seed=42, cold=False, stdout=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.random = random.Random(seed)
+        self.cold = cold
+        self.stdout = stdout
+        self._clients = {}
+        self._load_fixtures()
+
+    def _load_fixtures(self):
+        self.lesson_slugs = list(Lesson.objects.filter(
+            slug__startswith=f'{SLUG_PREFIX}-', status='PUBLISHED'
+        ).values_list('slug', flat=True))
+        self.students = list(User.objects.filter(
+            username__startswith=f'{USERNAME_PREFIX}st'
+        ).order_by('id')[:200])
+        self.classes = list(Class.objects.filter(
+            code__startswith=CLASS_CODE_PREFIX
+        ).prefetch_related('teachers__teacher'))
+        catalog_lessons = Lesson.objects.filter(
+            status='PUBLISHED',
+            subcourse__status='PUBLISHED',
+            subcourse__program__status='PUBLISHED'
+        ).count()
+        self.lesson_pages = max(1, -(-catalog_lessons // LESSON_PAGE_SIZE))
+        if not (self.lesson_slugs and self.students and self.classes):
+            raise ValueError('Chưa có dữ liệu benchmark, hãy chạy: python manage.py seed_curriculum')
+
+        # lesson_detail: chỉ cặp (bài học, học viên có assignment còn hiệu lực cho khóa học con của bài)
+        student_ids = {student.id for student in self.students}
+        students_by_id = {student.id: student for student in self.students}
+        by_subcourse, by_program = {}, {}
+        for user_id, subcourse_id, program_id in AuthAssignment.objects.filter(
+            valid_assignment_q(), user_id__in=student_ids
+        ).values_list('user_id', 'subcourse_id', 'program_id'):
+            if subcourse_id is not None:
+                by_subcourse.setdefault(subcourse_id, set()).add(user_id)
+            if program_id is not None:
+                by_program.setdefault(program_id, set()).add(user_id)
+        self.lesson_detail_targets = []
+        for slug, subcourse_id, program_id in Lesson.objects.filter(slug__in=self.lesson_slugs).values_list(
+            'slug', 'subcourse_id', 'subcourse__program_id'
+        ):
+            user_ids = by_subcourse.get(subcourse_id, set()) | by_program.get(program_id, set())
+            if user_ids:
+                self.lesson_detail_targets.append((slug, [students_by_id[user_id] for user_id in sorted(user_ids)]))
+        self.lesson_detail_targets.sort(key=lambda target: target[0])
+        if not self.lesson_detail_targets:
+            raise ValueError('Không có học viên nào được gán quyền vào bài học benchmark, hãy chạy lại seed_curriculum')
+
+        quizzes = Quiz.objects.filter(lesson__slug__in=self.lesson_slugs[:100])
+        options = {}
+        for question_id, option_id, quiz_id in QuestionOption.objects.filter(
+            question__quiz__in=quizzes
+        ).values_list('question_id', 'id', 'question__quiz_id'):
+            options.setdefault(quiz_id, {}).setdefault(question_id, []).append(option_id)
+        self.quiz_options = options
+
+    def client_for(self, user=None):
+        """APIClient kèm JWT access token (user=None -> anonymous)"""
+        key = user.id if user else None
+        if key not in self._clients:
+            client = APIClient(SERVER_NAME='localhost')
+            if user is not None:
+                token = RefreshToken.for_user(user).access_token
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            self._clients[key] = client
+        return self._clients[key]
+
+    # ------------------------------------------------------------------
+    # Kịch bản: mỗi hàm trả về (client, method, url, data)
+    # ------------------------------------------------------------------
+
+    def scenario_catalog_programs(self):
+        return self.client_for(None), 'get', '/api/content/programs/', None
+
+    def scenario_catalog_subcourses(self):
+        return self.client_for(None), 'get', '/api/content/subcourses/?page_size=100', None
+
+    def scenario_catalog_lessons(self):
+        page = self.random.randint(1, self.lesson_pages)
+        url = f'/api/content/lessons/?page_size={LESSON_PAGE_SIZE}&page={page}'
+        return self.client_for(None), 'get', url, None
+
+    def scenario_lesson_detail(self):
+        slug, students = self.random.choice(self.lesson_detail_targets)
+        return self.client_for(self.random.choice(students)), 'get', f'/api/content/lesson-details/{slug}/', None
+
+    def scenario_quiz_submit(self):
+        quiz_id = self.random.choice(list(self.quiz_options))
+        answers = [
+            {'question_id': question_id, 'selected_option_ids': [self.random.choice(option_ids)]}
+            for question_id, option_ids in self.quiz_options[quiz_id].items()
+        ]
+        return (
+            self.client_for(self.random.choice(self.students)),
+            'post', f'/api/content/quizzes/{quiz_id}/submit/', {'answers': answers},
+        )
+
+    def scenario_student_progress(self):
+        class_obj = self.random.choice(self.classes)
+        teacher = class_obj.teachers.all()[0].teacher
+        return self.client_for(teacher), 'get', f'/api/classes/{class_obj.id}/student_progress/', None
+
+    def scenario_my_subcourses(self):
+        return self.client_for(self.random.choice(self.students)), 'get', '/api/auth/assignments/my_subcourses/', None
+
+    SCENARIOS = (
+        'catalog_programs', 'catalog_subcourses', 'catalog_lessons', 'lesson_detail',
+        'quiz_submit', 'student_progress', 'my_subcourses',
+    )
+    # Đo đường đi thành công: 403 / 404 trả sớm sẽ làm số đo thấp giả
+    REQUIRE_SUCCESS = ('lesson_detail',)
+
+    # ------------------------------------------------------------------
+
+    def _request(self, name):
+        client, method, url, data = getattr(self, f'scenario_{name}')()
+        if self.cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            if data is None:
+                response = getattr(client, method)(url)
+            else:
+                response = getattr(client, method)(url, data, format='json')
+            elapsed = (time.perf_counter() - start) * 1000
+        if name in self.REQUIRE_SUCCESS and not 200 <= response.status_code < 300:
+            raise BenchmarkError(f'{name}: {method.upper()} {url} trả về {response.status_code}')
+        return elapsed, len(context.captured_queries), response.status_code
+
+    def run_scenario(self, name):
+        for _ in range(self.warmup):
+            self._request(name)
+
+        timings, queries, statuses = [], [], {}
+        for _ in range(self.iterations):
+            elapsed, query_count, status_code = self._request(name)
+            timings.append(elapsed)
+            queries.append(query_count)
+            statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+
+        return {
+            'iterations': self.iterations,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'queries_avg': round(statistics.mean(queries), 2),
+            'queries_max': max(queries),
+            'status_codes': statuses,
+        }
+
+    def run(self, scenarios=None):
+        results = {}
+        for name in scenarios or self.SCENARIOS:
+            if self.stdout:
+                self.stdout.write(f'  {name} ...')
+            results[name] = self.run_scenario(name)
+        return {
+            'meta': self.metadata(),
+            'scenarios': results,
+        }
+
+    def metadata(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, timeout=5
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = ''
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'git_commit': commit,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'iterations': self.iterations,
+            'warmup': self.warmup,
+            'cold_cache': self.cold,
+            'dataset': {
+                'programs': Program.objects.filter(slug__startswith=f'{SLUG_PREFIX}-').count(),
+                'lessons': len(self.lesson_slugs),
+                'students': User.objects.filter(username__startswith=f'{USERNAME_PREFIX}st').count(),
+                'classes': len(self.classes),
+            },
+        }
+
+
+def compare(current, previous):
+    """So sánh 2 kết quả: [(scenario, metric, before, after, delta_percent)]"""
+    rows = []
+    for name, result in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'queries_avg'):
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            delta = round((new - old) / old * 100, 1) if old else 0.0
+            rows.append((name, metric, old, new, delta))
+    return rows
@@ -60,6 +60,11 @@ class ClassAdmin(admin.ModelAdmin):
     autocomplete_fields = ['subcourse', 'created_by']
     
     inlines = [ClassTeacherInline, ClassEnrollmentInline]
+    list_select_related = ['subcourse__program']
+    
+    def get_queryset(self, request):
+        # Sĩ số được annotate -> current_enrollment_count / is_full không query theo từng dòng
+        return super().get_queryset(request).with_enrollment_counts()
     
     def save_model(self, request, obj, form, change):
         """Tự động set created_by"""
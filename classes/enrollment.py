@@ -0,0 +1,164 @@
+"""
+Ghi danh hàng loạt học viên vào lớp (Bulk Enrollment)
+Số query cố định, không phụ thuộc số học viên:
+1. Khóa dòng Class (SELECT ... FOR UPDATE) -> không 2 request nào cùng vượt sĩ số
+2. Tra học viên theo id / username / email trong 1 query
+3. Ghi danh sẵn có của lớp cho các học viên này
+4. Đếm sĩ số ACTIVE hiện tại (1 lần)
+5. bulk_create toàn bộ ClassEnrollment mới
+
+Kết quả: báo cáo theo từng học viên (enrolled / already_enrolled / not_found / class_full / duplicate)
+"""
+import csv
+import io
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Class, ClassEnrollment
+
+
+MAX_BULK_ENROLLMENTS = 5000
+CSV_COLUMNS = ('student_id', 'username', 'email')
+
+# Kết quả theo từng học viên
+ENROLLED = 'enrolled'
+ALREADY_ENROLLED = 'already_enrolled'
+NOT_FOUND = 'not_found'
+CLASS_FULL = 'class_full'
+DUPLICATE = 'duplicate'
+
+
+class BulkEnrollmentError(Exception):
+    """Dữ liệu đầu vào không hợp lệ hoặc lớp không đủ chỗ (không ghi gì vào DB)"""
+
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+
+
+def parse_csv(uploaded_file):
+    """
+    Đọc danh sách học viên từ file CSV
+    Có header student_id / username / email -> dùng cột đó, không có header -> cột đầu tiên
+    """
+    content = uploaded_file.read()
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise BulkEnrollmentError('File CSV phải được mã hóa UTF-8')
+    rows = [row for row in csv.reader(io.StringIO(content)) if row and any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next((header.index(name) for name in CSV_COLUMNS if name in header), None)
+    if column is None:
+        column = 0
+    else:
+        rows = rows[1:]
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+
+def _resolve_students(references):
+    """{reference: user_id} cho các reference là id, username hoặc email"""
+    ids = {str(reference) for reference in references if str(reference).isdigit()}
+    emails = {reference.lower() for reference in references if isinstance(reference, str) and '@' in reference}
+    usernames = {str(reference) for reference in references} - ids - emails
+
+    condition = Q(id__in=ids) | Q(username__in=usernames)
+    for email in emails:
+        condition |= Q(email__iexact=email)
+    users = User.objects.filter(condition, is_active=True).values_list('id', 'username', 'email')
+
+    lookup = {}
+    for user_id, username, email in users:
+        lookup[str(user_id)] = user_id
+        lookup[username] = user_id
+        if email:
+            lookup.setdefault(email.lower(), user_id)
+    return {
+        reference: lookup.get(str(reference).lower() if '@' in str(reference) else str(reference))
+        for reference in references
+    }
+
+
+def bulk_enroll(class_id, references, enrolled_by=None, status='ACTIVE', notes='', allow_partial=False):
+    """
+    Ghi danh nhiều học viên trong 1 transaction
+    references: danh sách student id / username / email
+    allow_partial=False: không đủ chỗ cho tất cả -> BulkEnrollmentError, không ghi danh ai
+    allow_partial=True: ghi danh theo thứ tự cho tới khi đầy, phần còn lại báo class_full
+    """
+    references = [reference for reference in references if str(reference).strip()]
+    if not references:
+        raise BulkEnrollmentError('Danh sách học viên trống')
+    if len(references) > MAX_BULK_ENROLLMENTS:
+        raise BulkEnrollmentError(f'Tối đa {MAX_BULK_ENROLLMENTS} học viên mỗi lần ghi danh')
+    if status not in dict(ClassEnrollment.STATUS_CHOICES):
+        raise BulkEnrollmentError(f'Trạng thái không hợp lệ: {status}')
+
+    with transaction.atomic():
+        class_obj = Class.objects.select_for_update().get(pk=class_id)
+        resolved = _resolve_students(references)
+        student_ids = {user_id for user_id in resolved.values() if user_id}
+        existing = dict(ClassEnrollment.objects.filter(
+            class_obj=class_obj, student_id__in=student_ids
+        ).values_list('student_id', 'status'))
+
+        results, to_create, seen = [], [], set()
+        for reference in references:
+            student_id = resolved.get(reference)
+            result = {'student': str(reference), 'student_id': student_id}
+            if not student_id:
+                result['result'] = NOT_FOUND
+            elif student_id in seen:
+                result['result'] = DUPLICATE
+            elif student_id in existing:
+                result['result'] = ALREADY_ENROLLED
+                result['enrollment_status'] = existing[student_id]
+            else:
+                result['result'] = ENROLLED
+                to_create.append(result)
+            if student_id:
+                seen.add(student_id)
+            results.append(result)
+
+        # Kiểm tra sĩ số 1 lần (chỉ ghi danh ACTIVE chiếm chỗ)
+        active_count = class_obj.enrollments.filter(status='ACTIVE').count()
+        available = max(class_obj.max_students - active_count, 0)
+        if status == 'ACTIVE' and len(to_create) > available:
+            if not allow_partial:
+                raise BulkEnrollmentError(
+                    f'Lớp chỉ còn {available} chỗ, không thể ghi danh {len(to_create)} học viên',
+                    available_slots=available,
+                    requested=len(to_create),
+                )
+            for result in to_create[available:]:
+                result['result'] = CLASS_FULL
+            to_create = to_create[:available]
+
+        ClassEnrollment.objects.bulk_create([
+            ClassEnrollment(
+                class_obj=class_obj,
+                student_id=result['student_id'],
+                status=status,
+                notes=notes,
+                enrolled_by=enrolled_by,
+            )
+            for result in to_create
+        ], batch_size=500)
+
+    summary = {}
+    for result in results:
+        summary[result['result']] = summary.get(result['result'], 0) + 1
+    return {
+        'class_id': class_obj.id,
+        'max_students': class_obj.max_students,
+        'active_students': active_count + (len(to_create) if status == 'ACTIVE' else 0),
+        'summary': summary,
+        'results': results,
+    }
@@ -2,8 +2,46 @@
 Models cho Classes App - Quản lý lớp học
 """
 from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch
 from django.contrib.auth.models import User
-from content.models import Subcourse
+from content.models import Subcourse, _count_subquery
+from user_auth.roles import has_role
+
+
+class ClassQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Lớp user được xem theo role (EXISTS subquery, không JOIN + DISTINCT)
+        - Admin: tất cả
+        - Teacher: lớp mình dạy
+        - Student: lớp đang học (ghi danh ACTIVE)
+        """
+        if user.is_staff or user.is_superuser:
+            return self.all()
+        if has_role(user, 'TEACHER'):
+            return self.filter(Exists(
+                ClassTeacher.objects.filter(class_obj=OuterRef('pk'), teacher=user)
+            ))
+        return self.filter(Exists(
+            ClassEnrollment.objects.filter(class_obj=OuterRef('pk'), student=user, status='ACTIVE')
+        ))
+
+    def with_enrollment_counts(self):
+        """Annotate active_enrollment_count: số ghi danh ACTIVE (dùng cho current_enrollment_count / is_full)"""
+        return self.annotate(
+            active_enrollment_count=_count_subquery(
+                ClassEnrollment.objects.filter(class_obj=OuterRef('pk'), status='ACTIVE'),
+                'class_obj'
+            )
+        )
+
+    def with_lead_teacher(self):
+        """Prefetch giáo viên chính (kèm user + profile) vào lead_teachers trong 1 query"""
+        return self.prefetch_related(Prefetch(
+            'teachers',
+            queryset=ClassTeacher.objects.filter(role='LEAD').select_related('teacher', 'teacher__profile').order_by('id'),
+            to_attr='lead_teachers',
+        ))
 
 
 class Class(models.Model):
@@ -55,6 +93,8 @@ class Class(models.Model):
         verbose_name='Người tạo'
     )
     
+    objects = ClassQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Lớp học'
         verbose_name_plural = 'Lớp học'
@@ -69,12 +109,14 @@ class Class(models.Model):
     
     @property
     def current_enrollment_count(self):
-        """Số học viên hiện tại"""
+        """Số học viên hiện tại (giá trị annotate nếu queryset đã gọi with_enrollment_counts())"""
+        if hasattr(self, 'active_enrollment_count'):
+            return self.active_enrollment_count
         return self.enrollments.filter(status='ACTIVE').count()
     
     @property
     def is_full(self):
-        """Lớp đã đầy chưa"""
+        """Lớp đã đầy chưa (không query thêm nếu đã annotate)"""
         return self.current_enrollment_count >= self.max_students
 
 
@@ -180,6 +222,7 @@ class ClassEnrollment(models.Model):
         indexes = [
             models.Index(fields=['student', 'status']),
             models.Index(fields=['class_obj', 'status']),
+            models.Index(fields=['enrolled_at', 'id']),
         ]
     
     def __str__(self):
@@ -0,0 +1,128 @@
+"""
+Engine tổng hợp tiến độ lớp học (Class Progress Matrix)
+Tính tiến độ của TẤT CẢ học viên trong lớp với số query cố định:
+1. Danh sách bài học đã publish của khóa học
+2. Danh sách ghi danh ACTIVE (kèm student + profile)
+3. Toàn bộ UserProgress của (học viên × bài học) trong 1 query
+4. Bảng tổng hợp SubcourseProgress (số bài hoàn thành / phần trăm)
+
+Kết quả có thêm bitmap học viên × bài học: chuỗi '0'/'1' theo thứ tự bài học
+"""
+from content.models import UserProgress, SubcourseProgress
+
+
+class ClassProgressMatrix:
+    """Ma trận tiến độ học viên × bài học của một lớp"""
+
+    def __init__(self, class_obj, student_id=None):
+        self.class_obj = class_obj
+        self.lessons = list(
+            class_obj.subcourse.lessons.filter(
+                status='PUBLISHED'
+            ).order_by('sort_order', 'id').values('id', 'slug', 'title', 'sort_order')
+        )
+        self.lesson_index = {lesson['id']: index for index, lesson in enumerate(self.lessons)}
+
+        enrollments = class_obj.enrollments.filter(status='ACTIVE')
+        if student_id:
+            enrollments = enrollments.filter(student_id=student_id)
+        self.enrollments = list(
+            enrollments.select_related('student', 'student__profile').order_by('enrolled_at', 'id')
+        )
+
+        self._completed = {}
+        self._last_progress = {}
+        self._summaries = {}
+        self._load_progress()
+
+    def _load_progress(self):
+        student_ids = [enrollment.student_id for enrollment in self.enrollments]
+        if not student_ids or not self.lessons:
+            return
+
+        rows = UserProgress.objects.filter(
+            user_id__in=student_ids,
+            lesson_id__in=list(self.lesson_index)
+        ).values_list('user_id', 'lesson_id', 'is_completed', 'updated_at')
+
+        for user_id, lesson_id, is_completed, updated_at in rows:
+            if is_completed:
+                self._completed.setdefault(user_id, set()).add(lesson_id)
+            last = self._last_progress.get(user_id)
+            if last is None or updated_at > last[1]:
+                self._last_progress[user_id] = (lesson_id, updated_at)
+
+        self._summaries = {
+            summary.user_id: summary
+            for summary in SubcourseProgress.objects.filter(
+                subcourse_id=self.class_obj.subcourse_id,
+                user_id__in=student_ids
+            )
+        }
+
+    @property
+    def total_lessons(self):
+        return len(self.lessons)
+
+    def bitmap(self, student_id):
+        """Chuỗi '0'/'1' theo thứ tự bài học (1 = đã hoàn thành)"""
+        completed = self._completed.get(student_id, set())
+        return ''.join('1' if lesson['id'] in completed else '0' for lesson in self.lessons)
+
+    def student_row(self, enrollment):
+        """Tiến độ của 1 học viên (giữ nguyên format cũ của student_progress)"""
+        student = enrollment.student
+        completed = self._completed.get(student.id, set())
+        summary = self._summaries.get(student.id)
+        if summary is not None:
+            completed_lessons = summary.completed_lessons
+            total_lessons = summary.total_lessons
+            completion_percentage = summary.completion_percentage
+        else:
+            # Chưa có dòng tổng hợp (chưa rebuild) -> tính từ dữ liệu đã nạp
+            completed_lessons = len(completed)
+            total_lessons = self.total_lessons
+            completion_percentage = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
+
+        last = self._last_progress.get(student.id)
+        last_lesson = self.lessons[self.lesson_index[last[0]]] if last else None
+
+        return {
+            'student_id': student.id,
+            'student_username': student.username,
+            'student_name': student.profile.full_name if hasattr(student, 'profile') else '',
+            'enrollment_status': enrollment.status,
+            'enrolled_at': enrollment.enrolled_at,
+            'total_lessons': total_lessons,
+            'completed_lessons': completed_lessons,
+            'completion_percentage': round(completion_percentage, 2),
+            'last_activity': last[1] if last else None,
+            'last_lesson': last_lesson['title'] if last_lesson else None,
+            'completed_lesson_slugs': [
+                lesson['slug'] for lesson in self.lessons if lesson['id'] in completed
+            ],
+            'completed_bitmap': self.bitmap(student.id),
+        }
+
+    def rows(self):
+        return [self.student_row(enrollment) for enrollment in self.enrollments]
+
+    def as_matrix(self):
+        """
+        Dạng rút gọn cho dashboard giáo viên:
+        lessons: thứ tự cột, students: mỗi dòng 1 bitmap
+        """
+        return {
+            'class_id': self.class_obj.id,
+            'total_lessons': self.total_lessons,
+            'lessons': self.lessons,
+            'students': [
+                {
+                    'student_id': enrollment.student.id,
+                    'student_username': enrollment.student.username,
+                    'completed_lessons': len(self._completed.get(enrollment.student_id, ())),
+                    'bitmap': self.bitmap(enrollment.student_id),
+                }
+                for enrollment in self.enrollments
+            ],
+        }
@@ -152,8 +152,11 @@ class ClassListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_lead_teacher(self, obj):
-        """Lấy giáo viên chính của lớp"""
-        lead = obj.teachers.filter(role='LEAD').first()
+        """Lấy giáo viên chính của lớp (từ with_lead_teacher() nếu đã prefetch)"""
+        leads = getattr(obj, 'lead_teachers', None)
+        if leads is None:
+            leads = obj.teachers.filter(role='LEAD').select_related('teacher', 'teacher__profile').order_by('id')[:1]
+        lead = leads[0] if leads else None
         if lead:
             return {
                 'id': lead.teacher.id,
@@ -161,4 +164,3 @@ class ClassListSerializer(serializers.ModelSerializer):
                 'full_name': lead.teacher.profile.full_name if hasattr(lead.teacher, 'profile') else ''
             }
         return None
-
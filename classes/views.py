@@ -6,9 +6,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Exists, OuterRef, Prefetch
 from django.utils import timezone
 
+from content.pagination import ClassEnrollmentPagination
+from content.progress_summary import get_summary
+from user_auth.roles import can_manage_classes, has_role
+from .enrollment import BulkEnrollmentError, bulk_enroll, parse_csv
 from .models import Class, ClassTeacher, ClassEnrollment
+from .progress import ClassProgressMatrix
 from .serializers import (
     ClassSerializer,
     ClassListSerializer,
@@ -24,6 +30,10 @@ class ClassViewSet(viewsets.ModelViewSet):
     - Teacher: chỉ xem lớp mình dạy
     - Student: chỉ xem lớp mình học
     """
+    query_budgets = {
+        'list': 5, 'retrieve': 6,
+        'student_progress': 8, 'progress_matrix': 8, 'students': 5, 'bulk_enroll': 10,
+    }  # Số query tối đa / action (profiling)
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'subcourse', 'start_date']
@@ -32,24 +42,26 @@ class ClassViewSet(viewsets.ModelViewSet):
     ordering = ['-start_date']
     
     def get_queryset(self):
-        """Filter theo role"""
-        user = self.request.user
-        
-        # Admin xem tất cả
-        if user.is_staff or user.is_superuser:
-            return Class.objects.all().select_related('subcourse', 'created_by')
-        
-        # Teacher xem lớp mình dạy
-        if hasattr(user, 'profile') and user.profile.role == 'TEACHER':
-            return Class.objects.filter(
-                teachers__teacher=user
-            ).distinct().select_related('subcourse', 'created_by')
+        """
+        Filter theo role bằng EXISTS (Class.objects.visible_to), sĩ số được annotate
+        List: prefetch giáo viên chính | Retrieve: prefetch giáo viên + học viên kèm profile
+        """
+        queryset = Class.objects.visible_to(self.request.user).select_related(
+            'subcourse', 'created_by'
+        ).with_enrollment_counts()
         
-        # Student xem lớp mình học
-        return Class.objects.filter(
-            enrollments__student=user,
-            enrollments__status='ACTIVE'
-        ).distinct().select_related('subcourse', 'created_by')
+        if self.action == 'list':
+            return queryset.with_lead_teacher()
+        if self.action == 'retrieve':
+            return queryset.prefetch_related(
+                Prefetch('teachers', queryset=ClassTeacher.objects.select_related(
+                    'teacher', 'teacher__profile'
+                )),
+                Prefetch('enrollments', queryset=ClassEnrollment.objects.select_related(
+                    'student', 'student__profile'
+                )),
+            )
+        return queryset
     
     def get_serializer_class(self):
         """List dùng serializer rút gọn"""
@@ -77,64 +89,24 @@ class ClassViewSet(viewsets.ModelViewSet):
         Xem tiến độ học tập của học viên trong lớp
         GET /api/classes/{id}/student_progress/
         Query params: ?student={id} để lọc theo học viên cụ thể
+        Số query cố định (không phụ thuộc số học viên) - xem classes/progress.py
         """
-        from content.models import UserProgress
-        
         class_obj = self.get_object()
         student_id = request.query_params.get('student')
         
-        # Lấy tất cả lessons trong subcourse của lớp
-        lessons = class_obj.subcourse.lessons.filter(status='PUBLISHED')
-        
-        # Lấy danh sách học viên active trong lớp
-        enrollments = class_obj.enrollments.filter(status='ACTIVE')
-        
-        if student_id:
-            enrollments = enrollments.filter(student_id=student_id)
-        
-        # Tổng hợp tiến độ từng học viên
-        results = []
-        for enrollment in enrollments.select_related('student', 'student__profile'):
-            # Lấy progress từ content.UserProgress
-            completed_lessons = UserProgress.objects.filter(
-                user=enrollment.student,
-                lesson__in=lessons,
-                is_completed=True
-            ).count()
-            
-            # Lấy thông tin bài học gần nhất
-            last_progress = UserProgress.objects.filter(
-                user=enrollment.student,
-                lesson__in=lessons
-            ).order_by('-updated_at').first()
-            
-            # Lấy danh sách slug của các bài học đã hoàn thành
-            completed_lesson_slugs = list(
-                UserProgress.objects.filter(
-                    user=enrollment.student,
-                    lesson__in=lessons,
-                    is_completed=True
-                ).values_list('lesson__slug', flat=True)
-            )
-            
-            total_lessons = lessons.count()
-            completion_percentage = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
-            
-            results.append({
-                'student_id': enrollment.student.id,
-                'student_username': enrollment.student.username,
-                'student_name': enrollment.student.profile.full_name if hasattr(enrollment.student, 'profile') else '',
-                'enrollment_status': enrollment.status,
-                'enrolled_at': enrollment.enrolled_at,
-                'total_lessons': total_lessons,
-                'completed_lessons': completed_lessons,
-                'completion_percentage': round(completion_percentage, 2),
-                'last_activity': last_progress.updated_at if last_progress else None,
-                'last_lesson': last_progress.lesson.title if last_progress else None,
-                'completed_lesson_slugs': completed_lesson_slugs,
-            })
-        
-        return Response(results)
+        matrix = ClassProgressMatrix(class_obj, student_id=student_id)
+        return Response(matrix.rows())
+    
+    @action(detail=True, methods=['get'])
+    def progress_matrix(self, request, pk=None):
+        """
+        Ma trận tiến độ rút gọn (học viên × bài học) cho dashboard giáo viên
+        GET /api/classes/{id}/progress_matrix/
+        Response: {"lessons": [...], "students": [{"student_id": 1, "bitmap": "1101"}]}
+        """
+        class_obj = self.get_object()
+        matrix = ClassProgressMatrix(class_obj, student_id=request.query_params.get('student'))
+        return Response(matrix.as_matrix())
     
     @action(detail=True, methods=['post'])
     def enroll_student(self, request, pk=None):
@@ -143,8 +115,7 @@ class ClassViewSet(viewsets.ModelViewSet):
         POST /api/classes/{id}/enroll_student/
         Body: {"student_id": 123, "status": "ACTIVE", "notes": "..."}
         """
-        if not (request.user.is_staff or 
-                (hasattr(request.user, 'profile') and request.user.profile.role in ['ADMIN', 'TEACHER'])):
+        if not can_manage_classes(request.user):
             return Response(
                 {'error': 'Bạn không có quyền ghi danh học viên'},
                 status=status.HTTP_403_FORBIDDEN
@@ -186,6 +157,54 @@ class ClassViewSet(viewsets.ModelViewSet):
         serializer = ClassEnrollmentSerializer(enrollment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['post'])
+    def bulk_enroll(self, request, pk=None):
+        """
+        Ghi danh nhiều học viên trong 1 request (chỉ admin/teacher)
+        POST /api/classes/{id}/bulk_enroll/
+        Body JSON: {"student_ids": [1, 2, "hocvien03", "a@b.com"], "status": "ACTIVE",
+                    "notes": "...", "allow_partial": false}
+        Hoặc multipart: file=<CSV cột student_id / username / email>
+        Số query cố định - xem classes/enrollment.py
+        """
+        if not can_manage_classes(request.user):
+            return Response(
+                {'error': 'Bạn không có quyền ghi danh học viên'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        class_obj = self.get_object()
+        try:
+            if 'file' in request.FILES:
+                references = parse_csv(request.FILES['file'])
+            else:
+                references = request.data.get('student_ids') or []
+                if not isinstance(references, list) or not all(
+                    isinstance(reference, (int, str)) for reference in references
+                ):
+                    return Response(
+                        {'error': 'student_ids phải là danh sách id / username / email'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            
+            allow_partial = str(request.data.get('allow_partial', '')).lower() in ('1', 'true')
+            report = bulk_enroll(
+                class_obj.id,
+                references,
+                enrolled_by=request.user,
+                status=request.data.get('status', 'ACTIVE'),
+                notes=request.data.get('notes', ''),
+                allow_partial=allow_partial,
+            )
+        except BulkEnrollmentError as exc:
+            return Response(
+                {'error': exc.message, **exc.details},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        created = report['summary'].get('enrolled', 0)
+        return Response(report, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'])
     def mark_lesson_complete(self, request, pk=None):
         """
@@ -194,8 +213,7 @@ class ClassViewSet(viewsets.ModelViewSet):
         Body: {"student_id": 123, "lesson_slug": "intro-motors"}
         """
         # Kiểm tra quyền: chỉ ADMIN/TEACHER
-        if not (request.user.is_staff or 
-                (hasattr(request.user, 'profile') and request.user.profile.role in ['ADMIN', 'TEACHER'])):
+        if not can_manage_classes(request.user):
             return Response(
                 {'error': 'Bạn không có quyền cập nhật tiến độ học viên'},
                 status=status.HTTP_403_FORBIDDEN
@@ -239,15 +257,8 @@ class ClassViewSet(viewsets.ModelViewSet):
             }
         )
 
-        # Tính phần trăm hoàn thành cho học viên trong subcourse
-        total_lessons = class_obj.subcourse.lessons.filter(status='PUBLISHED').count()
-        completed_lessons = UserProgress.objects.filter(
-            user_id=student_id,
-            lesson__subcourse=class_obj.subcourse,
-            is_completed=True
-        ).count()
-
-        completion_percentage = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
+        # Phần trăm hoàn thành lấy từ bảng tổng hợp (O(1))
+        summary = get_summary(student_id, class_obj.subcourse_id)
 
         return Response({
             'success': True,
@@ -258,9 +269,9 @@ class ClassViewSet(viewsets.ModelViewSet):
                 'lesson_title': lesson.title,
                 'is_completed': progress.is_completed,
                 'completed_at': progress.completed_at,
-                'total_lessons': total_lessons,
-                'completed_lessons': completed_lessons,
-                'completion_percentage': round(completion_percentage, 2)
+                'total_lessons': summary.total_lessons,
+                'completed_lessons': summary.completed_lessons,
+                'completion_percentage': summary.completion_percentage
             }
         }, status=status.HTTP_200_OK)
 
@@ -270,12 +281,12 @@ class ClassEnrollmentViewSet(viewsets.ModelViewSet):
     ViewSet cho ClassEnrollment
     Quản lý ghi danh học viên
     """
+    query_budgets = {'list': 4}  # Số query tối đa / action (profiling)
     permission_classes = [IsAuthenticated]
     serializer_class = ClassEnrollmentSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    pagination_class = ClassEnrollmentPagination  # Keyset theo (enrolled_at, id)
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'class_obj', 'student']
-    ordering_fields = ['enrolled_at', 'completed_at']
-    ordering = ['-enrolled_at']
     
     def get_queryset(self):
         """Filter theo role"""
@@ -287,11 +298,11 @@ class ClassEnrollmentViewSet(viewsets.ModelViewSet):
                 'class_obj', 'student', 'student__profile'
             )
         
-        # Teacher xem enrollment của lớp mình dạy
-        if hasattr(user, 'profile') and user.profile.role == 'TEACHER':
-            return ClassEnrollment.objects.filter(
-                class_obj__teachers__teacher=user
-            ).distinct().select_related('class_obj', 'student', 'student__profile')
+        # Teacher xem enrollment của lớp mình dạy (EXISTS, không JOIN + DISTINCT)
+        if has_role(user, 'TEACHER'):
+            return ClassEnrollment.objects.filter(Exists(
+                ClassTeacher.objects.filter(class_obj=OuterRef('class_obj'), teacher=user)
+            )).select_related('class_obj', 'student', 'student__profile')
         
         # Student chỉ xem enrollment của chính mình
         return ClassEnrollment.objects.filter(
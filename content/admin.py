@@ -4,20 +4,120 @@ Giao diện quản trị phân cấp: Program -> Subcourse -> Lesson
 Mở rộng: Quản lý Objectives, Models, Preparation, BuildBlocks, 
 ContentBlocks, Attachments, Challenges, Quizzes
 """
+import csv
+
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Q
+from django.http import StreamingHttpResponse
 from django.template.response import TemplateResponse
-from django.utils.html import format_html
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
-    Program, Subcourse, Lesson, UserProgress,
+    Program, Subcourse, Lesson, UserProgress, SubcourseProgress,
     Media, LessonObjective, LessonModel, AssemblyGuide, Preparation,
     BuildBlock, PreparationBuildBlock, LessonContentBlock, LessonAttachment,
     Challenge, Quiz, QuizQuestion, QuestionOption,
-    QuizSubmission, QuizAnswer
+    QuizSubmission, QuizAnswer, LessonSearchDocument, QuizStats
+)
+from .models import _count_subquery
+from .quiz_analytics import get_report, rebuild_analytics
+from .transfer import iter_export
+
+
+def _lesson_count_subquery(model):
+    """Số dòng của model con theo lesson (scalar subquery, tránh JOIN nhiều quan hệ cùng lúc)"""
+    return _count_subquery(model.objects.filter(lesson=OuterRef('pk')), 'lesson')
+
+
+# ============================================================================
+# CHANGELIST FILTERS - Lựa chọn filter theo FK
+# ============================================================================
+
+# Quan hệ cha mà __str__ của model dùng tới (Subcourse: "Program > ...", Lesson: "Subcourse > ...")
+STR_SELECT_RELATED = {
+    Subcourse: ('program',),
+    Lesson: ('subcourse',),
+}
+
+
+class SelectRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Filter theo FK tới Subcourse / Lesson: nạp lựa chọn kèm quan hệ cha trong 1 query"""
+
+    def field_choices(self, field, request, model_admin):
+        queryset = field.related_model._default_manager.complex_filter(
+            field.get_limit_choices_to()
+        ).select_related(*STR_SELECT_RELATED[field.related_model])
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return [(obj.pk, str(obj)) for obj in queryset]
+
+
+admin.FieldListFilter.register(
+    lambda field: field.remote_field is not None and field.related_model in STR_SELECT_RELATED,
+    SelectRelatedFieldListFilter,
+    take_priority=True,
 )
 
 
+# ============================================================================
+# EXPORT - Tải file được stream (không dựng cả file trong bộ nhớ)
+# ============================================================================
+
+QUIZ_SUBMISSION_CSV_COLUMNS = (
+    ('id', 'id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('quiz', 'quiz__title'),
+    ('lesson', 'quiz__lesson__title'),
+    ('attempt_number', 'attempt_number'),
+    ('status', 'status'),
+    ('score', 'score'),
+    ('max_score', 'max_score'),
+    ('percentage', 'percentage'),
+    ('is_passed', 'is_passed'),
+    ('started_at', 'started_at'),
+    ('submitted_at', 'submitted_at'),
+    ('time_spent_seconds', 'time_spent_seconds'),
+)
+
+
+class _Echo:
+    """csv.writer ghi vào đây -> writerow() trả về chính dòng CSV"""
+
+    def write(self, value):
+        return value
+
+
+def _attachment(lines, filename, content_type):
+    response = StreamingHttpResponse((line.encode('utf-8') for line in lines), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_content_response(program_slugs=None, subcourse_ids=None):
+    """File NDJSON cho import_content (xem content/transfer.py)"""
+    filename = f'content-{timezone.now():%Y%m%d-%H%M}.ndjson'
+    return _attachment(iter_export(program_slugs, subcourse_ids), filename, 'application/x-ndjson')
+
+
+def export_quiz_submissions_response(queryset):
+    """File CSV các bài nộp (đọc theo lô bằng .values_list().iterator())"""
+    writer = csv.writer(_Echo())
+    rows = queryset.values_list(*(lookup for _, lookup in QUIZ_SUBMISSION_CSV_COLUMNS)).iterator(chunk_size=2000)
+
+    def lines():
+        # BOM để Excel đọc đúng UTF-8 (tên tiếng Việt)
+        yield '\ufeff' + writer.writerow([name for name, _ in QUIZ_SUBMISSION_CSV_COLUMNS])
+        for row in rows:
+            yield writer.writerow(row)
+
+    filename = f'quiz-submissions-{timezone.now():%Y%m%d-%H%M}.csv'
+    return _attachment(lines(), filename, 'text/csv; charset=utf-8')
+
+
 # ============================================================================
 # INLINE CLASSES - Quản lý phân cấp
 # ============================================================================
@@ -238,6 +338,12 @@ class ProgramAdmin(admin.ModelAdmin):
     list_editable = ['sort_order']
     list_per_page = 20
     ordering = ['sort_order', 'title']
+    actions = ['export_content']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            subcourse_total=_count_subquery(Subcourse.objects.filter(program=OuterRef('pk')), 'program')
+        )
     
     def status_badge(self, obj):
         """Hiển thị trạng thái với màu sắc"""
@@ -256,7 +362,7 @@ class ProgramAdmin(admin.ModelAdmin):
     
     def subcourse_count(self, obj):
         """Hiển thị số lượng khóa con"""
-        count = obj.subcourses.count()
+        count = obj.subcourse_total
         url = reverse('admin:content_subcourse_changelist') + f'?program__id__exact={obj.id}'
         return format_html(
             '<a href="{}">{} khóa con</a>',
@@ -264,6 +370,12 @@ class ProgramAdmin(admin.ModelAdmin):
             count
         )
     subcourse_count.short_description = 'Số khóa con'
+    subcourse_count.admin_order_field = 'subcourse_total'
+    
+    def export_content(self, request, queryset):
+        """Tải cây nội dung của các chương trình đã chọn (NDJSON, dùng với import_content)"""
+        return export_content_response(program_slugs=list(queryset.values_list('slug', flat=True)))
+    export_content.short_description = '📦 Export nội dung (NDJSON)'
 
 
 @admin.register(Subcourse)
@@ -324,6 +436,13 @@ class SubcourseAdmin(admin.ModelAdmin):
     list_editable = ['sort_order']
     list_per_page = 20
     ordering = ['program', 'sort_order', 'title']
+    list_select_related = ['program']
+    actions = ['export_content']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            lesson_total=_count_subquery(Lesson.objects.filter(subcourse=OuterRef('pk')), 'subcourse')
+        )
     
     def status_badge(self, obj):
         """Hiển thị trạng thái với màu sắc"""
@@ -342,7 +461,7 @@ class SubcourseAdmin(admin.ModelAdmin):
     
     def lesson_count(self, obj):
         """Hiển thị số lượng bài học"""
-        count = obj.lessons.count()
+        count = obj.lesson_total
         url = reverse('admin:content_lesson_changelist') + f'?subcourse__id__exact={obj.id}'
         return format_html(
             '<a href="{}">{} bài học</a>',
@@ -350,6 +469,12 @@ class SubcourseAdmin(admin.ModelAdmin):
             count
         )
     lesson_count.short_description = 'Số bài học'
+    lesson_count.admin_order_field = 'lesson_total'
+    
+    def export_content(self, request, queryset):
+        """Tải nội dung của các khóa con đã chọn (NDJSON, dùng với import_content)"""
+        return export_content_response(subcourse_ids=list(queryset.values_list('pk', flat=True)))
+    export_content.short_description = '📦 Export nội dung (NDJSON)'
 
 
 @admin.register(Lesson)
@@ -413,6 +538,17 @@ class LessonAdmin(admin.ModelAdmin):
     list_editable = ['sort_order']
     list_per_page = 30
     ordering = ['subcourse', 'sort_order', 'title']
+    list_select_related = ['subcourse__program']
+
+    def get_queryset(self, request):
+        """Đếm nội dung con cho cột content_summary trong cùng query changelist"""
+        return super().get_queryset(request).annotate(
+            objective_total=_lesson_count_subquery(LessonObjective),
+            model_total=_lesson_count_subquery(LessonModel),
+            content_block_total=_lesson_count_subquery(LessonContentBlock),
+            quiz_total=_lesson_count_subquery(Quiz),
+            challenge_total=_lesson_count_subquery(Challenge),
+        )
     
     def status_badge(self, obj):
         """Hiển thị trạng thái với màu sắc"""
@@ -432,16 +568,16 @@ class LessonAdmin(admin.ModelAdmin):
     def content_summary(self, obj):
         """Hiển thị tóm tắt nội dung"""
         counts = []
-        if obj.objectives.exists():
-            counts.append(f"{obj.objectives.count()} mục tiêu")
-        if obj.models.exists():
-            counts.append(f"{obj.models.count()} mô hình")
-        if obj.content_blocks.exists():
-            counts.append(f"{obj.content_blocks.count()} blocks")
-        if obj.quizzes.exists():
-            counts.append(f"{obj.quizzes.count()} quiz")
-        if obj.challenges.exists():
-            counts.append(f"{obj.challenges.count()} thử thách")
+        if obj.objective_total:
+            counts.append(f"{obj.objective_total} mục tiêu")
+        if obj.model_total:
+            counts.append(f"{obj.model_total} mô hình")
+        if obj.content_block_total:
+            counts.append(f"{obj.content_block_total} blocks")
+        if obj.quiz_total:
+            counts.append(f"{obj.quiz_total} quiz")
+        if obj.challenge_total:
+            counts.append(f"{obj.challenge_total} thử thách")
         
         if counts:
             return format_html('<small>{}</small>', ' | '.join(counts))
@@ -483,6 +619,7 @@ class UserProgressAdmin(admin.ModelAdmin):
     
     list_per_page = 50
     ordering = ['-created_at']
+    list_select_related = ['user', 'lesson__subcourse']
     
     # Readonly fields
     readonly_fields = ['created_at', 'updated_at']
@@ -517,6 +654,49 @@ class UserProgressAdmin(admin.ModelAdmin):
     completion_badge.short_description = 'Trạng thái'
 
 
+@admin.register(SubcourseProgress)
+class SubcourseProgressAdmin(admin.ModelAdmin):
+    """
+    Admin cho SubcourseProgress (Tổng hợp tiến độ)
+    Chỉ xem - dữ liệu được cập nhật tự động từ UserProgress
+    Rebuild: python manage.py rebuild_progress_summaries
+    """
+    list_display = [
+        'user',
+        'subcourse',
+        'completed_lessons',
+        'total_lessons',
+        'completion_percentage',
+        'last_activity_at',
+    ]
+    list_filter = ['subcourse__program', 'subcourse']
+    search_fields = ['user__username', 'subcourse__title']
+    list_select_related = ['user', 'subcourse__program']
+    readonly_fields = [
+        'user', 'subcourse', 'completed_lessons', 'total_lessons',
+        'last_activity_at', 'updated_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(LessonSearchDocument)
+class LessonSearchDocumentAdmin(admin.ModelAdmin):
+    """
+    Admin cho LessonSearchDocument (Index tìm kiếm)
+    Chỉ xem - được cập nhật tự động khi nội dung bài học thay đổi
+    Rebuild: python manage.py rebuild_search_index
+    """
+    list_display = ['lesson', 'title', 'term_count', 'indexed_at']
+    search_fields = ['lesson__title', 'lesson__slug']
+    list_select_related = ['lesson', 'lesson__subcourse']
+    readonly_fields = ['lesson', 'title', 'body', 'content_hash', 'term_count', 'indexed_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
 # ============================================================================
 # EXPANDED CONTENT ADMIN CLASSES
 # ============================================================================
@@ -617,6 +797,7 @@ class LessonObjectiveAdmin(admin.ModelAdmin):
     
     list_per_page = 50
     ordering = ['lesson', 'objective_type', 'order']
+    list_select_related = ['lesson__subcourse']
     
     def objective_type_badge(self, obj):
         """Hiển thị loại mục tiêu với màu sắc"""
@@ -678,6 +859,10 @@ class LessonModelAdmin(admin.ModelAdmin):
     
     list_per_page = 30
     ordering = ['lesson', 'order']
+    list_select_related = ['lesson__subcourse']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
     
     def description_preview(self, obj):
         """Hiển thị mô tả rút gọn"""
@@ -689,9 +874,10 @@ class LessonModelAdmin(admin.ModelAdmin):
     
     def media_count(self, obj):
         """Số lượng media"""
-        count = obj.media.count()
+        count = obj.media_total
         return format_html('<strong>{}</strong> media', count)
     media_count.short_description = 'Media'
+    media_count.admin_order_field = 'media_total'
 
 
 class PreparationBuildBlockInline(admin.TabularInline):
@@ -732,12 +918,17 @@ class PreparationAdmin(admin.ModelAdmin):
     
     list_per_page = 30
     ordering = ['lesson']
+    list_select_related = ['lesson__subcourse']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(build_block_total=Count('build_blocks'))
     
     def build_blocks_count(self, obj):
         """Số lượng build blocks"""
-        count = obj.build_blocks.count()
+        count = obj.build_block_total
         return format_html('<strong>{}</strong> blocks', count)
     build_blocks_count.short_description = 'Build Blocks'
+    build_blocks_count.admin_order_field = 'build_block_total'
 
 
 @admin.register(BuildBlock)
@@ -771,6 +962,7 @@ class BuildBlockAdmin(admin.ModelAdmin):
     
     list_per_page = 30
     ordering = ['program', 'order']
+    list_select_related = ['program']
     
     def pdf_badge(self, obj):
         """Hiển thị badge nếu có PDF"""
@@ -827,6 +1019,10 @@ class LessonContentBlockAdmin(admin.ModelAdmin):
     
     list_per_page = 30
     ordering = ['lesson', 'order']
+    list_select_related = ['lesson__subcourse']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
     
     def content_type_badge(self, obj):
         """Hiển thị loại nội dung"""
@@ -848,11 +1044,12 @@ class LessonContentBlockAdmin(admin.ModelAdmin):
     
     def media_count(self, obj):
         """Số lượng media"""
-        count = obj.media.count()
+        count = obj.media_total
         if count > 0:
             return format_html('<strong>{}</strong> media', count)
         return '-'
     media_count.short_description = 'Media'
+    media_count.admin_order_field = 'media_total'
 
 
 @admin.register(LessonAttachment)
@@ -892,6 +1089,7 @@ class LessonAttachmentAdmin(admin.ModelAdmin):
     
     list_per_page = 50
     ordering = ['lesson', 'order']
+    list_select_related = ['lesson__subcourse']
     
     def file_type_badge(self, obj):
         """Hiển thị loại file với icon"""
@@ -971,15 +1169,20 @@ class AssemblyGuideAdmin(admin.ModelAdmin):
     
     list_per_page = 30
     ordering = ['lesson', 'id']
+    list_select_related = ['lesson__subcourse']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
     
     def media_count(self, obj):
         """Hiển thị số lượng media"""
-        count = obj.media.count()
+        count = obj.media_total
         return format_html(
             '<span style="background-color: #E7F3FF; padding: 3px 8px; border-radius: 3px; font-weight: bold;">{} ảnh</span>',
             count
         )
     media_count.short_description = 'Media'
+    media_count.admin_order_field = 'media_total'
     
     def pdf_status(self, obj):
         """Hiển thị trạng thái PDF"""
@@ -1037,6 +1240,10 @@ class ChallengeAdmin(admin.ModelAdmin):
     
     list_per_page = 30
     ordering = ['lesson', 'order']
+    list_select_related = ['lesson__subcourse']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
     
     def difficulty_badge(self, obj):
         """Hiển thị độ khó với màu sắc"""
@@ -1071,11 +1278,12 @@ class ChallengeAdmin(admin.ModelAdmin):
     
     def media_count(self, obj):
         """Số lượng media"""
-        count = obj.media.count()
+        count = obj.media_total
         if count > 0:
             return format_html('<strong>{}</strong> media', count)
         return '-'
     media_count.short_description = 'Media'
+    media_count.admin_order_field = 'media_total'
 
 
 @admin.register(Quiz)
@@ -1121,6 +1329,10 @@ class QuizAdmin(admin.ModelAdmin):
     
     list_per_page = 30
     ordering = ['lesson', 'order']
+    list_select_related = ['lesson__subcourse']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(question_total=Count('questions'))
     
     def quiz_type_badge(self, obj):
         """Hiển thị loại quiz"""
@@ -1140,9 +1352,10 @@ class QuizAdmin(admin.ModelAdmin):
     
     def question_count(self, obj):
         """Số lượng câu hỏi"""
-        count = obj.questions.count()
+        count = obj.question_total
         return format_html('<strong>{}</strong> câu', count)
     question_count.short_description = 'Câu hỏi'
+    question_count.admin_order_field = 'question_total'
     
     def status_badge(self, obj):
         """Hiển thị trạng thái"""
@@ -1196,6 +1409,13 @@ class QuizQuestionAdmin(admin.ModelAdmin):
     
     list_per_page = 50
     ordering = ['quiz', 'order']
+    list_select_related = ['quiz__lesson']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            option_total=Count('options'),
+            correct_option_total=Count('options', filter=Q(options__is_correct=True)),
+        )
     
     def question_preview(self, obj):
         """Hiển thị câu hỏi rút gọn"""
@@ -1223,15 +1443,14 @@ class QuizQuestionAdmin(admin.ModelAdmin):
     def option_count(self, obj):
         """Số lượng lựa chọn"""
         if obj.question_type in ['single', 'multiple']:
-            count = obj.options.count()
-            correct = obj.options.filter(is_correct=True).count()
             return format_html(
                 '<strong>{}</strong> options ({} đúng)',
-                count,
-                correct
+                obj.option_total,
+                obj.correct_option_total
             )
         return '-'
     option_count.short_description = 'Lựa chọn'
+    option_count.admin_order_field = 'option_total'
 
 
 @admin.register(QuestionOption)
@@ -1256,6 +1475,7 @@ class QuestionOptionAdmin(admin.ModelAdmin):
     
     list_per_page = 100
     ordering = ['question', 'order']
+    list_select_related = ['question']
     
     def option_text_preview(self, obj):
         """Hiển thị text rút gọn"""
@@ -1324,16 +1544,18 @@ class QuizSubmissionAdmin(admin.ModelAdmin):
     
     list_per_page = 50
     ordering = ['-submitted_at']
+    list_select_related = ['user', 'quiz__lesson']
     date_hierarchy = 'submitted_at'
+    actions = ['export_csv']
     
     def score_display(self, obj):
         """Hiển thị điểm số"""
         if obj.score is not None and obj.max_score:
             return format_html(
-                '<strong>{}</strong>/{} ({:.0f}%)',
+                '<strong>{}</strong>/{} ({}%)',
                 obj.score,
                 obj.max_score,
-                obj.percentage or 0
+                f'{obj.percentage or 0:.0f}'
             )
         return '-'
     score_display.short_description = 'Điểm'
@@ -1344,6 +1566,11 @@ class QuizSubmissionAdmin(admin.ModelAdmin):
             return format_html('<span style="color: green; font-weight: bold;">✓ Đạt</span>')
         return format_html('<span style="color: red;">✗ Chưa đạt</span>')
     is_passed_badge.short_description = 'Kết quả'
+    
+    def export_csv(self, request, queryset):
+        """Tải các bài nộp đã chọn dạng CSV"""
+        return export_quiz_submissions_response(queryset)
+    export_csv.short_description = '📥 Export CSV các bài nộp đã chọn'
 
 
 @admin.register(QuizAnswer)
@@ -1379,6 +1606,7 @@ class QuizAnswerAdmin(admin.ModelAdmin):
     
     list_per_page = 100
     ordering = ['quiz_submission', 'question']
+    list_select_related = ['quiz_submission__user', 'quiz_submission__quiz__lesson', 'question']
     
     def answer_preview(self, obj):
         """Hiển thị câu trả lời"""
@@ -1400,6 +1628,88 @@ class QuizAnswerAdmin(admin.ModelAdmin):
     is_correct_badge.short_description = 'Kết quả'
 
 
+@admin.register(QuizStats)
+class QuizStatsAdmin(admin.ModelAdmin):
+    """
+    Admin cho QuizStats (Thống kê quiz)
+    Chỉ xem - cộng dồn khi chấm bài, trang chi tiết chỉ đọc bảng tổng hợp (không quét QuizAnswer)
+    Rebuild: python manage.py rebuild_quiz_analytics
+    """
+    list_display = [
+        'quiz',
+        'submission_count',
+        'pass_rate_display',
+        'average_percentage_display',
+        'updated_at',
+    ]
+    list_filter = ['quiz__lesson__subcourse__program']
+    search_fields = ['quiz__title', 'quiz__lesson__title']
+    list_select_related = ['quiz__lesson']
+    readonly_fields = [
+        'quiz', 'submission_count', 'passed_count', 'pass_rate_display',
+        'average_percentage_display', 'updated_at', 'histogram_display', 'questions_display',
+    ]
+    exclude = ['percentage_sum']
+    ordering = ['-submission_count']
+    actions = ['rebuild_selected']
+
+    def has_add_permission(self, request):
+        return False
+
+    def pass_rate_display(self, obj):
+        return f'{obj.pass_rate}% (đạt {obj.quiz.passing_score}%)'
+    pass_rate_display.short_description = 'Tỉ lệ đạt'
+
+    def average_percentage_display(self, obj):
+        return f'{obj.average_percentage}%'
+    average_percentage_display.short_description = 'Điểm trung bình'
+
+    def _report(self, obj):
+        # Dùng chung cho 2 field chỉ đọc của trang chi tiết
+        if getattr(obj, '_report', None) is None:
+            obj._report = get_report(obj)
+        return obj._report
+
+    def histogram_display(self, obj):
+        """Phân bố điểm theo khoảng 10%"""
+        histogram = self._report(obj)['histogram']
+        peak = max((row['count'] for row in histogram), default=0) or 1
+        return format_html(
+            '<table>{}</table>',
+            format_html_join('', '<tr><td>{}–{}%</td><td><div style="background: #417690; height: 12px; width: {}px;"></div></td><td>{}</td></tr>', (
+                (row['from'], row['to'], round(row['count'] / peak * 200), row['count'])
+                for row in histogram
+            ))
+        )
+    histogram_display.short_description = 'Phân bố điểm'
+
+    def questions_display(self, obj):
+        """Tỉ lệ đúng từng câu và tỉ lệ chọn từng lựa chọn (✓ = đáp án đúng)"""
+        rows = []
+        for question in self._report(obj)['questions']:
+            rows.append(format_html(
+                '<tr><td><strong>Q{}</strong> {}</td><td><strong>{}%</strong> đúng ({}/{}), bỏ qua {}</td></tr>',
+                question['order'], question['question_text'][:80], question['correct_rate'],
+                question['correct_count'], question['answer_count'], question['skipped_count'],
+            ))
+            rows.extend(
+                format_html(
+                    '<tr><td style="padding-left: 24px;">{} {}</td><td>{}% ({})</td></tr>',
+                    '✓' if option['is_correct'] else '·', option['option_text'][:80],
+                    option['pick_rate'], option['pick_count'],
+                )
+                for option in question['options']
+            )
+        return format_html('<table>{}</table>', mark_safe(''.join(rows)))
+    questions_display.short_description = 'Câu hỏi'
+
+    def rebuild_selected(self, request, queryset):
+        """Tính lại thống kê các quiz đã chọn từ bài nộp"""
+        quiz_count, submission_count = rebuild_analytics(list(queryset.values_list('quiz_id', flat=True)))
+        self.message_user(request, f'Đã tính lại thống kê {quiz_count} quiz ({submission_count} bài nộp)')
+    rebuild_selected.short_description = '🔄 Tính lại thống kê các quiz đã chọn'
+
+
 # ============================================================================
 # TUỲ CHỈNH ADMIN SITE - Tách thành các nhóm quản lý
 # ============================================================================
@@ -1424,7 +1734,7 @@ CONTENT_DETAIL_MODELS_ORDER = {
 
 CONTENT_DETAIL_MODELS = list(CONTENT_DETAIL_MODELS_ORDER.keys())
 
-OTHER_MODELS = ['media', 'userprogress', 'quizsubmission', 'quizanswer']
+OTHER_MODELS = ['media', 'userprogress', 'quizsubmission', 'quizanswer', 'quizstats']
 
 
 # Lưu lại method gốc trước khi override
@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class ContentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'content'
-    verbose_name = 'Quản lý Nội dung Học tập'
\ No newline at end of file
+    verbose_name = 'Quản lý Nội dung Học tập'
+
+    def ready(self):
+        # Đăng ký signals (vô hiệu hóa cache khi nội dung thay đổi)
+        from . import signals  # noqa: F401
@@ -0,0 +1,358 @@
+"""
+Vòng đời một lần làm Quiz (Quiz Attempt): start -> autosave -> submit
+- start: giữ chỗ attempt_number kế tiếp (unique (quiz, user, attempt_number), trùng -> thử lại),
+  chặn khi đã dùng hết max_attempts; đang có lần làm dở còn hạn -> trả lại lần đó (resume)
+- autosave: lô nhỏ câu trả lời được upsert vào QuizAnswerDraft (1 câu lệnh / lô, theo (bài nộp, câu hỏi)),
+  thông tin lần làm bài (user, quiz, hạn nộp) đọc từ cache -> không đọc DB
+- submit: khóa submission, gộp bản nháp + câu trả lời gửi kèm, chấm bằng QuizGrader, bulk insert QuizAnswer,
+  xóa bản nháp, sau commit cộng kết quả vào bảng thống kê (content/quiz_analytics.py)
+- Hết giờ (time_limit_minutes + GRACE_SECONDS): không nhận thêm câu trả lời,
+  bài được chấm từ bản nháp khi nộp hoặc bởi: python manage.py expire_quiz_attempts (chấm hàng loạt)
+
+Câu trả lời chỉ nằm trong DB: cache bị xóa / evict chỉ làm autosave đọc lại meta từ DB, không mất bài
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
+
+from . import quiz_analytics, quiz_cache
+from .grading import QuizGrader, next_attempt_number, normalize_answer
+from .models import Quiz, QuizSubmission, QuizAnswer, QuizAnswerDraft
+
+
+KEY_PREFIX = 'quiz_attempt'
+# Bù trễ mạng cho lần autosave / nộp bài sát giờ
+GRACE_SECONDS = 30
+AUTOSAVE_MAX_ANSWERS = 50
+# Meta chỉ để autosave khỏi đọc DB, miss -> đọc lại từ QuizSubmission
+META_TIMEOUT = 60 * 60 * 24
+SWEEP_BATCH_SIZE = 500
+MAX_ATTEMPT_RETRIES = 3
+
+GRADED_FIELDS = [
+    'score', 'max_score', 'percentage', 'is_passed', 'status',
+    'submitted_at', 'time_spent_seconds', 'updated_at',
+]
+
+
+class AttemptError(Exception):
+    """Không thể bắt đầu / lưu / nộp lần làm bài (status_code: HTTP status cho API)"""
+
+    def __init__(self, message, status_code=400, **details):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.details = details
+
+
+def _meta_key(submission_id):
+    return f'{KEY_PREFIX}:{submission_id}:meta'
+
+
+def get_deadline(started_at, time_limit_minutes):
+    """Hạn nộp (None nếu quiz không giới hạn thời gian)"""
+    if not time_limit_minutes:
+        return None
+    return started_at + timedelta(minutes=time_limit_minutes)
+
+
+def is_late(deadline, now):
+    return deadline is not None and now > deadline + timedelta(seconds=GRACE_SECONDS)
+
+
+def _submission_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise AttemptError('Không tìm thấy lần làm bài', status_code=404)
+
+
+def remaining_seconds(deadline, now=None):
+    if deadline is None:
+        return None
+    return max(int((deadline - (now or timezone.now())).total_seconds()), 0)
+
+
+# ============================================================================
+# START
+# ============================================================================
+
+def _set_meta(submission, quiz):
+    """Thông tin tối thiểu để autosave không cần đọc DB"""
+    cache.set(_meta_key(submission.id), {
+        'user_id': submission.user_id,
+        'quiz_id': quiz.id,
+        'quiz_version': quiz.content_version,
+        'deadline': get_deadline(submission.started_at, quiz.time_limit_minutes),
+    }, META_TIMEOUT)
+
+
+def start_attempt(quiz, user):
+    """
+    Bắt đầu (hoặc tiếp tục) lần làm bài của user
+    Trả về (submission, created)
+    """
+    now = timezone.now()
+    for retry in range(MAX_ATTEMPT_RETRIES):
+        current = QuizSubmission.objects.filter(
+            quiz=quiz, user=user, status='in_progress'
+        ).order_by('-attempt_number').first()
+        if current is not None:
+            if not is_late(get_deadline(current.started_at, quiz.time_limit_minutes), now):
+                _set_meta(current, quiz)
+                return current, False
+            # Lần làm dở đã hết giờ: chấm từ bản nháp trước khi mở lần mới
+            expire_attempts(submission_ids=[current.id], now=now)
+
+        attempt_number = next_attempt_number(quiz, user)
+        if attempt_number > quiz.max_attempts:
+            raise AttemptError(
+                f'Đã dùng hết {quiz.max_attempts} lần làm bài',
+                status_code=403,
+                max_attempts=quiz.max_attempts,
+            )
+        try:
+            with transaction.atomic():
+                submission = QuizSubmission.objects.create(
+                    quiz=quiz, user=user, attempt_number=attempt_number, status='in_progress'
+                )
+        except IntegrityError:
+            # Request start khác của cùng user vừa giữ attempt_number này -> dùng lại lần đó
+            if retry == MAX_ATTEMPT_RETRIES - 1:
+                raise
+            continue
+        _set_meta(submission, quiz)
+        return submission, True
+
+
+# ============================================================================
+# AUTOSAVE (bản nháp QuizAnswerDraft)
+# ============================================================================
+
+def _get_meta(submission_id, user):
+    meta = cache.get(_meta_key(submission_id))
+    if meta is None:
+        row = QuizSubmission.objects.filter(pk=submission_id).values(
+            'user_id', 'quiz_id', 'status', 'started_at', 'quiz__time_limit_minutes', 'quiz__content_version'
+        ).first()
+        if row is None or row['user_id'] != user.id:
+            raise AttemptError('Không tìm thấy lần làm bài', status_code=404)
+        if row['status'] != 'in_progress':
+            raise AttemptError('Lần làm bài đã được nộp', status_code=409)
+        meta = {
+            'user_id': row['user_id'],
+            'quiz_id': row['quiz_id'],
+            'quiz_version': row['quiz__content_version'],
+            'deadline': get_deadline(row['started_at'], row['quiz__time_limit_minutes']),
+        }
+        cache.set(_meta_key(submission_id), meta, META_TIMEOUT)
+    if meta['user_id'] != user.id:
+        raise AttemptError('Không tìm thấy lần làm bài', status_code=404)
+    return meta
+
+
+def autosave(submission_id, user, answers_data):
+    """
+    Lưu tạm một lô câu trả lời (ghi đè theo câu hỏi): 1 câu lệnh upsert, meta còn trong cache -> không đọc DB
+    Câu hỏi không thuộc quiz bị bỏ qua
+    Trả về {'saved': số câu, 'remaining_seconds': ...}
+    """
+    if not isinstance(answers_data, list) or not answers_data:
+        raise AttemptError('answers phải là danh sách không rỗng')
+    if len(answers_data) > AUTOSAVE_MAX_ANSWERS:
+        raise AttemptError(f'Tối đa {AUTOSAVE_MAX_ANSWERS} câu trả lời mỗi lần lưu')
+
+    submission_id = _submission_id(submission_id)
+    meta = _get_meta(submission_id, user)
+    now = timezone.now()
+    if is_late(meta['deadline'], now):
+        raise AttemptError('Đã hết giờ làm bài', status_code=409)
+
+    questions = quiz_cache.get_answer_key(
+        Quiz(pk=meta['quiz_id'], content_version=meta['quiz_version'])
+    ).questions
+    drafts = {}
+    for answer_data in answers_data:
+        normalized = normalize_answer(answer_data)
+        if normalized is None or normalized[0] not in questions:
+            continue
+        question_id, option_ids, answer_text = normalized
+        drafts[question_id] = QuizAnswerDraft(
+            quiz_submission_id=submission_id,
+            question_id=question_id,
+            selected_option_ids=option_ids,
+            answer_text=answer_text,
+        )
+    _upsert_drafts(list(drafts.values()))
+    return {'saved': len(drafts), 'remaining_seconds': remaining_seconds(meta['deadline'], now)}
+
+
+def _upsert_drafts(drafts):
+    """INSERT ... ON DUPLICATE KEY UPDATE (MySQL) / ON CONFLICT (SQLite, PostgreSQL)"""
+    if not drafts:
+        return
+    options = {'update_conflicts': True, 'update_fields': ['selected_option_ids', 'answer_text', 'updated_at']}
+    if connection.features.supports_update_conflicts_with_target:
+        options['unique_fields'] = ['quiz_submission', 'question']
+    QuizAnswerDraft.objects.bulk_create(drafts, **options)
+
+
+def get_draft_answers(submissions):
+    """{submission_id: [answer_data]} từ bản nháp (1 query cho cả lô)"""
+    drafts = {submission.id: [] for submission in submissions}
+    rows = QuizAnswerDraft.objects.filter(quiz_submission_id__in=list(drafts)).values_list(
+        'quiz_submission_id', 'question_id', 'selected_option_ids', 'answer_text'
+    )
+    for submission_id, question_id, option_ids, answer_text in rows:
+        drafts[submission_id].append({
+            'question_id': question_id,
+            'selected_option_ids': option_ids,
+            'answer_text': answer_text,
+        })
+    return drafts
+
+
+def _delete_drafts(submissions):
+    """Xóa bản nháp đã chấm (trong transaction chấm bài), meta trong cache xóa sau commit"""
+    submission_ids = [submission.id for submission in submissions]
+    QuizAnswerDraft.objects.filter(quiz_submission_id__in=submission_ids).delete()
+    transaction.on_commit(lambda: cache.delete_many([_meta_key(submission_id) for submission_id in submission_ids]))
+
+
+# ============================================================================
+# SUBMIT / EXPIRE
+# ============================================================================
+
+def _grade(submission, grader, answers_data, submitted_at, now):
+    """Chấm và ghi kết quả vào submission (chưa save), trả về QuizAnswer chưa lưu"""
+    answers = grader.grade(answers_data)
+    grader.apply_result(submission, answers)
+    submission.submitted_at = submitted_at
+    submission.time_spent_seconds = max(int((submitted_at - submission.started_at).total_seconds()), 0)
+    submission.updated_at = now
+    for answer in answers:
+        answer.quiz_submission = submission
+    return answers
+
+
+def submit_attempt(submission_id, user, answers_data=None):
+    """
+    Nộp lần làm bài: bản nháp + answers_data (câu gửi kèm ghi đè bản nháp)
+    Nộp trễ quá hạn: chỉ chấm phần đã lưu trước hạn, thời điểm nộp tính bằng hạn nộp
+    """
+    submission_id = _submission_id(submission_id)
+    now = timezone.now()
+    with transaction.atomic():
+        submission = QuizSubmission.objects.select_for_update().filter(pk=submission_id, user=user).first()
+        if submission is None:
+            raise AttemptError('Không tìm thấy lần làm bài', status_code=404)
+        if submission.status != 'in_progress':
+            raise AttemptError('Lần làm bài đã được nộp', status_code=409)
+
+        quiz = Quiz.objects.get(pk=submission.quiz_id)
+        submission.quiz = quiz
+        submission.user = user
+        grader = QuizGrader(quiz)
+        answers_data_all = get_draft_answers([submission])[submission.id]
+
+        deadline = get_deadline(submission.started_at, quiz.time_limit_minutes)
+        submitted_at = now
+        if is_late(deadline, now):
+            submitted_at = deadline
+        elif answers_data:
+            answers_data_all.extend(answers_data)
+
+        answers = _grade(submission, grader, answers_data_all, submitted_at, now)
+        submission.save(update_fields=GRADED_FIELDS)
+        QuizAnswer.objects.bulk_create(answers)
+        _delete_drafts([submission])
+        transaction.on_commit(lambda: quiz_analytics.record_submissions([submission], answers))
+
+    # Nạp lại answers (kèm question) để serialize trong 1 query
+    prefetch_related_objects(
+        [submission],
+        Prefetch('answers', queryset=QuizAnswer.objects.select_related('question'))
+    )
+    return submission
+
+
+def submit_quiz(quiz, user, answers_data):
+    """
+    Nộp bài 1 bước (POST /quizzes/{id}/submit/): start (hoặc tiếp tục lần đang làm) + submit
+    Quiz có time_limit_minutes: phải có lần làm dở bắt đầu qua /start/ (đề đọc được mà không cần start
+    -> start ngay lúc nộp sẽ bỏ qua giới hạn thời gian), không có -> 409
+    """
+    if quiz.time_limit_minutes:
+        submission_id = QuizSubmission.objects.filter(
+            quiz=quiz, user=user, status='in_progress'
+        ).order_by('-attempt_number').values_list('pk', flat=True).first()
+        if submission_id is None:
+            raise AttemptError(
+                'Bài kiểm tra có giới hạn thời gian: cần bắt đầu làm bài (start) trước khi nộp',
+                status_code=409,
+                time_limit_minutes=quiz.time_limit_minutes,
+            )
+        return submit_attempt(submission_id, user, answers_data)
+
+    submission, _ = start_attempt(quiz, user)
+    return submit_attempt(submission.id, user, answers_data)
+
+
+def due_attempt_ids(now=None):
+    """Id các lần làm dở đã quá time_limit_minutes + GRACE_SECONDS (1 query cho mỗi mức giới hạn thời gian)"""
+    now = now or timezone.now()
+    limits = Quiz.objects.filter(
+        time_limit_minutes__isnull=False, submissions__status='in_progress'
+    ).values_list('time_limit_minutes', flat=True).distinct()
+    ids = []
+    for limit in limits:
+        cutoff = now - timedelta(minutes=limit, seconds=GRACE_SECONDS)
+        ids.extend(QuizSubmission.objects.filter(
+            status='in_progress', quiz__time_limit_minutes=limit, started_at__lt=cutoff
+        ).order_by('pk').values_list('pk', flat=True))
+    return ids
+
+
+def expire_attempts(submission_ids=None, now=None, dry_run=False):
+    """
+    Chấm hàng loạt các lần làm đã hết giờ từ bản nháp (theo lô SWEEP_BATCH_SIZE)
+    Mỗi lô: khóa submissions, nạp đề 1 lần / quiz, 1 query bản nháp, bulk_update + bulk_create
+    Trả về số lần làm đã chấm
+    """
+    now = now or timezone.now()
+    if submission_ids is None:
+        submission_ids = due_attempt_ids(now)
+    if dry_run:
+        return len(submission_ids)
+
+    total = 0
+    for start in range(0, len(submission_ids), SWEEP_BATCH_SIZE):
+        total += _expire_batch(submission_ids[start:start + SWEEP_BATCH_SIZE], now)
+    return total
+
+
+def _expire_batch(submission_ids, now):
+    with transaction.atomic():
+        submissions = list(QuizSubmission.objects.select_for_update().filter(
+            pk__in=submission_ids, status='in_progress'
+        ))
+        if not submissions:
+            return 0
+        quizzes = Quiz.objects.in_bulk({submission.quiz_id for submission in submissions})
+        graders = {quiz_id: QuizGrader(quiz) for quiz_id, quiz in quizzes.items()}
+        drafts = get_draft_answers(submissions)
+
+        answers = []
+        for submission in submissions:
+            quiz = quizzes[submission.quiz_id]
+            deadline = get_deadline(submission.started_at, quiz.time_limit_minutes) or now
+            answers.extend(_grade(submission, graders[quiz.id], drafts[submission.id], min(deadline, now), now))
+
+        QuizSubmission.objects.bulk_update(submissions, GRADED_FIELDS, batch_size=SWEEP_BATCH_SIZE)
+        QuizAnswer.objects.bulk_create(answers, batch_size=1000)
+        _delete_drafts(submissions)
+        transaction.on_commit(lambda: quiz_analytics.record_submissions(submissions, answers))
+    return len(submissions)
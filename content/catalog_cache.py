@@ -0,0 +1,145 @@
+"""
+Cache response cho các endpoint catalog công khai (Program / Subcourse / Lesson list)
+- Key: path + query string + catalog version
+- ETag / Last-Modified (thời điểm bump_version gần nhất) tính 1 lần khi ghi cache
+- If-None-Match / If-Modified-Since khớp -> 304 (không chạm DB khi cache hit)
+  If-None-Match so sánh weak (bỏ W/): CompressionMiddleware đổi ETag thành W/"..." khi nén body
+- Program / Subcourse / Lesson thay đổi -> tăng catalog version (xem content/signals.py)
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.response import Response
+
+
+KEY_PREFIX = 'catalog'
+CACHE_TIMEOUT = 60 * 60
+# Trình duyệt dùng lại response trong max-age, sau đó revalidate bằng ETag
+CLIENT_MAX_AGE = 60
+
+
+def _version_key():
+    return f'{KEY_PREFIX}:version'
+
+
+def _modified_key():
+    return f'{KEY_PREFIX}:modified'
+
+
+def get_version():
+    return cache.get_or_set(_version_key(), 1, None)
+
+
+def bump_version():
+    """
+    Vô hiệu hóa toàn bộ response catalog đã cache
+    Ghi lại thời điểm thay đổi -> Last-Modified đổi cả khi dòng bị xóa (max(updated_at) không đổi)
+    """
+    # Luôn tăng (kể cả 2 lần bump trong cùng 1 giây) -> If-Modified-Since cũ không còn khớp
+    previous = cache.get(_modified_key()) or 0
+    cache.set(_modified_key(), max(int(time.time()), previous + 1), None)
+    try:
+        cache.incr(_version_key())
+    except ValueError:
+        cache.set(_version_key(), 2, None)
+
+
+def _response_key(request, version):
+    path_hash = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{version}:response:{path_hash}'
+
+
+def _last_modified():
+    """
+    Thời điểm thay đổi gần nhất của catalog (timestamp), ghi bởi bump_version()
+    Chưa có (cache mới) -> khởi tạo từ max updated_at của Program, Subcourse, Lesson
+    """
+    last_modified = cache.get(_modified_key())
+    if last_modified is not None:
+        return last_modified
+
+    from .models import Program, Subcourse, Lesson
+    timestamps = [
+        model.objects.aggregate(last=Max('updated_at'))['last']
+        for model in (Program, Subcourse, Lesson)
+    ]
+    timestamps = [timestamp for timestamp in timestamps if timestamp]
+    if not timestamps:
+        return None
+    last_modified = int(max(timestamps).timestamp())
+    # add: không ghi đè mốc vừa được bump_version() ghi ở process khác
+    cache.add(_modified_key(), last_modified, None)
+    return cache.get(_modified_key(), last_modified)
+
+
+def _is_not_modified(request, entry):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        # So sánh weak (bỏ tiền tố W/) như ConditionalGetMiddleware
+        etags = [etag.removeprefix('W/') for etag in parse_etags(if_none_match)]
+        return entry['etag'] in etags or '*' in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+    if if_modified_since and entry['last_modified']:
+        return entry['last_modified'] <= if_modified_since
+    return False
+
+
+def _apply_headers(response, entry):
+    response['ETag'] = entry['etag']
+    if entry['last_modified']:
+        response['Last-Modified'] = http_date(entry['last_modified'])
+    patch_cache_control(response, public=True, max_age=CLIENT_MAX_AGE)
+    return response
+
+
+def cached_response(request, render):
+    """
+    Trả response từ cache hoặc gọi render() (trả về Response của DRF) rồi cache lại
+    Chỉ cache response 200
+    """
+    version = get_version()
+    key = _response_key(request, version)
+    entry = cache.get(key)
+
+    if entry is None:
+        response = render()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        entry = {
+            'data': response.data,
+            'etag': quote_etag(f'{version}-{key.rsplit(":", 1)[-1][:16]}'),
+            'last_modified': _last_modified(),
+        }
+        cache.set(key, entry, CACHE_TIMEOUT)
+    else:
+        response = None
+
+    if _is_not_modified(request, entry):
+        return _apply_headers(Response(status=status.HTTP_304_NOT_MODIFIED), entry)
+    if response is None:
+        response = Response(entry['data'])
+    return _apply_headers(response, entry)
+
+
+class CatalogCacheMixin:
+    """
+    Mixin cho ViewSet catalog read-only
+    cached_actions: các action được cache (mặc định chỉ 'list')
+    Chỉ áp dụng cho GET và dữ liệu không phụ thuộc user
+    """
+    cached_actions = ('list',)
+
+    def list(self, request, *args, **kwargs):
+        if 'list' not in self.cached_actions:
+            return super().list(request, *args, **kwargs)
+        return cached_response(request, lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' not in self.cached_actions:
+            return super().retrieve(request, *args, **kwargs)
+        return cached_response(request, lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs))
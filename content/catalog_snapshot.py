@@ -0,0 +1,211 @@
+"""
+Snapshot tĩnh của catalog công khai cho frontend (1 file thay cho hàng chục request API)
+- Toàn bộ Program / Subcourse / Lesson (outline) đã publish trong 1 JSON, cùng định dạng field với API
+- content_hash = sha256 của nội dung (không gồm generated_at) -> ETag, tên file
+- Ghi sẵn bản nén gzip và brotli (nếu cài package brotli) vào CATALOG_SNAPSHOT['ROOT']
+- manifest.json trỏ tới snapshot hiện tại, được ký (django.core.signing) -> file manifest bị sửa tay bị bỏ qua
+- Program / Subcourse / Lesson thay đổi -> catalog version tăng (content/signals.py)
+  -> snapshot được dựng lại ở request kế tiếp hoặc bằng: python manage.py build_catalog_snapshot
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+try:
+    import brotli
+except ImportError:  # brotli là dependency tùy chọn
+    brotli = None
+
+from . import catalog_cache
+from .fast_serializers import LessonListValuesSerializer, SubcourseListValuesSerializer
+from .models import Program, Subcourse, Lesson
+from .serializers import ProgramListSerializer
+
+
+SCHEMA_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+SIGNING_SALT = 'content.catalog_snapshot'
+# Số snapshot cũ giữ lại trên đĩa (client đang tải dở vẫn đọc được)
+KEEP_SNAPSHOTS = 3
+BUILD_LOCK_KEY = f'{catalog_cache.KEY_PREFIX}:snapshot:lock'
+BUILD_LOCK_TIMEOUT = 60
+CLIENT_MAX_AGE = catalog_cache.CLIENT_MAX_AGE
+
+# Content-Encoding -> phần mở rộng file
+ENCODINGS = {'br': '.br', 'gzip': '.gz', 'identity': ''}
+
+
+def get_root():
+    return str(getattr(settings, 'CATALOG_SNAPSHOT', {}).get(
+        'ROOT', os.path.join(settings.BASE_DIR, 'catalog_snapshots')
+    ))
+
+
+def _dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# ============================================================================
+# DỰNG NỘI DUNG
+# ============================================================================
+
+def build_catalog():
+    """Program -> subcourses -> lessons đã publish (4 queries)"""
+    lessons_fast = LessonListValuesSerializer()
+    lesson_rows = list(Lesson.objects.filter(
+        status='PUBLISHED', subcourse__status='PUBLISHED', subcourse__program__status='PUBLISHED'
+    ).order_by('subcourse_id', 'sort_order', 'id').values('subcourse_id', *lessons_fast.columns))
+    lessons_by_subcourse = {}
+    for row, lesson in zip(lesson_rows, lessons_fast.serialize(lesson_rows)):
+        lessons_by_subcourse.setdefault(row['subcourse_id'], []).append(lesson)
+
+    subcourses_fast = SubcourseListValuesSerializer()
+    subcourse_rows = list(Subcourse.objects.filter(
+        status='PUBLISHED', program__status='PUBLISHED'
+    ).with_catalog_counts().order_by('program_id', 'sort_order', 'title').values(
+        'program_id', *subcourses_fast.columns
+    ))
+    subcourses_by_program = {}
+    for row, subcourse in zip(subcourse_rows, subcourses_fast.serialize(subcourse_rows)):
+        subcourse['lessons'] = lessons_by_subcourse.get(row['id'], [])
+        subcourses_by_program.setdefault(row['program_id'], []).append(subcourse)
+
+    programs = Program.objects.filter(status='PUBLISHED').with_catalog_counts().order_by('sort_order', 'title')
+    data = ProgramListSerializer(programs, many=True).data
+    for program in data:
+        program['subcourses'] = subcourses_by_program.get(program['id'], [])
+    return data
+
+
+def build_snapshot(force=False):
+    """
+    Dựng snapshot và ghi file (bỏ qua ghi file nếu nội dung không đổi, trừ khi force)
+    Trả về manifest mới
+    """
+    version = catalog_cache.get_version()
+    programs = build_catalog()
+    content_hash = hashlib.sha256(_dumps(programs)).hexdigest()
+
+    current = load_manifest()
+    if current and current['content_hash'] == content_hash and not force and all(
+        os.path.exists(os.path.join(get_root(), file)) for file in current['files'].values()
+    ):
+        # Chỉ catalog version đổi (vd: sửa bài nháp) -> giữ nguyên file và ETag
+        manifest = dict(current, catalog_version=version)
+        return _write_manifest(manifest)
+
+    generated_at = timezone.now()
+    body = _dumps({
+        'schema': SCHEMA_VERSION,
+        'content_hash': content_hash,
+        'generated_at': generated_at,
+        'programs': programs,
+    })
+    root = get_root()
+    os.makedirs(root, exist_ok=True)
+    name = f'catalog-{content_hash[:16]}.json'
+    files = {'identity': name, 'gzip': name + ENCODINGS['gzip']}
+    _write_file(os.path.join(root, files['identity']), body)
+    _write_file(os.path.join(root, files['gzip']), gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        files['br'] = name + ENCODINGS['br']
+        _write_file(os.path.join(root, files['br']), brotli.compress(body, quality=11))
+
+    manifest = _write_manifest({
+        'schema': SCHEMA_VERSION,
+        'content_hash': content_hash,
+        'catalog_version': version,
+        'generated_at': generated_at.isoformat(),
+        'files': files,
+        'sizes': {encoding: os.path.getsize(os.path.join(root, file)) for encoding, file in files.items()},
+    })
+    _prune(root, keep={file for file in files.values()})
+    return manifest
+
+
+# ============================================================================
+# LƯU TRỮ
+# ============================================================================
+
+def _write_file(path, content):
+    """Ghi qua file tạm rồi os.replace -> không bao giờ phục vụ file ghi dở"""
+    temp_path = f'{path}.tmp{os.getpid()}'
+    with open(temp_path, 'wb') as handle:
+        handle.write(content)
+    os.replace(temp_path, path)
+
+
+def _write_manifest(manifest):
+    manifest = {key: value for key, value in manifest.items() if key != 'signature'}
+    manifest['signature'] = signing.Signer(salt=SIGNING_SALT).signature(_dumps(manifest).decode('utf-8'))
+    os.makedirs(get_root(), exist_ok=True)
+    _write_file(os.path.join(get_root(), MANIFEST_NAME), _dumps(manifest))
+    return manifest
+
+
+def load_manifest():
+    """Manifest hiện tại (None nếu chưa có, hỏng hoặc sai chữ ký)"""
+    try:
+        with open(os.path.join(get_root(), MANIFEST_NAME), 'rb') as handle:
+            manifest = json.loads(handle.read())
+    except (OSError, ValueError):
+        return None
+    signature = manifest.pop('signature', '')
+    expected = signing.Signer(salt=SIGNING_SALT).signature(_dumps(manifest).decode('utf-8'))
+    if not signing.constant_time_compare(signature, expected) or manifest.get('schema') != SCHEMA_VERSION:
+        return None
+    manifest['signature'] = signature
+    return manifest
+
+
+def _prune(root, keep):
+    """Xóa snapshot cũ, giữ KEEP_SNAPSHOTS bản mới nhất"""
+    snapshots = sorted(
+        (entry for entry in os.scandir(root) if entry.name.startswith('catalog-') and entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in snapshots[KEEP_SNAPSHOTS:]:
+        if entry.name in keep:
+            continue
+        for extension in ENCODINGS.values():
+            try:
+                os.remove(entry.path + extension)
+            except FileNotFoundError:
+                pass
+
+
+def get_snapshot():
+    """
+    Manifest của snapshot còn hợp lệ với catalog version hiện tại (dựng lại nếu cũ)
+    Đang có process khác dựng lại -> dùng tạm snapshot cũ
+    """
+    manifest = load_manifest()
+    if manifest and manifest['catalog_version'] == catalog_cache.get_version():
+        return manifest
+    if manifest and not cache.add(BUILD_LOCK_KEY, 1, BUILD_LOCK_TIMEOUT):
+        return manifest
+    try:
+        return build_snapshot()
+    finally:
+        cache.delete(BUILD_LOCK_KEY)
+
+
+def choose_encoding(manifest, accept_encoding):
+    """Content-Encoding tốt nhất mà client chấp nhận và đã có file"""
+    accepted = {
+        part.split(';', 1)[0].strip().lower()
+        for part in (accept_encoding or '').split(',')
+        if not part.strip().endswith(';q=0')
+    }
+    for encoding in ('br', 'gzip'):
+        if encoding in accepted and encoding in manifest['files']:
+            return encoding
+    return 'identity'
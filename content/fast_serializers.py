@@ -0,0 +1,124 @@
+"""
+Fast path serialize cho các list read-only (Lesson / Subcourse / Media / QuestionOption)
+- Đọc .values() thay vì dựng model instance, build dict trực tiếp
+- Kế hoạch (cột DB + hàm chuyển đổi) được dựng 1 lần từ chính DRF serializer tương ứng
+  -> cùng thứ tự field, cùng định dạng -> JSON giống hệt từng byte
+- get_*_display tra từ dict choices dựng sẵn
+- SerializerMethodField phải khai báo cột annotate tương ứng (method_fields)
+Kiểm tra tương đương: python manage.py check_fast_serializers
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .fieldsets import EXPAND_PARAM, prune_data
+from .serializers import (
+    LessonListSerializer, SubcourseListSerializer, MediaSerializer, QuestionOptionSerializer,
+)
+
+
+# Field trả nguyên giá trị từ DB (to_representation chỉ là str() / int())
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """
+    Serializer read-only dựng output từ các dòng .values()
+    serializer_class: DRF serializer được mô phỏng
+    method_fields: {tên SerializerMethodField: cột annotate trên queryset}
+    """
+    serializer_class = None
+    method_fields = {}
+
+    def __init__(self):
+        self.plan = self._build_plan()
+        self.columns = tuple(dict.fromkeys(column for _, column, _ in self.plan))
+
+    def _build_plan(self):
+        """[(tên output, cột .values(), converter hoặc None)] theo đúng thứ tự field"""
+        model = self.serializer_class.Meta.model
+        plan = []
+        for name, field in self.serializer_class().fields.items():
+            source = field.source
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in self.method_fields:
+                    raise ImproperlyConfigured(f'{type(self).__name__}: thiếu cột cho method field "{name}"')
+                plan.append((name, self.method_fields[name], None))
+            elif source.startswith('get_') and source.endswith('_display'):
+                column = source[len('get_'):-len('_display')]
+                choices = {
+                    value: str(label)
+                    for value, label in model._meta.get_field(column).flatchoices
+                }
+                plan.append((name, column, lambda value, choices=choices: choices.get(value, str(value))))
+            elif isinstance(field, serializers.BaseSerializer) or '.' in source:
+                raise ImproperlyConfigured(f'{type(self).__name__}: field lồng nhau "{name}" không hỗ trợ')
+            elif isinstance(field, PASSTHROUGH_FIELDS) and not isinstance(field, serializers.ChoiceField):
+                plan.append((name, source, None))
+            else:
+                plan.append((name, source, field.to_representation))
+        return plan
+
+    def serialize(self, rows):
+        plan = self.plan
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in plan:
+                value = row[column]
+                item[name] = convert(value) if convert is not None and value is not None else value
+            data.append(item)
+        return data
+
+
+class LessonListValuesSerializer(ValuesSerializer):
+    serializer_class = LessonListSerializer
+
+
+class SubcourseListValuesSerializer(ValuesSerializer):
+    serializer_class = SubcourseListSerializer
+    method_fields = {'lesson_count': 'published_lesson_count'}
+
+
+class MediaValuesSerializer(ValuesSerializer):
+    serializer_class = MediaSerializer
+
+
+class QuestionOptionValuesSerializer(ValuesSerializer):
+    serializer_class = QuestionOptionSerializer
+
+
+class FastListMixin:
+    """
+    Mixin cho ViewSet read-only: action list dùng fast_serializer_class (dựng 1 lần / class)
+    ?expand= cần serializer lồng nhau -> đi đường DRF thường; ?fields= được cắt trên dict
+    """
+    fast_serializer_class = None
+
+    def use_fast_serializer(self):
+        return self.fast_serializer_class is not None and EXPAND_PARAM not in self.request.query_params
+
+    @classmethod
+    def get_fast_serializer(cls):
+        if cls.__dict__.get('_fast_serializer') is None:
+            cls._fast_serializer = cls.fast_serializer_class()
+        return cls._fast_serializer
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_serializer():
+            return super().list(request, *args, **kwargs)
+
+        fast = self.get_fast_serializer()
+        rows = self.filter_queryset(self.get_queryset()).values(*fast.columns)
+        page = self.paginate_queryset(rows)
+        data = fast.serialize(page if page is not None else rows)
+        if hasattr(self, 'get_field_tree'):
+            data = prune_data(data, self.get_field_tree())
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
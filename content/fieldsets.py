@@ -0,0 +1,143 @@
+"""
+Sparse fieldsets cho các ViewSet content: ?fields= và ?expand=
+- fields=id,title,quizzes.title   -> chỉ trả các field này (dấu chấm cho field lồng nhau)
+- expand=subcourses               -> thêm quan hệ lồng nhau không có sẵn trong payload mặc định
+- Field không được yêu cầu -> bỏ khỏi serializer VÀ bỏ prefetch_related tương ứng (không query)
+
+ViewSet khai báo:
+    field_prefetches = {
+        'objectives': ('objectives',),
+        'quizzes.questions': ('quizzes__questions', 'quizzes__questions__options'),
+    }
+    expandable_fields = {
+        'subcourses': lambda: SubcourseListSerializer(many=True, read_only=True),
+    }
+    expandable_actions = ('list',)  # detail đã có sẵn nested
+"""
+from rest_framework import serializers
+
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_field_tree(value):
+    """
+    'id,quizzes.title,quizzes.questions' -> {'id': {}, 'quizzes': {'title': {}, 'questions': {}}}
+    Không có giá trị -> None (không giới hạn)
+    """
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            part = part.strip()
+            if not part:
+                break
+            node = node.setdefault(part, {})
+    return tree or None
+
+
+def is_included(tree, path):
+    """Đường dẫn 'a.b.c' có nằm trong fieldset không (subtree rỗng = lấy toàn bộ field đó)"""
+    for part in path.split('.'):
+        if not tree:
+            return True
+        if part not in tree:
+            return False
+        tree = tree[part]
+    return True
+
+
+def _fields_of(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return getattr(serializer, 'fields', None)
+
+
+def trim_serializer(serializer, tree):
+    """Bỏ các field không nằm trong tree (đệ quy vào serializer lồng nhau)"""
+    fields = _fields_of(serializer)
+    if not tree or fields is None:
+        return serializer
+    for name in list(fields):
+        if name not in tree:
+            fields.pop(name)
+        elif tree[name]:
+            trim_serializer(fields[name], tree[name])
+    return serializer
+
+
+def prune_data(data, tree):
+    """Áp fieldset lên dữ liệu đã serialize (vd: document lấy từ cache)"""
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [prune_data(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {
+            name: prune_data(value, tree[name])
+            for name, value in data.items() if name in tree
+        }
+    return data
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin cho ViewSet: đọc ?fields= / ?expand=, cắt serializer và prefetch theo fieldset
+    get_queryset() gọi self.prefetch_for_fields(queryset) thay cho prefetch_related cố định
+    Field được expand luôn được render (kể cả khi không có trong ?fields=)
+    """
+    field_prefetches = {}
+    expandable_fields = {}
+    expandable_actions = ('list',)
+
+    def get_field_prefetches(self):
+        """{đường dẫn field: (lookup prefetch_related, ...)} (override khi cần Prefetch theo action)"""
+        return self.field_prefetches
+
+    def get_expandable_fields(self):
+        """Quan hệ có thể expand ở action hiện tại (detail thường đã có sẵn nested)"""
+        return self.expandable_fields if self.action in self.expandable_actions else {}
+
+    def get_expanded_fields(self):
+        value = self.request.query_params.get(EXPAND_PARAM) if self.request else None
+        expandable = self.get_expandable_fields()
+        return [name for name in (parse_field_tree(value) or {}) if name in expandable]
+
+    def get_field_tree(self):
+        """Fieldset đã gộp expand (None = mọi field mặc định)"""
+        tree = parse_field_tree(self.request.query_params.get(FIELDS_PARAM)) if self.request else None
+        if tree is not None:
+            for name in self.get_expanded_fields():
+                tree.setdefault(name, {})
+        return tree
+
+    def wants_field(self, path):
+        """Field dạng 'a.b' có được render không (field expandable phải được expand)"""
+        root = path.split('.', 1)[0]
+        if root in self.get_expandable_fields() and root not in self.get_expanded_fields():
+            return False
+        return is_included(self.get_field_tree(), path)
+
+    def prefetch_for_fields(self, queryset):
+        """prefetch_related chỉ cho các field sẽ được render"""
+        lookups = []
+        for path, path_lookups in self.get_field_prefetches().items():
+            if not self.wants_field(path):
+                continue
+            for lookup in path_lookups:
+                if lookup not in lookups:
+                    lookups.append(lookup)
+        return queryset.prefetch_related(*lookups) if lookups else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        expanded = self.get_expanded_fields()
+        if expanded:
+            fields = _fields_of(serializer)
+            expandable = self.get_expandable_fields()
+            for name in expanded:
+                fields[name] = expandable[name]()
+        return trim_serializer(serializer, self.get_field_tree())
@@ -0,0 +1,132 @@
+"""
+Engine chấm điểm Quiz (Quiz Grading Engine)
+Chấm trong bộ nhớ từ answer key đã cache của quiz (content/quiz_cache.py)
+(vòng đời start / autosave / submit và ghi QuizAnswer: content/attempts.py)
+
+Quy tắc chấm:
+- single/multiple: đúng khi tập lựa chọn == tập đáp án đúng (all-or-nothing)
+- open: không tự chấm được -> 0 điểm, bài nộp ở trạng thái 'submitted' chờ giáo viên chấm
+- Điểm có trọng số theo QuizQuestion.points, max_score = tổng điểm mọi câu hỏi của quiz
+"""
+from django.db.models import Max
+
+from . import quiz_cache
+from .models import QuizSubmission, QuizAnswer
+
+
+CHOICE_QUESTION_TYPES = ('single', 'multiple')
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_answer(answer_data):
+    """
+    Chuẩn hóa 1 câu trả lời từ request body
+    Hỗ trợ: selected_option_id (cũ), selected_option_ids (list), answer_text (câu hỏi mở)
+    Trả về (question_id, [option_ids], answer_text) hoặc None nếu không hợp lệ
+    """
+    if not isinstance(answer_data, dict):
+        return None
+    question_id = _to_int(answer_data.get('question_id'))
+    if question_id is None:
+        return None
+
+    raw_ids = answer_data.get('selected_option_ids')
+    if raw_ids is None and answer_data.get('selected_option_id') is not None:
+        raw_ids = [answer_data.get('selected_option_id')]
+    if not isinstance(raw_ids, (list, tuple)):
+        raw_ids = []
+    option_ids = [option_id for option_id in map(_to_int, raw_ids) if option_id is not None]
+
+    answer_text = answer_data.get('answer_text') or ''
+    if not isinstance(answer_text, str):
+        answer_text = str(answer_text)
+    return question_id, option_ids, answer_text.strip()
+
+
+class QuizGrader:
+    """
+    Chấm điểm một quiz hoàn toàn trong bộ nhớ
+    Đề + đáp án lấy từ answer key đã biên dịch (content/quiz_cache.py): cache hit -> 0 query
+    """
+
+    def __init__(self, quiz):
+        self.quiz = quiz
+        self.answer_key = quiz_cache.get_answer_key(quiz)
+        self.questions = self.answer_key.questions
+
+    @property
+    def max_score(self):
+        return self.answer_key.max_score
+
+    @property
+    def has_open_questions(self):
+        return self.answer_key.has_open_questions
+
+    def grade_answer(self, question, option_ids, answer_text):
+        """Chấm 1 câu: trả về (selected_option_ids, is_correct, points_earned)"""
+        if question.question_type not in CHOICE_QUESTION_TYPES:
+            # Câu hỏi mở: giáo viên chấm tay
+            return [], False, 0
+
+        selected = sorted({option_id for option_id in option_ids if option_id in question.option_ids})
+        if question.question_type == 'single' and len(selected) > 1:
+            is_correct = False
+        else:
+            is_correct = bool(selected) and set(selected) == question.correct_option_ids
+        return selected, is_correct, question.points if is_correct else 0
+
+    def grade(self, answers_data):
+        """
+        Chấm danh sách câu trả lời, trả về list QuizAnswer (chưa lưu, chưa gán submission)
+        Câu hỏi không thuộc quiz hoặc câu trả lời rỗng bị bỏ qua
+        Nếu một câu hỏi được trả lời nhiều lần -> lấy lần cuối
+        """
+        graded = {}
+        for answer_data in answers_data or []:
+            normalized = normalize_answer(answer_data)
+            if normalized is None:
+                continue
+            question_id, option_ids, answer_text = normalized
+            question = self.questions.get(question_id)
+            if question is None:
+                continue
+
+            selected, is_correct, points_earned = self.grade_answer(question, option_ids, answer_text)
+            if not selected and not answer_text:
+                continue
+
+            graded[question_id] = QuizAnswer(
+                question_id=question_id,
+                selected_option_ids=selected,
+                answer_text=answer_text if question.question_type == 'open' else '',
+                is_correct=is_correct,
+                points_earned=points_earned,
+            )
+        return list(graded.values())
+
+    def apply_result(self, submission, answers):
+        """Ghi điểm tổng hợp vào submission (chưa save)"""
+        max_score = self.max_score
+        score = sum(answer.points_earned for answer in answers)
+        percentage = round(score / max_score * 100, 2) if max_score > 0 else 0
+
+        submission.score = score
+        submission.max_score = max_score or None
+        submission.percentage = percentage
+        submission.is_passed = percentage >= self.quiz.passing_score
+        submission.status = 'submitted' if self.has_open_questions else 'graded'
+        return submission
+
+
+def next_attempt_number(quiz, user):
+    """Số thứ tự lần làm tiếp theo của user cho quiz (unique theo quiz, user)"""
+    last = QuizSubmission.objects.filter(
+        quiz=quiz, user=user
+    ).aggregate(last=Max('attempt_number'))['last']
+    return (last or 0) + 1
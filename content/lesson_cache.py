@@ -0,0 +1,90 @@
+"""
+Cache tài liệu bài học (Lesson Detail Document Cache)
+Lưu sẵn payload đã serialize của LessonDetailSerializer theo (lesson_id, version)
+
+- Mỗi lesson có một version counter trong cache
+- Khi admin sửa nội dung (Lesson hoặc bất kỳ model con nào) -> tăng version
+- Document cũ tự động bị bỏ qua vì key chứa version
+- Cache hit không chạm tới ORM (slug -> lesson_id cũng được cache)
+- 2 bản theo người xem: quiz đã bỏ đáp án (học viên) / kèm đáp án (can_view_quiz_answers)
+"""
+from django.core.cache import cache
+
+
+KEY_PREFIX = 'lesson_doc'
+
+# Document không đổi trừ khi admin sửa -> giữ lâu, version bump sẽ vô hiệu hóa
+DOCUMENT_TIMEOUT = 60 * 60 * 24
+# Version counter không được hết hạn trước document
+VERSION_TIMEOUT = None
+
+
+def _version_key(lesson_id):
+    return f'{KEY_PREFIX}:ver:{lesson_id}'
+
+
+def _slug_key(slug):
+    return f'{KEY_PREFIX}:slug:{slug}'
+
+
+def _document_key(lesson_id, version, include_answers):
+    variant = 'answers' if include_answers else 'delivery'
+    return f'{KEY_PREFIX}:{lesson_id}:v{version}:{variant}'
+
+
+def get_version(lesson_id):
+    """Lấy version hiện tại của lesson (khởi tạo = 1 nếu chưa có)"""
+    key = _version_key(lesson_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=VERSION_TIMEOUT)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(lesson_id):
+    """Tăng version -> document cũ không còn được đọc"""
+    key = _version_key(lesson_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Chưa có counter: đặt 2 để chắc chắn khác version mặc định
+        cache.set(key, 2, timeout=VERSION_TIMEOUT)
+        return 2
+
+
+def bump_versions(lesson_ids):
+    """Tăng version cho nhiều lesson"""
+    for lesson_id in set(lesson_ids):
+        bump_version(lesson_id)
+
+
+def get_document(lesson_id, include_answers=False):
+    """Lấy document theo lesson_id (None nếu miss)"""
+    return cache.get(_document_key(lesson_id, get_version(lesson_id), include_answers))
+
+
+def get_document_by_slug(slug, include_answers=False):
+    """
+    Lấy document theo slug mà không cần query DB
+    Trả về None nếu chưa có mapping hoặc mapping đã lỗi thời (slug đổi)
+    """
+    lesson_id = cache.get(_slug_key(slug))
+    if lesson_id is None:
+        return None
+    document = get_document(lesson_id, include_answers)
+    if document is None or document.get('slug') != slug:
+        return None
+    return document
+
+
+def set_document(lesson, data, version, include_answers=False):
+    """
+    Lưu document đã render cho lesson, kèm mapping slug -> id
+    version phải được lấy TRƯỚC khi serialize để không ghi đè bản mới bằng dữ liệu cũ
+    include_answers: document được render kèm đáp án quiz hay không (phải khớp lúc đọc)
+    """
+    cache.set_many({
+        _document_key(lesson.id, version, include_answers): dict(data),
+        _slug_key(lesson.slug): lesson.id,
+    }, timeout=DOCUMENT_TIMEOUT)
@@ -0,0 +1,29 @@
+"""
+Dựng snapshot catalog tĩnh (JSON + gzip + brotli) cho frontend
+Chạy sau deploy hoặc sau khi import nội dung hàng loạt
+
+Sử dụng:
+    python manage.py build_catalog_snapshot
+    python manage.py build_catalog_snapshot --force
+"""
+from django.core.management.base import BaseCommand
+
+from content.catalog_snapshot import build_snapshot, get_root
+
+
+class Command(BaseCommand):
+    help = 'Dựng snapshot catalog công khai (GET /api/content/catalog-snapshot/)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Ghi lại file kể cả khi nội dung không đổi',
+        )
+
+    def handle(self, *args, **options):
+        manifest = build_snapshot(force=options['force'])
+        sizes = ', '.join(f'{encoding}={size / 1024:.1f}KB' for encoding, size in manifest['sizes'].items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot {manifest['content_hash'][:16]} ({sizes}) tại {get_root()}"
+        ))
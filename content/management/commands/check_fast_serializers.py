@@ -0,0 +1,69 @@
+"""
+Kiểm tra fast serializer (.values()) cho ra JSON giống hệt DRF serializer
+Chạy trên dữ liệu thật của database đang cấu hình, báo thời gian của 2 đường
+(test cố định với fixtures: content/tests.py - FastSerializerParityTests)
+
+Sử dụng:
+    python manage.py check_fast_serializers
+    python manage.py check_fast_serializers --limit 500
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from content.fast_serializers import (
+    LessonListValuesSerializer, SubcourseListValuesSerializer,
+    MediaValuesSerializer, QuestionOptionValuesSerializer,
+)
+from content.models import Lesson, Subcourse, Media, QuestionOption
+
+
+CASES = (
+    ('lessons', LessonListValuesSerializer, lambda: Lesson.objects.order_by('id')),
+    ('subcourses', SubcourseListValuesSerializer, lambda: Subcourse.objects.with_catalog_counts().order_by('id')),
+    ('media', MediaValuesSerializer, lambda: Media.objects.order_by('id')),
+    ('question_options', QuestionOptionValuesSerializer, lambda: QuestionOption.objects.order_by('id')),
+)
+
+
+class Command(BaseCommand):
+    help = 'So sánh output fast serializer với DRF serializer (phải giống hệt từng byte)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Số dòng tối đa mỗi model (mặc định 1000)')
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        limit = options['limit']
+        failures = []
+
+        for name, fast_class, get_queryset in CASES:
+            fast = fast_class()
+            queryset = get_queryset()[:limit]
+
+            start = time.perf_counter()
+            expected = renderer.render(fast.serializer_class(list(queryset), many=True).data)
+            drf_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            actual = renderer.render(fast.serialize(queryset.values(*fast.columns)))
+            fast_ms = (time.perf_counter() - start) * 1000
+
+            if actual == expected:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}: OK ({len(expected)} bytes) - DRF {drf_ms:.1f}ms, fast {fast_ms:.1f}ms'
+                ))
+            else:
+                position = next(
+                    (index for index, (a, b) in enumerate(zip(actual, expected)) if a != b),
+                    min(len(actual), len(expected))
+                )
+                self.stdout.write(self.style.ERROR(
+                    f'{name}: KHÁC tại byte {position}: '
+                    f'DRF={expected[max(0, position - 40):position + 40]!r} fast={actual[max(0, position - 40):position + 40]!r}'
+                ))
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f'Fast serializer không khớp: {", ".join(failures)}')
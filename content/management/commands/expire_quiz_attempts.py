@@ -0,0 +1,31 @@
+"""
+Chấm các lần làm quiz đã hết giờ (time_limit_minutes) mà học viên chưa nộp
+Câu trả lời lấy từ bản nháp autosave (QuizAnswerDraft, content/attempts.py), chấm theo lô
+Chạy định kỳ, vd cron mỗi 5 phút:
+    */5 * * * * cd /path/to/project && python manage.py expire_quiz_attempts
+
+Sử dụng:
+    python manage.py expire_quiz_attempts
+    python manage.py expire_quiz_attempts --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from content.attempts import expire_attempts
+
+
+class Command(BaseCommand):
+    help = 'Chấm hàng loạt các lần làm quiz đã quá thời gian làm bài'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Chỉ đếm số lần làm đã hết giờ, không chấm',
+        )
+
+    def handle(self, *args, **options):
+        count = expire_attempts(dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f'{count} lần làm quiz đã hết giờ')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Đã chấm {count} lần làm quiz hết giờ'))
@@ -0,0 +1,55 @@
+"""
+Export cây nội dung Program -> Subcourse -> Lesson -> nội dung con ra file NDJSON
+File kết thúc bằng .gz được nén gzip
+
+Sử dụng:
+    python manage.py export_content --output content.ndjson
+    python manage.py export_content --program robotics-101 --output robotics.ndjson.gz
+    python manage.py export_content --subcourse 3 --subcourse 5 > subcourses.ndjson
+"""
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from content.transfer import export_content
+
+
+class Command(BaseCommand):
+    help = 'Export nội dung học tập ra NDJSON (import lại bằng import_content)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--program',
+            action='append',
+            dest='program_slugs',
+            help='Slug chương trình cần export (có thể lặp lại). Mặc định: tất cả',
+        )
+        parser.add_argument(
+            '--subcourse',
+            type=int,
+            action='append',
+            dest='subcourse_ids',
+            help='ID khóa học con cần export (có thể lặp lại)',
+        )
+        parser.add_argument(
+            '--output', '-o',
+            default='-',
+            help='Đường dẫn file (.ndjson hoặc .ndjson.gz). Mặc định: stdout',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        start = time.perf_counter()
+        if output == '-':
+            counts = export_content(sys.stdout, options['program_slugs'], options['subcourse_ids'])
+        else:
+            opener = gzip.open if output.endswith('.gz') else open
+            with opener(output, 'wt', encoding='utf-8') as stream:
+                counts = export_content(stream, options['program_slugs'], options['subcourse_ids'])
+
+        summary = ', '.join(f'{name}={count}' for name, count in counts.items())
+        self.stderr.write(self.style.SUCCESS(
+            f"Đã export {sum(counts.values())} bản ghi trong {time.perf_counter() - start:.1f}s: {summary}"
+        ))
@@ -0,0 +1,58 @@
+"""
+Import file NDJSON tạo bởi export_content (bulk_create, ánh xạ lại id)
+Media trùng url và BuildBlock trùng trong chương trình đích được dùng lại
+
+Sử dụng:
+    python manage.py import_content content.ndjson
+    python manage.py import_content robotics.ndjson.gz --into-program robotics-201
+    python manage.py import_content content.ndjson --dry-run
+"""
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content.models import Program
+from content.transfer import ContentImportError, import_content
+
+
+class Command(BaseCommand):
+    help = 'Import nội dung học tập từ NDJSON (copy khóa con giữa chương trình, seed môi trường staging)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File .ndjson / .ndjson.gz, "-" để đọc từ stdin')
+        parser.add_argument(
+            '--into-program',
+            help='Slug chương trình đích: mọi khóa con được thêm vào chương trình này',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Kiểm tra file và báo số bản ghi, không ghi gì vào DB',
+        )
+
+    def handle(self, *args, **options):
+        into_program = None
+        if options['into_program']:
+            into_program = Program.objects.filter(slug=options['into_program']).first()
+            if into_program is None:
+                raise CommandError(f"Không tìm thấy chương trình '{options['into_program']}'")
+
+        path = options['path']
+        start = time.perf_counter()
+        try:
+            if path == '-':
+                counts = import_content(sys.stdin, into_program, options['dry_run'])
+            else:
+                opener = gzip.open if path.endswith('.gz') else open
+                with opener(path, 'rt', encoding='utf-8') as stream:
+                    counts = import_content(stream, into_program, options['dry_run'])
+        except (ContentImportError, OSError) as exc:
+            raise CommandError(str(exc))
+
+        summary = ', '.join(f'{name}={count}' for name, count in counts.items())
+        prefix = '[dry-run] Sẽ import' if options['dry_run'] else 'Đã import'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} trong {time.perf_counter() - start:.1f}s: {summary}"
+        ))
@@ -0,0 +1,31 @@
+"""
+Rebuild bảng tổng hợp tiến độ SubcourseProgress từ UserProgress
+
+Sử dụng:
+    python manage.py rebuild_progress_summaries
+    python manage.py rebuild_progress_summaries --subcourse 3 --subcourse 5
+"""
+from django.core.management.base import BaseCommand
+
+from content.progress_summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Tính lại SubcourseProgress (dùng sau khi publish/unpublish bài học hàng loạt)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subcourse',
+            type=int,
+            action='append',
+            dest='subcourse_ids',
+            help='ID khóa học con cần rebuild (có thể lặp lại). Mặc định: tất cả',
+        )
+
+    def handle(self, *args, **options):
+        subcourse_ids = options.get('subcourse_ids')
+        created = rebuild_summaries(subcourse_ids)
+        scope = f"{len(subcourse_ids)} khóa học" if subcourse_ids else 'tất cả khóa học'
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã rebuild {created} dòng tổng hợp tiến độ ({scope})"
+        ))
@@ -0,0 +1,31 @@
+"""
+Tính lại bảng thống kê quiz (QuizStats, QuizScoreBucket, QuizQuestionStats, QuestionOptionStats)
+từ QuizSubmission / QuizAnswer. Chạy hằng đêm để sửa sai lệch (bài nộp bị xóa, giáo viên chấm lại), vd:
+    30 2 * * * cd /path/to/project && python manage.py rebuild_quiz_analytics
+
+Sử dụng:
+    python manage.py rebuild_quiz_analytics
+    python manage.py rebuild_quiz_analytics --quiz 3 --quiz 5
+"""
+from django.core.management.base import BaseCommand
+
+from content.quiz_analytics import rebuild_analytics
+
+
+class Command(BaseCommand):
+    help = 'Tính lại thống kê quiz (tỉ lệ đạt, phân bố điểm, tỉ lệ đúng từng câu, tỉ lệ chọn từng lựa chọn)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quiz',
+            type=int,
+            action='append',
+            dest='quiz_ids',
+            help='ID quiz cần tính lại (có thể lặp lại). Mặc định: mọi quiz có bài nộp',
+        )
+
+    def handle(self, *args, **options):
+        quiz_count, submission_count = rebuild_analytics(options.get('quiz_ids'))
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã tính lại thống kê {quiz_count} quiz ({submission_count} bài nộp)"
+        ))
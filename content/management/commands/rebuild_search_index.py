@@ -0,0 +1,37 @@
+"""
+Dựng lại index tìm kiếm bài học (LessonSearchDocument / LessonSearchTerm)
+
+Sử dụng:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --lesson 3 --lesson 5
+    python manage.py rebuild_search_index --force
+"""
+from django.core.management.base import BaseCommand
+
+from content.search_index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Dựng lại index tìm kiếm bài học (dùng sau khi import dữ liệu hàng loạt)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lesson',
+            type=int,
+            action='append',
+            dest='lesson_ids',
+            help='ID bài học cần index lại (có thể lặp lại). Mặc định: tất cả',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Ghi lại cả các bài học có nội dung không đổi',
+        )
+
+    def handle(self, *args, **options):
+        lesson_ids = options.get('lesson_ids')
+        written = rebuild_index(lesson_ids, force=options['force'])
+        scope = f"{len(lesson_ids)} bài học" if lesson_ids else 'tất cả bài học'
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã index lại {written} bài học ({scope})"
+        ))
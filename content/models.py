@@ -5,10 +5,57 @@ Mở rộng: Objectives, Models (media), Preparation, BuildBlocks,
 ContentBlocks, Attachments, Challenges, Quizzes
 """
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator, URLValidator
 from django.utils.text import slugify
 
 
+def _count_subquery(queryset, group_field):
+    """COUNT(*) của queryset theo group_field dưới dạng scalar subquery (0 nếu không có dòng)"""
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_field).annotate(total=Count('id')).values('total')[:1],
+            output_field=models.IntegerField()
+        ),
+        0
+    )
+
+
+class ProgramQuerySet(models.QuerySet):
+    def with_catalog_counts(self):
+        """
+        Annotate số khóa con / bài học đã publish trong cùng 1 query
+        - published_subcourse_count: Subcourse PUBLISHED
+        - published_lesson_count: Lesson PUBLISHED thuộc Subcourse PUBLISHED
+        """
+        return self.annotate(
+            published_subcourse_count=_count_subquery(
+                Subcourse.objects.filter(program=OuterRef('pk'), status='PUBLISHED'),
+                'program'
+            ),
+            published_lesson_count=_count_subquery(
+                Lesson.objects.filter(
+                    subcourse__program=OuterRef('pk'),
+                    subcourse__status='PUBLISHED',
+                    status='PUBLISHED'
+                ),
+                'subcourse__program'
+            ),
+        )
+
+
+class SubcourseQuerySet(models.QuerySet):
+    def with_catalog_counts(self):
+        """Annotate published_lesson_count: số Lesson PUBLISHED của khóa con"""
+        return self.annotate(
+            published_lesson_count=_count_subquery(
+                Lesson.objects.filter(subcourse=OuterRef('pk'), status='PUBLISHED'),
+                'subcourse'
+            ),
+        )
+
+
 class Program(models.Model):
     """
     Chương trình học (Cấp độ 1) - Ví dụ: "SPIKE Essential", "SPIKE Prime"
@@ -69,6 +116,8 @@ class Program(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Ngày tạo')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Ngày cập nhật')
 
+    objects = ProgramQuerySet.as_manager()
+
     class Meta:
         db_table = 'programs'
         verbose_name = 'Chương trình học'
@@ -182,6 +231,8 @@ class Subcourse(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Ngày tạo')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Ngày cập nhật')
 
+    objects = SubcourseQuerySet.as_manager()
+
     class Meta:
         db_table = 'subcourses'
         verbose_name = 'Khóa học con'
@@ -269,6 +320,16 @@ class Lesson(models.Model):
     def __str__(self):
         return f"{self.subcourse.title} > {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lưu giá trị ban đầu để signals biết bài học có đổi trạng thái publish không
+        instance._loaded_status = values[field_names.index('status')] if 'status' in field_names else None
+        instance._loaded_subcourse_id = (
+            values[field_names.index('subcourse_id')] if 'subcourse_id' in field_names else None
+        )
+        return instance
+
 
 class UserProgress(models.Model):
     """
@@ -308,12 +369,77 @@ class UserProgress(models.Model):
         unique_together = [['user', 'lesson']]
         indexes = [
             models.Index(fields=['user', 'is_completed']),
+            models.Index(fields=['user', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
         ]
 
     def __str__(self):
         status = "✓" if self.is_completed else "○"
         return f"{status} {self.user.username} - {self.lesson.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lưu trạng thái ban đầu để cập nhật SubcourseProgress tăng dần
+        instance._loaded_is_completed = (
+            values[field_names.index('is_completed')] if 'is_completed' in field_names else None
+        )
+        return instance
+
+
+class SubcourseProgress(models.Model):
+    """
+    Tổng hợp tiến độ của học viên theo khóa học con (denormalized)
+    Được cập nhật tăng dần khi UserProgress thay đổi (xem content/progress_summary.py)
+    Chỉ tính các bài học đã PUBLISHED
+    """
+    user = models.ForeignKey(
+        'auth.User',
+        on_delete=models.CASCADE,
+        related_name='subcourse_progresses',
+        verbose_name='Học viên'
+    )
+    subcourse = models.ForeignKey(
+        Subcourse,
+        on_delete=models.CASCADE,
+        related_name='progress_summaries',
+        verbose_name='Khóa học con'
+    )
+    completed_lessons = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Số bài đã hoàn thành'
+    )
+    total_lessons = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Tổng số bài học'
+    )
+    last_activity_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Hoạt động gần nhất'
+    )
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Ngày cập nhật')
+
+    class Meta:
+        db_table = 'subcourse_progress'
+        verbose_name = 'Tổng hợp tiến độ khóa học'
+        verbose_name_plural = 'Tổng hợp tiến độ khóa học'
+        unique_together = [['user', 'subcourse']]
+        indexes = [
+            models.Index(fields=['subcourse', 'user']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.subcourse.title} ({self.completed_lessons}/{self.total_lessons})"
+
+    @property
+    def completion_percentage(self):
+        """Phần trăm hoàn thành (O(1), không query)"""
+        if self.total_lessons <= 0:
+            return 0
+        return round(min(self.completed_lessons, self.total_lessons) / self.total_lessons * 100, 2)
+
 
 # ============================================================================
 # EXPANDED LESSON CONTENT MODELS
@@ -961,6 +1087,12 @@ class Quiz(models.Model):
         default=0,
         verbose_name='Thứ tự'
     )
+    # Tăng khi quiz / câu hỏi / lựa chọn thay đổi (content/signals.py) -> khóa cache đề và answer key
+    content_version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name='Phiên bản nội dung'
+    )
     
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Ngày tạo')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Ngày cập nhật')
@@ -973,7 +1105,17 @@ class Quiz(models.Model):
         indexes = [
             models.Index(fields=['lesson', 'status']),
         ]
-    
+
+    def save(self, *args, **kwargs):
+        # content_version chỉ tăng bằng UPDATE +1 (quiz_cache.bump_versions):
+        # không ghi đè bằng giá trị cũ của object đã nạp trước đó
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname != 'content_version'
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.lesson.title} - {self.title}"
 
@@ -1160,6 +1302,7 @@ class QuizSubmission(models.Model):
         indexes = [
             models.Index(fields=['quiz', 'user']),
             models.Index(fields=['user', 'is_passed']),
+            models.Index(fields=['user', 'started_at', 'id']),
         ]
     
     def __str__(self):
@@ -1221,3 +1364,257 @@ class QuizAnswer(models.Model):
     
     def __str__(self):
         return f"{self.quiz_submission.user.username} - Q{self.question.order}"
+
+
+class QuizAnswerDraft(models.Model):
+    """
+    Câu trả lời autosave của lần làm dở (xem content/attempts.py)
+    Mỗi lần autosave upsert theo (bài nộp, câu hỏi); bài được chấm từ các dòng này rồi xóa
+    """
+    quiz_submission = models.ForeignKey(
+        QuizSubmission,
+        on_delete=models.CASCADE,
+        related_name='draft_answers',
+        verbose_name='Bài nộp quiz'
+    )
+    question = models.ForeignKey(
+        QuizQuestion,
+        on_delete=models.CASCADE,
+        related_name='draft_answers',
+        verbose_name='Câu hỏi'
+    )
+    selected_option_ids = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='IDs lựa chọn được chọn'
+    )
+    answer_text = models.TextField(
+        blank=True,
+        verbose_name='Trả lời mở'
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'quiz_answer_drafts'
+        verbose_name = 'Câu trả lời lưu tạm'
+        verbose_name_plural = 'Câu trả lời lưu tạm'
+        unique_together = [['quiz_submission', 'question']]
+
+    def __str__(self):
+        return f"Bài nộp {self.quiz_submission_id} - Câu {self.question_id}"
+
+
+# ============================================================================
+# QUIZ ANALYTICS (xem content/quiz_analytics.py)
+# ============================================================================
+
+class QuizStats(models.Model):
+    """
+    Tổng hợp kết quả của 1 quiz (denormalized)
+    Cộng dồn khi bài nộp được chấm, tính lại hằng đêm bằng rebuild_quiz_analytics
+    Chỉ tính các bài đã nộp (status khác in_progress)
+    """
+    quiz = models.OneToOneField(
+        Quiz,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Quiz'
+    )
+    submission_count = models.PositiveIntegerField(default=0, verbose_name='Số bài nộp')
+    passed_count = models.PositiveIntegerField(default=0, verbose_name='Số bài đạt')
+    percentage_sum = models.FloatField(default=0, verbose_name='Tổng phần trăm điểm')
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Ngày cập nhật')
+
+    class Meta:
+        db_table = 'quiz_stats'
+        verbose_name = 'Thống kê quiz'
+        verbose_name_plural = 'Thống kê quiz'
+
+    def __str__(self):
+        return f"{self.quiz.title} ({self.submission_count} bài nộp)"
+
+    @property
+    def pass_rate(self):
+        """Tỉ lệ đạt passing_score (%)"""
+        if not self.submission_count:
+            return 0
+        return round(self.passed_count / self.submission_count * 100, 2)
+
+    @property
+    def average_percentage(self):
+        if not self.submission_count:
+            return 0
+        return round(self.percentage_sum / self.submission_count, 2)
+
+
+class QuizScoreBucket(models.Model):
+    """
+    Histogram điểm của quiz: bucket i = phần trăm điểm trong [i*10, i*10 + 10)
+    (bucket cuối gồm cả 100%)
+    """
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.CASCADE,
+        related_name='score_buckets',
+        verbose_name='Quiz'
+    )
+    bucket = models.PositiveSmallIntegerField(verbose_name='Khoảng điểm')
+    count = models.PositiveIntegerField(default=0, verbose_name='Số bài nộp')
+
+    class Meta:
+        db_table = 'quiz_score_buckets'
+        verbose_name = 'Phân bố điểm quiz'
+        verbose_name_plural = 'Phân bố điểm quiz'
+        unique_together = [['quiz', 'bucket']]
+        ordering = ['quiz', 'bucket']
+
+    def __str__(self):
+        return f"{self.quiz_id} [{self.bucket * 10}%]: {self.count}"
+
+
+class QuizQuestionStats(models.Model):
+    """Độ khó của câu hỏi: số lần được trả lời / trả lời đúng"""
+    question = models.OneToOneField(
+        QuizQuestion,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Câu hỏi'
+    )
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.CASCADE,
+        related_name='question_stats',
+        verbose_name='Quiz'
+    )
+    answer_count = models.PositiveIntegerField(default=0, verbose_name='Số lần trả lời')
+    correct_count = models.PositiveIntegerField(default=0, verbose_name='Số lần đúng')
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Ngày cập nhật')
+
+    class Meta:
+        db_table = 'quiz_question_stats'
+        verbose_name = 'Thống kê câu hỏi'
+        verbose_name_plural = 'Thống kê câu hỏi'
+        indexes = [
+            models.Index(fields=['quiz']),
+        ]
+
+    def __str__(self):
+        return f"Q{self.question_id}: {self.correct_count}/{self.answer_count}"
+
+    @property
+    def correct_rate(self):
+        """Tỉ lệ trả lời đúng (%)"""
+        if not self.answer_count:
+            return 0
+        return round(self.correct_count / self.answer_count * 100, 2)
+
+
+class QuestionOptionStats(models.Model):
+    """Số lần lựa chọn được chọn (phân tích phương án nhiễu)"""
+    option = models.OneToOneField(
+        QuestionOption,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Lựa chọn'
+    )
+    question = models.ForeignKey(
+        QuizQuestion,
+        on_delete=models.CASCADE,
+        related_name='option_stats',
+        verbose_name='Câu hỏi'
+    )
+    pick_count = models.PositiveIntegerField(default=0, verbose_name='Số lần được chọn')
+
+    class Meta:
+        db_table = 'question_option_stats'
+        verbose_name = 'Thống kê lựa chọn'
+        verbose_name_plural = 'Thống kê lựa chọn'
+        indexes = [
+            models.Index(fields=['question']),
+        ]
+
+    def __str__(self):
+        return f"Option {self.option_id}: {self.pick_count}"
+
+
+# ============================================================================
+# SEARCH INDEX (xem content/search_index.py)
+# ============================================================================
+
+class LessonSearchDocument(models.Model):
+    """
+    Tài liệu tìm kiếm denormalized của 1 bài học
+    Gom text của Lesson, Objectives, ContentBlocks, Challenges, Quizzes đã chuẩn hóa
+    (chữ thường, bỏ dấu tiếng Việt) - nguồn để dựng LessonSearchTerm
+    """
+    lesson = models.OneToOneField(
+        Lesson,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+        verbose_name='Bài học'
+    )
+    title = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Tiêu đề (đã chuẩn hóa)'
+    )
+    body = models.TextField(
+        blank=True,
+        verbose_name='Nội dung (đã chuẩn hóa)'
+    )
+    content_hash = models.CharField(
+        max_length=40,
+        verbose_name='Hash nội dung',
+        help_text='Không đổi -> không cần dựng lại term'
+    )
+    term_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Số term'
+    )
+
+    indexed_at = models.DateTimeField(auto_now=True, verbose_name='Ngày index')
+
+    class Meta:
+        db_table = 'lesson_search_documents'
+        verbose_name = 'Tài liệu tìm kiếm bài học'
+        verbose_name_plural = 'Tài liệu tìm kiếm bài học'
+
+    def __str__(self):
+        return f"{self.lesson_id}: {self.title}"
+
+
+class LessonSearchTerm(models.Model):
+    """
+    Inverted index: term (đã chuẩn hóa) -> bài học, kèm trọng số theo vị trí xuất hiện
+    Tra cứu bằng term = x hoặc term LIKE 'x%' (dùng index, không quét toàn bảng)
+    """
+    term = models.CharField(
+        max_length=64,
+        verbose_name='Term'
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Bài học'
+    )
+    weight = models.FloatField(
+        default=1.0,
+        verbose_name='Trọng số'
+    )
+
+    class Meta:
+        db_table = 'lesson_search_terms'
+        verbose_name = 'Term tìm kiếm'
+        verbose_name_plural = 'Term tìm kiếm'
+        unique_together = [['term', 'lesson']]
+        indexes = [
+            models.Index(fields=['lesson']),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.lesson_id} ({self.weight})"
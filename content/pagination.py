@@ -0,0 +1,36 @@
+"""
+Keyset (cursor) pagination cho các bảng append-only tăng trưởng nhanh
+(UserProgress, QuizSubmission, ClassEnrollment)
+- Không OFFSET, không COUNT(*) ở mỗi trang
+- Cursor ổn định theo (timestamp, id): bản ghi mới không làm lệch trang đang xem
+- Bật theo từng ViewSet qua pagination_class
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Phân trang keyset theo self.ordering (cố định, bỏ qua ?ordering=)
+    Response: {"next": "...?cursor=...", "previous": ..., "results": [...]}
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        # Thứ tự keyset phải cố định để cursor luôn hợp lệ
+        return self.ordering
+
+
+class UserProgressPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class QuizSubmissionPagination(KeysetPagination):
+    # started_at luôn có giá trị (submitted_at NULL khi bài đang làm dở)
+    ordering = ('-started_at', '-id')
+
+
+class ClassEnrollmentPagination(KeysetPagination):
+    ordering = ('-enrolled_at', '-id')
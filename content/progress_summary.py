@@ -0,0 +1,134 @@
+"""
+Tổng hợp tiến độ theo (học viên, khóa học con) - SubcourseProgress
+- Cập nhật tăng dần (+1/-1) khi UserProgress thay đổi trạng thái hoàn thành
+- Đọc phần trăm hoàn thành là O(1)
+- Rebuild toàn bộ (set-based) khi bài học được publish/unpublish
+  hoặc qua lệnh: python manage.py rebuild_progress_summaries
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, F, Q
+from django.utils import timezone
+
+from .models import Lesson, UserProgress, SubcourseProgress
+
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _published_lesson_counts(subcourse_ids=None):
+    """{subcourse_id: số bài học PUBLISHED} trong 1 grouped query"""
+    lessons = Lesson.objects.filter(status='PUBLISHED')
+    if subcourse_ids is not None:
+        lessons = lessons.filter(subcourse_id__in=subcourse_ids)
+    return dict(
+        lessons.order_by().values('subcourse_id').annotate(
+            total=Count('id')
+        ).values_list('subcourse_id', 'total')
+    )
+
+
+def _summary_rows(subcourse_ids=None, user_ids=None):
+    """
+    Grouped query: (user_id, subcourse_id, completed, last_activity)
+    completed chỉ tính các bài học PUBLISHED
+    """
+    progresses = UserProgress.objects.all()
+    if subcourse_ids is not None:
+        progresses = progresses.filter(lesson__subcourse_id__in=subcourse_ids)
+    if user_ids is not None:
+        progresses = progresses.filter(user_id__in=user_ids)
+    return progresses.order_by().values(
+        'user_id', 'lesson__subcourse_id'
+    ).annotate(
+        completed=Count('id', filter=Q(is_completed=True, lesson__status='PUBLISHED')),
+        last_activity=Max('updated_at'),
+    ).values_list('user_id', 'lesson__subcourse_id', 'completed', 'last_activity')
+
+
+def rebuild_summaries(subcourse_ids=None):
+    """
+    Tính lại toàn bộ SubcourseProgress từ UserProgress (set-based)
+    subcourse_ids=None -> rebuild tất cả
+    Trả về số dòng tổng hợp đã tạo
+    """
+    totals = _published_lesson_counts(subcourse_ids)
+    created = 0
+
+    with transaction.atomic():
+        summaries = SubcourseProgress.objects.all()
+        if subcourse_ids is not None:
+            summaries = summaries.filter(subcourse_id__in=subcourse_ids)
+        summaries.delete()
+
+        batch = []
+        for user_id, subcourse_id, completed, last_activity in _summary_rows(subcourse_ids).iterator():
+            batch.append(SubcourseProgress(
+                user_id=user_id,
+                subcourse_id=subcourse_id,
+                completed_lessons=completed,
+                total_lessons=totals.get(subcourse_id, 0),
+                last_activity_at=last_activity,
+            ))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                SubcourseProgress.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            SubcourseProgress.objects.bulk_create(batch)
+            created += len(batch)
+
+    return created
+
+
+def rebuild_summary(user_id, subcourse_id):
+    """Tính lại tổng hợp cho 1 cặp (user, subcourse)"""
+    total = _published_lesson_counts([subcourse_id]).get(subcourse_id, 0)
+    row = next(iter(_summary_rows([subcourse_id], [user_id])), None)
+    completed, last_activity = (row[2], row[3]) if row else (0, None)
+
+    summary, _ = SubcourseProgress.objects.update_or_create(
+        user_id=user_id,
+        subcourse_id=subcourse_id,
+        defaults={
+            'completed_lessons': completed,
+            'total_lessons': total,
+            'last_activity_at': last_activity,
+        }
+    )
+    return summary
+
+
+def get_summary(user_id, subcourse_id):
+    """Lấy tổng hợp tiến độ (1 query), tự tạo nếu chưa có"""
+    summary = SubcourseProgress.objects.filter(
+        user_id=user_id, subcourse_id=subcourse_id
+    ).first()
+    if summary is None:
+        try:
+            with transaction.atomic():
+                summary = rebuild_summary(user_id, subcourse_id)
+        except IntegrityError:
+            # Request khác vừa tạo cùng cặp
+            summary = SubcourseProgress.objects.get(user_id=user_id, subcourse_id=subcourse_id)
+    return summary
+
+
+def apply_completion_delta(user_id, subcourse_id, delta):
+    """
+    Cập nhật tăng dần completed_lessons bằng 1 UPDATE (F expression)
+    Chưa có dòng tổng hợp -> tính lại từ đầu cho cặp này
+    """
+    summaries = SubcourseProgress.objects.filter(user_id=user_id, subcourse_id=subcourse_id)
+    if delta < 0:
+        # Không để bộ đếm âm: nếu lệch dữ liệu thì rebuild bên dưới
+        summaries = summaries.filter(completed_lessons__gte=-delta)
+    updated = summaries.update(
+        completed_lessons=F('completed_lessons') + delta,
+        last_activity_at=timezone.now(),
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                rebuild_summary(user_id, subcourse_id)
+        except IntegrityError:
+            pass
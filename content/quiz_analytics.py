@@ -0,0 +1,292 @@
+"""
+Thống kê quiz (Quiz Analytics Rollups)
+- QuizStats: số bài nộp, số bài đạt passing_score, tổng phần trăm điểm (-> pass rate, điểm trung bình)
+- QuizScoreBucket: histogram phần trăm điểm theo khoảng 10%
+- QuizQuestionStats: số lần trả lời / trả lời đúng của từng câu hỏi (độ khó)
+- QuestionOptionStats: số lần mỗi lựa chọn được chọn (phương án nhiễu)
+
+Cập nhật:
+- Tăng dần khi bài nộp được chấm (content/attempts.py): mỗi bảng 1 UPDATE cho cả lô (CASE theo key)
+- Tính lại toàn bộ (chạy hằng đêm, sửa sai lệch khi bài nộp bị xóa / chấm lại):
+    python manage.py rebuild_quiz_analytics
+API / admin chỉ đọc các bảng tổng hợp, không bao giờ quét bảng QuizAnswer khi tải trang
+"""
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Floor, Least
+from django.utils import timezone
+
+from .models import (
+    QuizQuestion, QuestionOption, QuizSubmission, QuizAnswer,
+    QuizStats, QuizScoreBucket, QuizQuestionStats, QuestionOptionStats,
+)
+
+
+HISTOGRAM_BUCKETS = 10
+# Bài nộp được tính vào thống kê (in_progress chưa có điểm)
+COUNTED_STATUSES = ('submitted', 'graded')
+REBUILD_BATCH_SIZE = 1000
+
+
+def score_bucket(percentage):
+    """Khoảng điểm 0..HISTOGRAM_BUCKETS-1 (100% thuộc khoảng cuối)"""
+    return max(min(int((percentage or 0) // 10), HISTOGRAM_BUCKETS - 1), 0)
+
+
+# ============================================================================
+# CẬP NHẬT TĂNG DẦN
+# ============================================================================
+
+def _conditions(key_fields, key):
+    return dict(zip(key_fields, key if isinstance(key, tuple) else (key,)))
+
+
+def _keys_filter(key_fields, keys):
+    if len(key_fields) == 1:
+        return Q(**{f'{key_fields[0]}__in': keys})
+    return reduce(or_, (Q(**_conditions(key_fields, key)) for key in keys))
+
+
+def _add(model, key_fields, deltas, keys):
+    """
+    1 UPDATE cho mọi key: field = field + CASE WHEN key = ... THEN delta ELSE 0 END
+    deltas: {field: {key: delta}}, trả về số dòng đã cập nhật
+    """
+    changes = {}
+    for field, values in deltas.items():
+        whens = [
+            When(**_conditions(key_fields, key), then=Value(delta))
+            for key, delta in values.items() if key in keys and delta
+        ]
+        if whens:
+            output_field = FloatField() if any(isinstance(delta, float) for delta in values.values()) else IntegerField()
+            changes[field] = F(field) + Case(*whens, default=Value(0), output_field=output_field)
+    if not changes:
+        return len(keys)
+    if any(field.name == 'updated_at' for field in model._meta.fields):
+        changes['updated_at'] = timezone.now()
+    return model.objects.filter(_keys_filter(key_fields, keys)).update(**changes)
+
+
+def _apply(model, key_fields, deltas, build):
+    """
+    Cộng deltas vào bảng tổng hợp
+    Thiếu dòng (lần đầu gặp key) -> tạo dòng bộ đếm 0 (ignore_conflicts) rồi cộng phần còn thiếu
+    """
+    keys = set()
+    for values in deltas.values():
+        keys.update(values)
+    if not keys or _add(model, key_fields, deltas, keys) == len(keys):
+        return
+    existing = {
+        row if len(key_fields) > 1 else row[0]
+        for row in model.objects.filter(_keys_filter(key_fields, keys)).values_list(*key_fields)
+    }
+    # Dòng đã có đã được cộng ở UPDATE đầu tiên
+    missing = keys - existing
+    model.objects.bulk_create([build(key) for key in missing], ignore_conflicts=True)
+    _add(model, key_fields, deltas, missing)
+
+
+def record_submissions(submissions, answers):
+    """
+    Cộng kết quả các bài nộp vừa chấm vào bảng tổng hợp (gọi sau khi commit)
+    answers: các QuizAnswer vừa tạo (đã gán quiz_submission)
+    Tối đa 4 UPDATE cho cả lô khi các dòng tổng hợp đã tồn tại
+    """
+    submissions = [submission for submission in submissions if submission.status in COUNTED_STATUSES]
+    if not submissions:
+        return
+    counted_ids = {submission.id for submission in submissions}
+
+    submission_counts, passed_counts, percentage_sums = Counter(), Counter(), Counter()
+    buckets = Counter()
+    for submission in submissions:
+        submission_counts[submission.quiz_id] += 1
+        passed_counts[submission.quiz_id] += int(bool(submission.is_passed))
+        percentage_sums[submission.quiz_id] += float(submission.percentage or 0)
+        buckets[(submission.quiz_id, score_bucket(submission.percentage))] += 1
+
+    question_quiz, option_question = {}, {}
+    answer_counts, correct_counts, picks = Counter(), Counter(), Counter()
+    for answer in answers:
+        submission = answer.quiz_submission
+        if submission.id not in counted_ids:
+            continue
+        question_quiz[answer.question_id] = submission.quiz_id
+        answer_counts[answer.question_id] += 1
+        correct_counts[answer.question_id] += int(answer.is_correct)
+        for option_id in answer.selected_option_ids or []:
+            option_question[option_id] = answer.question_id
+            picks[option_id] += 1
+
+    with transaction.atomic():
+        _apply(QuizStats, ('quiz_id',), {
+            'submission_count': submission_counts,
+            'passed_count': passed_counts,
+            'percentage_sum': percentage_sums,
+        }, lambda quiz_id: QuizStats(quiz_id=quiz_id))
+        _apply(QuizScoreBucket, ('quiz_id', 'bucket'), {
+            'count': buckets,
+        }, lambda key: QuizScoreBucket(quiz_id=key[0], bucket=key[1]))
+        _apply(QuizQuestionStats, ('question_id',), {
+            'answer_count': answer_counts,
+            'correct_count': correct_counts,
+        }, lambda question_id: QuizQuestionStats(question_id=question_id, quiz_id=question_quiz[question_id]))
+        _apply(QuestionOptionStats, ('option_id',), {
+            'pick_count': picks,
+        }, lambda option_id: QuestionOptionStats(option_id=option_id, question_id=option_question[option_id]))
+
+
+# ============================================================================
+# REBUILD (batch hằng đêm)
+# ============================================================================
+
+def _rebuild_quiz(quiz_id):
+    """Tính lại 4 bảng tổng hợp của 1 quiz từ QuizSubmission / QuizAnswer (grouped queries)"""
+    submissions = QuizSubmission.objects.filter(quiz_id=quiz_id, status__in=COUNTED_STATUSES)
+    totals = submissions.aggregate(
+        submission_count=Count('id'),
+        passed_count=Count('id', filter=Q(is_passed=True)),
+        percentage_sum=Sum('percentage'),
+    )
+    bucket_counts = dict(submissions.order_by().annotate(
+        score_bucket=Least(Floor(F('percentage') / 10), Value(HISTOGRAM_BUCKETS - 1), output_field=IntegerField())
+    ).values('score_bucket').annotate(total=Count('id')).values_list('score_bucket', 'total'))
+
+    answers = QuizAnswer.objects.filter(
+        quiz_submission__quiz_id=quiz_id, quiz_submission__status__in=COUNTED_STATUSES
+    )
+    question_counts = {
+        question_id: (answered, correct)
+        for question_id, answered, correct in answers.order_by().values('question_id').annotate(
+            answered=Count('id'), correct=Count('id', filter=Q(is_correct=True))
+        ).values_list('question_id', 'answered', 'correct')
+    }
+    # Đếm lựa chọn từ JSON selected_option_ids (không GROUP BY được trên mọi DB)
+    picks = Counter()
+    for option_ids in answers.exclude(selected_option_ids=[]).values_list(
+        'selected_option_ids', flat=True
+    ).iterator(chunk_size=REBUILD_BATCH_SIZE):
+        picks.update(option_ids or [])
+
+    questions = list(QuizQuestion.objects.filter(quiz_id=quiz_id).values_list('id', flat=True))
+    options = list(QuestionOption.objects.filter(question__quiz_id=quiz_id).values_list('id', 'question_id'))
+
+    with transaction.atomic():
+        QuizStats.objects.filter(quiz_id=quiz_id).delete()
+        QuizScoreBucket.objects.filter(quiz_id=quiz_id).delete()
+        QuizQuestionStats.objects.filter(quiz_id=quiz_id).delete()
+        QuestionOptionStats.objects.filter(question__quiz_id=quiz_id).delete()
+        if not totals['submission_count']:
+            return 0
+
+        QuizStats.objects.create(
+            quiz_id=quiz_id,
+            submission_count=totals['submission_count'],
+            passed_count=totals['passed_count'],
+            percentage_sum=totals['percentage_sum'] or 0,
+        )
+        QuizScoreBucket.objects.bulk_create([
+            QuizScoreBucket(quiz_id=quiz_id, bucket=int(bucket or 0), count=count)
+            for bucket, count in bucket_counts.items()
+        ])
+        QuizQuestionStats.objects.bulk_create([
+            QuizQuestionStats(
+                quiz_id=quiz_id,
+                question_id=question_id,
+                answer_count=question_counts.get(question_id, (0, 0))[0],
+                correct_count=question_counts.get(question_id, (0, 0))[1],
+            )
+            for question_id in questions
+        ], batch_size=REBUILD_BATCH_SIZE)
+        QuestionOptionStats.objects.bulk_create([
+            QuestionOptionStats(option_id=option_id, question_id=question_id, pick_count=picks.get(option_id, 0))
+            for option_id, question_id in options
+        ], batch_size=REBUILD_BATCH_SIZE)
+    return totals['submission_count']
+
+
+def rebuild_analytics(quiz_ids=None):
+    """
+    Tính lại thống kê (quiz_ids=None -> mọi quiz), mỗi quiz 1 transaction riêng
+    Trả về (số quiz, số bài nộp đã tính)
+    """
+    if quiz_ids is None:
+        # Quiz có bài nộp + quiz đang có thống kê (đã hết bài nộp -> xóa thống kê)
+        quiz_ids = sorted(
+            set(QuizSubmission.objects.order_by().values_list('quiz_id', flat=True).distinct())
+            | set(QuizStats.objects.values_list('quiz_id', flat=True))
+        )
+    submission_total = 0
+    for quiz_id in quiz_ids:
+        submission_total += _rebuild_quiz(quiz_id)
+    return len(quiz_ids), submission_total
+
+
+# ============================================================================
+# BÁO CÁO (chỉ đọc bảng tổng hợp)
+# ============================================================================
+
+def _rate(count, total):
+    return round(count / total * 100, 2) if total else 0
+
+
+def get_report(stats):
+    """
+    Báo cáo đầy đủ của 1 quiz từ QuizStats (đã select_related quiz)
+    5 queries nhỏ trên bảng tổng hợp + câu hỏi / lựa chọn của quiz
+    """
+    quiz = stats.quiz
+    bucket_counts = dict(QuizScoreBucket.objects.filter(quiz=quiz).values_list('bucket', 'count'))
+    question_stats = {row.question_id: row for row in QuizQuestionStats.objects.filter(quiz=quiz)}
+    pick_counts = dict(QuestionOptionStats.objects.filter(
+        question__quiz=quiz
+    ).values_list('option_id', 'pick_count'))
+
+    questions = []
+    for question in QuizQuestion.objects.filter(quiz=quiz).prefetch_related('options').order_by('order', 'id'):
+        row = question_stats.get(question.id)
+        answer_count = row.answer_count if row else 0
+        correct_count = row.correct_count if row else 0
+        questions.append({
+            'id': question.id,
+            'question_text': question.question_text,
+            'question_type': question.question_type,
+            'order': question.order,
+            'points': question.points,
+            'answer_count': answer_count,
+            'skipped_count': max(stats.submission_count - answer_count, 0),
+            'correct_count': correct_count,
+            'correct_rate': _rate(correct_count, answer_count),
+            'options': [
+                {
+                    'id': option.id,
+                    'option_text': option.option_text,
+                    'is_correct': option.is_correct,
+                    'pick_count': pick_counts.get(option.id, 0),
+                    'pick_rate': _rate(pick_counts.get(option.id, 0), answer_count),
+                }
+                for option in question.options.all()
+            ],
+        })
+
+    return {
+        'quiz': quiz.id,
+        'quiz_title': quiz.title,
+        'passing_score': quiz.passing_score,
+        'submission_count': stats.submission_count,
+        'passed_count': stats.passed_count,
+        'pass_rate': stats.pass_rate,
+        'average_percentage': stats.average_percentage,
+        'histogram': [
+            {'from': bucket * 10, 'to': bucket * 10 + 10, 'count': bucket_counts.get(bucket, 0)}
+            for bucket in range(HISTOGRAM_BUCKETS)
+        ],
+        'questions': questions,
+        'updated_at': stats.updated_at,
+    }
@@ -0,0 +1,152 @@
+"""
+Cache đề quiz cho chấm điểm và phát đề (Quiz Answer Key / Delivery Cache)
+- Answer key: {question_id: loại câu, điểm, option hợp lệ, option đúng} đã biên dịch sẵn
+  -> QuizGrader chấm hoàn toàn trong bộ nhớ, không đọc QuestionOption mỗi lần nộp bài
+- Delivery document: đề đã bỏ is_correct / explanation (QuizDeliverySerializer),
+  1 bản dùng chung cho mọi học viên, xáo câu hỏi / lựa chọn theo seed của từng lần làm bài
+
+Hai tầng cache theo (quiz_id, Quiz.content_version):
+- Trong process (dict, không cần đọc cache dùng chung để giải nén lại)
+- Cache dùng chung (Redis khi có REDIS_URL) cho các process khác
+Quiz / QuizQuestion / QuestionOption thay đổi -> tăng Quiz.content_version trong DB (content/signals.py),
+cùng transaction với thay đổi -> mọi process đọc quiz đều thấy version mới, kể cả khi cache là LocMemCache
+"""
+import random
+
+from django.core.cache import cache
+from django.db.models import F, Prefetch
+
+from .models import Quiz, QuizQuestion, QuestionOption
+
+
+KEY_PREFIX = 'quiz'
+# Đề chỉ đổi khi admin sửa -> giữ lâu, version bump sẽ vô hiệu hóa
+DOCUMENT_TIMEOUT = 60 * 60 * 24
+# Số mục tối đa trong cache của process (vượt -> xóa hết, nạp lại từ cache dùng chung)
+LOCAL_MAX_ENTRIES = 512
+
+_local = {}
+
+
+def _entry_key(kind, quiz_id, version):
+    return f'{KEY_PREFIX}:{kind}:{quiz_id}:v{version}'
+
+
+def bump_versions(quiz_ids):
+    """Tăng Quiz.content_version (1 UPDATE) -> answer key và delivery document cũ không còn được đọc"""
+    Quiz.objects.filter(pk__in=set(quiz_ids)).update(content_version=F('content_version') + 1)
+
+
+def _get(kind, quiz, build, load=None):
+    """
+    Đọc theo thứ tự: process -> cache dùng chung -> build() (DB)
+    load: chuyển dữ liệu thô (picklable) thành object dùng trong process
+    quiz chỉ cần id và content_version đã đọc từ DB
+    """
+    version = quiz.content_version
+    local_key = (kind, quiz.id)
+    entry = _local.get(local_key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    key = _entry_key(kind, quiz.id, version)
+    data = cache.get(key)
+    if data is None:
+        data = build(quiz)
+        cache.set(key, data, DOCUMENT_TIMEOUT)
+    value = load(data) if load else data
+
+    if len(_local) >= LOCAL_MAX_ENTRIES:
+        _local.clear()
+    _local[local_key] = (version, value)
+    return value
+
+
+# ============================================================================
+# ANSWER KEY
+# ============================================================================
+
+class KeyQuestion:
+    """Câu hỏi trong answer key (chỉ các field cần để chấm)"""
+    __slots__ = ('id', 'question_type', 'points', 'option_ids', 'correct_option_ids')
+
+    def __init__(self, id, question_type, points, option_ids, correct_option_ids):
+        self.id = id
+        self.question_type = question_type
+        self.points = points
+        self.option_ids = frozenset(option_ids)
+        self.correct_option_ids = frozenset(correct_option_ids)
+
+
+class AnswerKey:
+    """Answer key đã biên dịch của 1 quiz (chỉ đọc, dùng chung giữa các request)"""
+
+    def __init__(self, rows):
+        self.questions = {row[0]: KeyQuestion(*row) for row in rows}
+        self.max_score = sum(question.points for question in self.questions.values())
+        self.has_open_questions = any(
+            question.question_type == 'open' for question in self.questions.values()
+        )
+
+
+def build_answer_key(quiz):
+    """[(question_id, question_type, points, [option_ids], [correct_option_ids])] (2 queries)"""
+    questions = {}
+    for question_id, question_type, points in QuizQuestion.objects.filter(
+        quiz=quiz
+    ).order_by('order', 'id').values_list('id', 'question_type', 'points'):
+        questions[question_id] = (question_id, question_type, points, [], [])
+
+    for option_id, question_id, is_correct in QuestionOption.objects.filter(
+        question__quiz=quiz
+    ).order_by('order', 'id').values_list('id', 'question_id', 'is_correct'):
+        if question_id not in questions:
+            continue
+        questions[question_id][3].append(option_id)
+        if is_correct:
+            questions[question_id][4].append(option_id)
+    return list(questions.values())
+
+
+def get_answer_key(quiz):
+    return _get('key', quiz, build_answer_key, AnswerKey)
+
+
+# ============================================================================
+# DELIVERY DOCUMENT (đề đã bỏ đáp án)
+# ============================================================================
+
+def build_delivery_document(quiz):
+    from .serializers import QuizDeliverySerializer
+
+    quiz = Quiz.objects.filter(pk=quiz.pk).prefetch_related(
+        Prefetch('questions', queryset=QuizQuestion.objects.prefetch_related('options'))
+    ).get()
+    return dict(QuizDeliverySerializer(quiz).data)
+
+
+def get_delivery_document(quiz):
+    """Đề gốc (chưa xáo) dùng chung cho mọi học viên -> không được sửa tại chỗ"""
+    return _get('delivery', quiz, build_delivery_document)
+
+
+def shuffle_document(document, seed):
+    """
+    Bản sao đề với thứ tự câu hỏi / lựa chọn xáo theo seed (theo shuffle_questions / shuffle_options)
+    Cùng seed -> cùng thứ tự (học viên tải lại trang vẫn thấy đề như cũ)
+    """
+    rng = random.Random(f"{document['id']}:{seed}")
+    questions = [dict(question) for question in document['questions']]
+    if document['shuffle_questions']:
+        rng.shuffle(questions)
+    if document['shuffle_options']:
+        for question in questions:
+            options = list(question['options'])
+            rng.shuffle(options)
+            question['options'] = options
+    return dict(document, questions=questions)
+
+
+def get_attempt_document(quiz, submission):
+    """Đề cho 1 lần làm bài (seed = id của QuizSubmission)"""
+    return shuffle_document(get_delivery_document(quiz), submission.id)
@@ -0,0 +1,259 @@
+"""
+Tìm kiếm bài học qua inverted index (thay cho SearchFilter LIKE '%term%')
+- LessonSearchDocument: text đã chuẩn hóa của bài học + nội dung con (1 dòng / lesson)
+- LessonSearchTerm: term -> lesson + trọng số (title > mục tiêu/tiêu đề con > nội dung)
+- Chuẩn hóa tiếng Việt không dấu: "Lập trình" ~ "lap trinh" ~ "LẬP TRÌNH"
+- Xếp hạng: tổng weight * idf, bài học phải khớp mọi từ khóa, từ cuối khớp tiền tố (gõ dở)
+- Index được cập nhật khi Lesson / nội dung con thay đổi (content/signals.py)
+  và dựng lại toàn bộ bằng: python manage.py rebuild_search_index
+
+Dùng bảng thường thay vì MySQL FULLTEXT: FULLTEXT không bỏ dấu tiếng Việt theo cách
+ta cần và không chạy trên SQLite (dev); lookup term = / LIKE 'x%' dùng được unique index.
+"""
+import hashlib
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.html import strip_tags
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from . import catalog_cache
+from .models import Lesson, LessonSearchDocument, LessonSearchTerm
+
+
+MIN_TOKEN_LENGTH = 2
+MAX_TERM_LENGTH = 64
+# Giới hạn TextField (MySQL TEXT = 64KB)
+MAX_BODY_LENGTH = 60000
+MAX_QUERY_TOKENS = 8
+MAX_RESULTS = 500
+REINDEX_BATCH_SIZE = 200
+
+# Trọng số theo vị trí xuất hiện
+TITLE_WEIGHT = 5.0
+HEADING_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    """Chữ thường, bỏ HTML và dấu tiếng Việt (đ -> d)"""
+    if not text:
+        return ''
+    text = strip_tags(text).replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """Tách term từ text đã hoặc chưa chuẩn hóa"""
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in _TOKEN_RE.findall(normalize(text))
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+
+
+# ============================================================================
+# DỰNG INDEX
+# ============================================================================
+
+def _lesson_sections(lesson):
+    """[(trọng số, text)] của bài học và nội dung con (đã prefetch)"""
+    sections = [
+        (TITLE_WEIGHT, lesson.title),
+        (HEADING_WEIGHT, lesson.objective),
+        (HEADING_WEIGHT, lesson.knowledge_skills),
+        (BODY_WEIGHT, lesson.content_text),
+    ]
+    for objective in lesson.objectives.all():
+        sections.append((HEADING_WEIGHT, objective.text))
+    for block in lesson.content_blocks.all():
+        sections += [
+            (HEADING_WEIGHT, block.title), (HEADING_WEIGHT, block.subtitle),
+            (BODY_WEIGHT, block.description), (BODY_WEIGHT, block.usage_text), (BODY_WEIGHT, block.example_text),
+        ]
+    for challenge in lesson.challenges.all():
+        sections += [
+            (HEADING_WEIGHT, challenge.title), (HEADING_WEIGHT, challenge.subtitle),
+            (BODY_WEIGHT, challenge.instructions),
+        ]
+    for quiz in lesson.quizzes.all():
+        sections += [(HEADING_WEIGHT, quiz.title), (BODY_WEIGHT, quiz.description)]
+        sections += [(BODY_WEIGHT, question.question_text) for question in quiz.questions.all()]
+    return [(weight, normalize(text)) for weight, text in sections if text]
+
+
+def build_document(lesson):
+    """(LessonSearchDocument, {term: weight}) cho 1 bài học"""
+    sections = _lesson_sections(lesson)
+    raw_weights = Counter()
+    for weight, text in sections:
+        for token in tokenize(text):
+            raw_weights[token] += weight
+    # Giảm ảnh hưởng của term lặp nhiều lần (1 + log)
+    weights = {term: round(1 + math.log(raw), 4) for term, raw in raw_weights.items()}
+
+    title = normalize(lesson.title)[:255]
+    body = '\n'.join(text for _, text in sections[1:])[:MAX_BODY_LENGTH]
+    document = LessonSearchDocument(
+        lesson_id=lesson.id,
+        title=title,
+        body=body,
+        content_hash=hashlib.sha1(f'{title}\n{body}'.encode('utf-8')).hexdigest(),
+        term_count=len(weights),
+    )
+    return document, weights
+
+
+def _load_lessons(lesson_ids):
+    return Lesson.objects.filter(id__in=lesson_ids).prefetch_related(
+        'objectives', 'content_blocks', 'challenges', 'quizzes', 'quizzes__questions'
+    )
+
+
+@transaction.atomic
+def reindex_lessons(lesson_ids, force=False):
+    """
+    Dựng lại document + term cho các bài học (bỏ qua bài nội dung không đổi trừ khi force)
+    Trả về số bài học đã ghi lại index
+    """
+    lesson_ids = {lesson_id for lesson_id in lesson_ids if lesson_id}
+    if not lesson_ids:
+        return 0
+    existing = dict(LessonSearchDocument.objects.filter(
+        lesson_id__in=lesson_ids
+    ).values_list('lesson_id', 'content_hash'))
+
+    documents, terms = [], []
+    for lesson in _load_lessons(lesson_ids):
+        document, weights = build_document(lesson)
+        if not force and existing.get(lesson.id) == document.content_hash:
+            continue
+        documents.append(document)
+        terms.extend(
+            LessonSearchTerm(term=term, lesson_id=lesson.id, weight=weight)
+            for term, weight in weights.items()
+        )
+
+    if documents:
+        changed_ids = [document.lesson_id for document in documents]
+        LessonSearchTerm.objects.filter(lesson_id__in=changed_ids).delete()
+        LessonSearchDocument.objects.filter(lesson_id__in=changed_ids).delete()
+        LessonSearchDocument.objects.bulk_create(documents, batch_size=REINDEX_BATCH_SIZE)
+        LessonSearchTerm.objects.bulk_create(terms, batch_size=1000)
+        # Kết quả ?search= trong cache catalog phải phản ánh nội dung mới
+        transaction.on_commit(catalog_cache.bump_version)
+    return len(documents)
+
+
+def rebuild_index(lesson_ids=None, force=False):
+    """Dựng lại index theo lô (mặc định: mọi bài học)"""
+    if lesson_ids is None:
+        lesson_ids = list(Lesson.objects.order_by('id').values_list('id', flat=True))
+    lesson_ids = list(lesson_ids)
+    written = 0
+    for start in range(0, len(lesson_ids), REINDEX_BATCH_SIZE):
+        written += reindex_lessons(lesson_ids[start:start + REINDEX_BATCH_SIZE], force=force)
+    return written
+
+
+def schedule_reindex(lesson_ids):
+    """Reindex sau khi transaction hiện tại commit (dùng trong signals)"""
+    lesson_ids = [lesson_id for lesson_id in set(lesson_ids) if lesson_id]
+    if lesson_ids:
+        transaction.on_commit(lambda: reindex_lessons(lesson_ids))
+
+
+# ============================================================================
+# TRA CỨU
+# ============================================================================
+
+def parse_query(query):
+    """Các term duy nhất của câu truy vấn (giữ thứ tự, tối đa MAX_QUERY_TOKENS)"""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+
+
+def _token_q(token, prefix):
+    # Term đã chữ thường -> istartswith (LIKE 'x%', không ép BINARY) vẫn dùng được index
+    return Q(term__istartswith=token) if prefix else Q(term=token)
+
+
+def search_lessons(query, queryset=None, limit=MAX_RESULTS):
+    """
+    [(lesson_id, score)] xếp theo điểm giảm dần
+    queryset: giới hạn trong các bài học này (vd: chỉ bài đã publish)
+    """
+    tokens = parse_query(query)
+    if not tokens:
+        return []
+    conditions = [_token_q(token, prefix=index == len(tokens) - 1) for index, token in enumerate(tokens)]
+    any_condition = Q()
+    for condition in conditions:
+        any_condition |= condition
+
+    postings = LessonSearchTerm.objects.filter(any_condition)
+    if queryset is not None:
+        postings = postings.filter(lesson__in=queryset.order_by().values('pk'))
+    rows = list(postings.values_list('lesson_id', 'term', 'weight'))
+
+    # idf theo từng term trong tập bài học khớp
+    total_documents = max(LessonSearchDocument.objects.count(), 1)
+    document_frequency = Counter(term for _, term, _ in rows)
+
+    last = len(tokens) - 1
+    scores = defaultdict(float)
+    matched = defaultdict(set)
+    for lesson_id, term, weight in rows:
+        idf = math.log(1 + total_documents / document_frequency[term])
+        for index, token in enumerate(tokens):
+            if term == token or (index == last and term.startswith(token)):
+                matched[lesson_id].add(index)
+                # Khớp tiền tố điểm thấp hơn khớp nguyên từ
+                scores[lesson_id] += weight * idf * (1.0 if term == token else 0.5)
+
+    results = [
+        (lesson_id, round(score, 4))
+        for lesson_id, score in scores.items()
+        if len(matched[lesson_id]) == len(tokens)
+    ]
+    results.sort(key=lambda item: (-item[1], item[0]))
+    return results[:limit]
+
+
+class LessonSearchFilter(filters.BaseFilterBackend):
+    """
+    Filter backend ?search= cho queryset Lesson qua inverted index
+    Không có ?ordering= -> sắp theo độ liên quan (đặt sau OrderingFilter trong filter_backends)
+    """
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        ranked = search_lessons(query, queryset)
+        lesson_ids = [lesson_id for lesson_id, _ in ranked]
+        queryset = queryset.filter(pk__in=lesson_ids)
+        if lesson_ids and self.ordering_param not in request.query_params:
+            queryset = queryset.order_by(Case(
+                *[When(pk=lesson_id, then=Value(position)) for position, lesson_id in enumerate(lesson_ids)],
+                output_field=IntegerField()
+            ))
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Tìm kiếm bài học (không phân biệt dấu, xếp theo độ liên quan)',
+            'schema': {'type': 'string'},
+        }]
@@ -5,12 +5,14 @@ Mở rộng: Objectives, Models, AssemblyGuide, Preparation, BuildBlocks,
 ContentBlocks, Attachments, Challenges, Quizzes
 """
 from rest_framework import serializers
+
+from profiling.guards import GuardedMethodField, prefetched_count
 from .models import (
-    Program, Subcourse, Lesson, UserProgress,
+    Program, Subcourse, Lesson, UserProgress, SubcourseProgress,
     Media, LessonObjective, LessonModel, AssemblyGuide, Preparation,
     BuildBlock, PreparationBuildBlock, LessonContentBlock, LessonAttachment,
     Challenge, Quiz, QuizQuestion, QuestionOption,
-    QuizSubmission, QuizAnswer
+    QuizSubmission, QuizAnswer, QuizStats
 )
 
 
@@ -111,8 +113,11 @@ class SubcourseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_lesson_count(self, obj):
-        """Đếm số lượng bài học"""
-        return obj.lessons.count()
+        """Số bài học đã publish (ưu tiên giá trị annotate từ with_catalog_counts)"""
+        count = getattr(obj, 'published_lesson_count', None)
+        if count is None:
+            count = obj.lessons.filter(status='PUBLISHED').count()
+        return count
 
 
 class SubcourseListSerializer(serializers.ModelSerializer):
@@ -157,8 +162,11 @@ class SubcourseListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
     
     def get_lesson_count(self, obj):
-        """Đếm số lượng bài học"""
-        return obj.lessons.count()
+        """Số bài học đã publish (ưu tiên giá trị annotate từ with_catalog_counts)"""
+        count = getattr(obj, 'published_lesson_count', None)
+        if count is None:
+            count = obj.lessons.filter(status='PUBLISHED').count()
+        return count
 
 
 class ProgramSerializer(serializers.ModelSerializer):
@@ -200,16 +208,22 @@ class ProgramSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_subcourse_count(self, obj):
-        """Đếm số lượng khóa con"""
-        return obj.subcourses.count()
+        """Số khóa con đã publish (ưu tiên giá trị annotate từ with_catalog_counts)"""
+        count = getattr(obj, 'published_subcourse_count', None)
+        if count is None:
+            count = obj.subcourses.filter(status='PUBLISHED').count()
+        return count
     
     def get_total_lessons(self, obj):
-        """Đếm tổng số bài học trong tất cả subcourses"""
-        from .models import Lesson
-        return Lesson.objects.filter(
-            subcourse__program=obj, 
-            status='PUBLISHED'
-        ).count()
+        """Tổng số bài học đã publish trong các khóa con đã publish"""
+        count = getattr(obj, 'published_lesson_count', None)
+        if count is None:
+            count = Lesson.objects.filter(
+                subcourse__program=obj,
+                subcourse__status='PUBLISHED',
+                status='PUBLISHED'
+            ).count()
+        return count
 
 
 class ProgramListSerializer(serializers.ModelSerializer):
@@ -247,15 +261,22 @@ class ProgramListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
     
     def get_subcourse_count(self, obj):
-        """Đếm số lượng khóa con"""
-        return obj.subcourses.count()
+        """Số khóa con đã publish (ưu tiên giá trị annotate từ with_catalog_counts)"""
+        count = getattr(obj, 'published_subcourse_count', None)
+        if count is None:
+            count = obj.subcourses.filter(status='PUBLISHED').count()
+        return count
     
     def get_total_lessons(self, obj):
-        """Đếm tổng số bài học trong tất cả subcourses"""
-        return Lesson.objects.filter(
-            subcourse__program=obj, 
-            status='PUBLISHED'
-        ).count()
+        """Tổng số bài học đã publish trong các khóa con đã publish"""
+        count = getattr(obj, 'published_lesson_count', None)
+        if count is None:
+            count = Lesson.objects.filter(
+                subcourse__program=obj,
+                subcourse__status='PUBLISHED',
+                status='PUBLISHED'
+            ).count()
+        return count
 
 
 class UserProgressSerializer(serializers.ModelSerializer):
@@ -297,6 +318,26 @@ class UserProgressSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+
+class SubcourseProgressSerializer(serializers.ModelSerializer):
+    """Serializer cho tổng hợp tiến độ theo khóa học con (my-courses)"""
+    subcourse_slug = serializers.CharField(source='subcourse.slug', read_only=True)
+    subcourse_title = serializers.CharField(source='subcourse.title', read_only=True)
+    completion_percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SubcourseProgress
+        fields = [
+            'subcourse',
+            'subcourse_slug',
+            'subcourse_title',
+            'completed_lessons',
+            'total_lessons',
+            'completion_percentage',
+            'last_activity_at',
+        ]
+        read_only_fields = fields
+
 # ============================================================================
 # EXPANDED LESSON CONTENT SERIALIZERS
 # ============================================================================
@@ -365,7 +406,7 @@ class LessonModelSerializer(serializers.ModelSerializer):
 class AssemblyGuideSerializer(serializers.ModelSerializer):
     """Serializer cho Hướng dẫn lắp ráp"""
     media = MediaSerializer(many=True, read_only=True)
-    media_count = serializers.SerializerMethodField()
+    media_count = GuardedMethodField()
     
     class Meta:
         model = AssemblyGuide
@@ -382,8 +423,8 @@ class AssemblyGuideSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_media_count(self, obj):
-        """Đếm số media"""
-        return obj.media.count()
+        """Đếm số media (từ prefetch)"""
+        return prefetched_count(obj, 'media')
 
 
 class BuildBlockSerializer(serializers.ModelSerializer):
@@ -634,7 +675,7 @@ class QuizListSerializer(serializers.ModelSerializer):
         source='get_status_display',
         read_only=True
     )
-    question_count = serializers.SerializerMethodField()
+    question_count = GuardedMethodField()
     
     class Meta:
         model = Quiz
@@ -655,7 +696,7 @@ class QuizListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
     
     def get_question_count(self, obj):
-        return obj.questions.count()
+        return prefetched_count(obj, 'questions')
 
 
 class QuizDetailSerializer(serializers.ModelSerializer):
@@ -669,7 +710,7 @@ class QuizDetailSerializer(serializers.ModelSerializer):
         read_only=True
     )
     questions = QuizQuestionSerializer(many=True, read_only=True)
-    question_count = serializers.SerializerMethodField()
+    question_count = GuardedMethodField()
     
     class Meta:
         model = Quiz
@@ -697,7 +738,100 @@ class QuizDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_question_count(self, obj):
-        return obj.questions.count()
+        return prefetched_count(obj, 'questions')
+
+
+class QuestionOptionDeliverySerializer(serializers.ModelSerializer):
+    """Lựa chọn gửi cho học viên khi làm bài (không có is_correct)"""
+    
+    class Meta:
+        model = QuestionOption
+        fields = ['id', 'option_text', 'order']
+
+
+class QuizQuestionDeliverySerializer(serializers.ModelSerializer):
+    """Câu hỏi gửi cho học viên khi làm bài (không có giải thích / đáp án)"""
+    question_type_display = serializers.CharField(
+        source='get_question_type_display',
+        read_only=True
+    )
+    options = QuestionOptionDeliverySerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = QuizQuestion
+        fields = [
+            'id',
+            'question_text',
+            'question_type',
+            'question_type_display',
+            'points',
+            'options',
+            'order',
+        ]
+
+
+class QuizDeliverySerializer(serializers.ModelSerializer):
+    """
+    Đề quiz đã bỏ đáp án (content/quiz_cache.py cache 1 bản dùng chung cho mọi học viên)
+    Thứ tự câu hỏi / lựa chọn được xáo theo từng lần làm bài khi trả về
+    """
+    quiz_type_display = serializers.CharField(
+        source='get_quiz_type_display',
+        read_only=True
+    )
+    questions = QuizQuestionDeliverySerializer(many=True, read_only=True)
+    question_count = GuardedMethodField()
+    total_points = GuardedMethodField()
+    
+    class Meta:
+        model = Quiz
+        fields = [
+            'id',
+            'lesson',
+            'title',
+            'description',
+            'quiz_type',
+            'quiz_type_display',
+            'passing_score',
+            'max_attempts',
+            'time_limit_minutes',
+            'shuffle_questions',
+            'shuffle_options',
+            'status',
+            'order',
+            'questions',
+            'question_count',
+            'total_points',
+        ]
+    
+    def get_question_count(self, obj):
+        return prefetched_count(obj, 'questions')
+    
+    def get_total_points(self, obj):
+        return sum(question.points for question in obj.questions.all())
+
+
+class QuizStatsSerializer(serializers.ModelSerializer):
+    """Thống kê rút gọn của quiz (chi tiết: content/quiz_analytics.get_report)"""
+    quiz_title = serializers.CharField(source='quiz.title', read_only=True)
+    lesson = serializers.IntegerField(source='quiz.lesson_id', read_only=True)
+    passing_score = serializers.IntegerField(source='quiz.passing_score', read_only=True)
+    pass_rate = serializers.FloatField(read_only=True)
+    average_percentage = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = QuizStats
+        fields = [
+            'quiz',
+            'quiz_title',
+            'lesson',
+            'passing_score',
+            'submission_count',
+            'passed_count',
+            'pass_rate',
+            'average_percentage',
+            'updated_at',
+        ]
 
 
 # ============================================================================
@@ -708,6 +842,8 @@ class LessonDetailSerializer(serializers.ModelSerializer):
     """
     Serializer chi tiết cho Lesson với tất cả nested content
     Dùng cho lesson detail page
+    quizzes: đề đã bỏ đáp án (QuizDeliverySerializer),
+    context['include_quiz_answers'] = True (staff / ADMIN / TEACHER) -> QuizDetailSerializer kèm đáp án
     """
     status_display = serializers.CharField(
         source='get_status_display',
@@ -720,15 +856,15 @@ class LessonDetailSerializer(serializers.ModelSerializer):
     content_blocks = LessonContentBlockSerializer(many=True, read_only=True)
     attachments = LessonAttachmentSerializer(many=True, read_only=True)
     challenges = ChallengeSerializer(many=True, read_only=True)
-    quizzes = QuizDetailSerializer(many=True, read_only=True)
+    quizzes = QuizDeliverySerializer(many=True, read_only=True)
     
-    # Counts
-    objective_count = serializers.SerializerMethodField()
-    model_count = serializers.SerializerMethodField()
-    assembly_guide_count = serializers.SerializerMethodField()
-    attachment_count = serializers.SerializerMethodField()
-    challenge_count = serializers.SerializerMethodField()
-    quiz_count = serializers.SerializerMethodField()
+    # Counts (tính từ dữ liệu đã prefetch ở LessonDetailViewSet)
+    objective_count = GuardedMethodField()
+    model_count = GuardedMethodField()
+    assembly_guide_count = GuardedMethodField()
+    attachment_count = GuardedMethodField()
+    challenge_count = GuardedMethodField()
+    quiz_count = GuardedMethodField()
     
     class Meta:
         model = Lesson
@@ -771,20 +907,26 @@ class LessonDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('include_quiz_answers'):
+            fields['quizzes'] = QuizDetailSerializer(many=True, read_only=True)
+        return fields
+    
     def get_objective_count(self, obj):
-        return obj.objectives.count()
+        return prefetched_count(obj, 'objectives')
     
     def get_model_count(self, obj):
-        return obj.models.count()
+        return prefetched_count(obj, 'models')
     
     def get_assembly_guide_count(self, obj):
-        return obj.assembly_guides.count()
+        return prefetched_count(obj, 'assembly_guides')
     
     def get_attachment_count(self, obj):
-        return obj.attachments.count()
+        return prefetched_count(obj, 'attachments')
     
     def get_challenge_count(self, obj):
-        return obj.challenges.count()
+        return prefetched_count(obj, 'challenges')
     
     def get_quiz_count(self, obj):
-        return obj.quizzes.count()
\ No newline at end of file
+        return prefetched_count(obj, 'quizzes')
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+Signals cho ứng dụng Content
+- Vô hiệu hóa cache document bài học khi nội dung thay đổi
+- Vô hiệu hóa cache response catalog khi Program / Subcourse / Lesson thay đổi
+- Vô hiệu hóa answer key / đề quiz đã cache khi Quiz / QuizQuestion / QuestionOption thay đổi
+- Cập nhật tổng hợp tiến độ SubcourseProgress khi UserProgress / Lesson thay đổi
+- Cập nhật index tìm kiếm bài học khi Lesson / nội dung text con thay đổi
+"""
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+
+from . import catalog_cache, lesson_cache, progress_summary, quiz_cache, search_index
+from .models import (
+    Program, Subcourse, Lesson, UserProgress,
+    Media, LessonObjective, LessonModel, AssemblyGuide, Preparation,
+    BuildBlock, PreparationBuildBlock, LessonContentBlock, LessonAttachment,
+    Challenge, Quiz, QuizQuestion, QuestionOption,
+)
+
+
+# Các model con liên kết trực tiếp với Lesson qua lesson_id
+DIRECT_LESSON_MODELS = (
+    LessonObjective, LessonModel, AssemblyGuide, Preparation,
+    LessonContentBlock, LessonAttachment, Challenge, Quiz,
+)
+
+# Các model có quan hệ ManyToMany tới Media
+MEDIA_RELATED_MODELS = (LessonModel, AssemblyGuide, LessonContentBlock, Challenge)
+
+
+def get_affected_lesson_ids(instance):
+    """Tìm các lesson bị ảnh hưởng khi instance thay đổi"""
+    if isinstance(instance, Lesson):
+        return [instance.id]
+    if isinstance(instance, DIRECT_LESSON_MODELS):
+        return [instance.lesson_id]
+    if isinstance(instance, PreparationBuildBlock):
+        return list(Preparation.objects.filter(
+            id=instance.preparation_id
+        ).values_list('lesson_id', flat=True))
+    if isinstance(instance, QuizQuestion):
+        return list(Quiz.objects.filter(
+            id=instance.quiz_id
+        ).values_list('lesson_id', flat=True))
+    if isinstance(instance, QuestionOption):
+        return list(QuizQuestion.objects.filter(
+            id=instance.question_id
+        ).values_list('quiz__lesson_id', flat=True))
+    if isinstance(instance, Media):
+        lesson_ids = set()
+        for model in MEDIA_RELATED_MODELS:
+            lesson_ids.update(model.objects.filter(
+                media=instance
+            ).values_list('lesson_id', flat=True))
+        return list(lesson_ids)
+    if isinstance(instance, BuildBlock):
+        return list(Preparation.objects.filter(
+            preparation_build_blocks__build_block=instance
+        ).values_list('lesson_id', flat=True))
+    if isinstance(instance, Subcourse):
+        return list(instance.lessons.values_list('id', flat=True))
+    if isinstance(instance, Program):
+        return list(Lesson.objects.filter(
+            subcourse__program=instance
+        ).values_list('id', flat=True))
+    return []
+
+
+def invalidate_lesson_documents(instance):
+    """Tăng version cache sau khi transaction commit thành công"""
+    lesson_ids = [lesson_id for lesson_id in get_affected_lesson_ids(instance) if lesson_id]
+    if lesson_ids:
+        transaction.on_commit(lambda: lesson_cache.bump_versions(lesson_ids))
+
+
+LESSON_DOCUMENT_SENDERS = (
+    Program, Subcourse, Lesson, Media, BuildBlock, PreparationBuildBlock,
+    QuizQuestion, QuestionOption,
+) + DIRECT_LESSON_MODELS
+
+
+def lesson_document_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_lesson_documents(instance)
+
+
+def lesson_document_pre_delete(sender, instance, **kwargs):
+    # pre_delete: quan hệ cha vẫn còn trong DB để tra ngược lesson_id
+    invalidate_lesson_documents(instance)
+
+
+def lesson_document_media_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_lesson_documents(instance)
+
+
+for _model in LESSON_DOCUMENT_SENDERS:
+    post_save.connect(lesson_document_post_save, sender=_model)
+    pre_delete.connect(lesson_document_pre_delete, sender=_model)
+
+for _model in MEDIA_RELATED_MODELS:
+    m2m_changed.connect(lesson_document_media_changed, sender=_model.media.through)
+
+
+# ============================================================================
+# CACHE RESPONSE CATALOG
+# ============================================================================
+
+def catalog_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(catalog_cache.bump_version)
+
+
+for _model in (Program, Subcourse, Lesson):
+    post_save.connect(catalog_changed, sender=_model)
+    post_delete.connect(catalog_changed, sender=_model)
+
+# ============================================================================
+# ANSWER KEY / ĐỀ QUIZ (content/quiz_cache.py)
+# ============================================================================
+
+def get_affected_quiz_ids(instance):
+    if isinstance(instance, Quiz):
+        return [instance.id]
+    if isinstance(instance, QuizQuestion):
+        return [instance.quiz_id]
+    if isinstance(instance, QuestionOption):
+        return list(QuizQuestion.objects.filter(
+            id=instance.question_id
+        ).values_list('quiz_id', flat=True))
+    return []
+
+
+def invalidate_quiz_documents(instance):
+    quiz_ids = [quiz_id for quiz_id in get_affected_quiz_ids(instance) if quiz_id]
+    if quiz_ids:
+        # Version nằm trong DB -> tăng ngay trong transaction, commit cùng nội dung mới
+        quiz_cache.bump_versions(quiz_ids)
+
+
+def quiz_document_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_quiz_documents(instance)
+
+
+def quiz_document_pre_delete(sender, instance, **kwargs):
+    # Xóa Quiz -> câu hỏi / lựa chọn bị xóa theo, chỉ cần tăng version của quiz
+    if not isinstance(instance, Quiz):
+        invalidate_quiz_documents(instance)
+
+
+for _model in (Quiz, QuizQuestion, QuestionOption):
+    post_save.connect(quiz_document_post_save, sender=_model)
+    pre_delete.connect(quiz_document_pre_delete, sender=_model)
+
+
+# ============================================================================
+# INDEX TÌM KIẾM (LessonSearchDocument / LessonSearchTerm)
+# ============================================================================
+
+# Các model có text được đưa vào tài liệu tìm kiếm của bài học
+SEARCH_SENDERS = (Lesson, LessonObjective, LessonContentBlock, Challenge, Quiz, QuizQuestion)
+
+
+def search_index_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search_index.schedule_reindex(get_affected_lesson_ids(instance))
+
+
+def search_index_pre_delete(sender, instance, **kwargs):
+    # Xóa Lesson -> index bị xóa theo (CASCADE), chỉ cần reindex khi xóa nội dung con
+    if not isinstance(instance, Lesson):
+        search_index.schedule_reindex(get_affected_lesson_ids(instance))
+
+
+for _model in SEARCH_SENDERS:
+    post_save.connect(search_index_post_save, sender=_model)
+    pre_delete.connect(search_index_pre_delete, sender=_model)
+
+
+# ============================================================================
+# TỔNG HỢP TIẾN ĐỘ (SubcourseProgress)
+# ============================================================================
+
+def _published_subcourse_id(progress):
+    """subcourse_id của bài học nếu bài học đang PUBLISHED, ngược lại None"""
+    if UserProgress.lesson.is_cached(progress):
+        lesson = progress.lesson
+        return lesson.subcourse_id if lesson.status == 'PUBLISHED' else None
+    return Lesson.objects.filter(
+        id=progress.lesson_id, status='PUBLISHED'
+    ).values_list('subcourse_id', flat=True).first()
+
+
+def _apply_progress_delta(progress, delta):
+    subcourse_id = _published_subcourse_id(progress)
+    if subcourse_id:
+        progress_summary.apply_completion_delta(progress.user_id, subcourse_id, delta)
+
+
+def user_progress_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    was_completed = False if created else getattr(instance, '_loaded_is_completed', None)
+    instance._loaded_is_completed = instance.is_completed
+
+    if was_completed is None:
+        # Không biết trạng thái trước đó -> tính lại cặp (user, subcourse)
+        subcourse_id = _published_subcourse_id(instance)
+        if subcourse_id:
+            progress_summary.rebuild_summary(instance.user_id, subcourse_id)
+        return
+
+    delta = int(bool(instance.is_completed)) - int(bool(was_completed))
+    if delta:
+        _apply_progress_delta(instance, delta)
+
+
+def _is_cascade_delete(sender, origin):
+    """Bị xóa dây chuyền từ User / Lesson / Subcourse (dòng tổng hợp cũng bị xóa hoặc rebuild)"""
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return not issubclass(model, sender)
+
+
+def user_progress_post_delete(sender, instance, origin=None, **kwargs):
+    if _is_cascade_delete(sender, origin):
+        return
+    if instance.is_completed:
+        _apply_progress_delta(instance, -1)
+
+
+def rebuild_subcourse_summaries(subcourse_ids):
+    subcourse_ids = [subcourse_id for subcourse_id in set(subcourse_ids) if subcourse_id]
+    if subcourse_ids:
+        transaction.on_commit(lambda: progress_summary.rebuild_summaries(subcourse_ids))
+
+
+def lesson_summary_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = getattr(instance, '_loaded_status', None)
+    old_subcourse_id = getattr(instance, '_loaded_subcourse_id', None)
+    instance._loaded_status = instance.status
+    instance._loaded_subcourse_id = instance.subcourse_id
+
+    if created:
+        if instance.status == 'PUBLISHED':
+            rebuild_subcourse_summaries([instance.subcourse_id])
+        return
+    # Chỉ rebuild khi tổng số bài học PUBLISHED của khóa học thay đổi
+    if old_status != instance.status or old_subcourse_id != instance.subcourse_id:
+        rebuild_subcourse_summaries([instance.subcourse_id, old_subcourse_id])
+
+
+def lesson_summary_post_delete(sender, instance, **kwargs):
+    rebuild_subcourse_summaries([instance.subcourse_id])
+
+
+post_save.connect(user_progress_post_save, sender=UserProgress)
+post_delete.connect(user_progress_post_delete, sender=UserProgress)
+post_save.connect(lesson_summary_post_save, sender=Lesson)
+post_delete.connect(lesson_summary_post_delete, sender=Lesson)
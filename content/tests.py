@@ -0,0 +1,181 @@
+"""
+Tests cho app content
+- Admin changelist: số query không tăng theo số dòng dữ liệu (không N+1)
+- Fast serializer (.values()): JSON giống hệt từng byte với DRF serializer
+- Catalog cache: revalidate bằng ETag đã bị nén đổi thành W/"..." vẫn nhận 304
+
+Chạy: python manage.py test content.tests
+"""
+from datetime import datetime
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.generator import CurriculumGenerator
+from content import attempts, progress_summary, quiz_analytics, search_index
+from content.management.commands.check_fast_serializers import CASES
+from content.models import (
+    Program, Subcourse, Lesson, Media, Quiz, QuizQuestion, QuestionOption,
+)
+
+
+def seed_curriculum(subcourses, lessons, students, submissions_per_quiz):
+    """
+    Bộ dữ liệu đầy đủ cho mọi bảng có changelist trong admin content
+    (generator + bảng dẫn xuất + bài nộp quiz / thống kê)
+    """
+    CurriculumGenerator.reset()
+    CurriculumGenerator(
+        seed=7, programs=1, subcourses=subcourses, lessons=lessons, students=students,
+        students_per_class=students, questions=3, progress_ratio=1.0,
+    ).generate()
+    # generate() làm mới bảng dẫn xuất trong on_commit -> TestCase không commit, gọi trực tiếp
+    progress_summary.rebuild_summaries()
+    search_index.rebuild_index()
+
+    users = list(User.objects.filter(username__startswith='bench_st').order_by('id'))
+    for quiz in Quiz.objects.prefetch_related('questions__options').order_by('id'):
+        answers = [
+            {'question_id': question.id, 'selected_option_ids': [question.options.all()[0].id]}
+            for question in quiz.questions.all()
+        ]
+        for user in users[:submissions_per_quiz]:
+            attempts.submit_quiz(quiz, user, answers)
+    quiz_analytics.rebuild_analytics()
+
+
+class AdminChangelistQueryCountTests(TestCase):
+    """Mỗi changelist của app content: cùng số query với bộ dữ liệu nhỏ và lớn"""
+
+    def setUp(self):
+        cache.clear()
+        self.superuser = User.objects.create_superuser('admin_test', 'admin@example.com', 'pw')
+        self.client.force_login(self.superuser)
+
+    def _changelist_urls(self):
+        return {
+            model._meta.model_name: reverse(f'admin:content_{model._meta.model_name}_changelist')
+            for model in admin.site._registry
+            if model._meta.app_label == 'content'
+        }
+
+    def _get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        # Changelist rỗng bỏ qua prefetch -> số query không đại diện
+        self.assertGreater(response.context['cl'].result_count, 0, url)
+        return response
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        urls = self._changelist_urls()
+
+        seed_curriculum(subcourses=1, lessons=2, students=2, submissions_per_quiz=1)
+        expected = {}
+        for name, url in urls.items():
+            with CaptureQueriesContext(connection) as queries:
+                self._get(url)
+            expected[name] = len(queries)
+
+        seed_curriculum(subcourses=3, lessons=6, students=8, submissions_per_quiz=4)
+        for name, url in urls.items():
+            with self.subTest(changelist=name), self.assertNumQueries(expected[name]):
+                self._get(url)
+
+
+class FastSerializerParityTests(TestCase):
+    """
+    Cùng bộ CASES với lệnh check_fast_serializers, trên fixtures cố định:
+    choices (kể cả giá trị cũ không còn trong choices), chuỗi rỗng, datetime có / không microsecond,
+    cột annotate (subcourse không có bài / chỉ có bài nháp)
+    Các model này không có cột null -> chuỗi rỗng là trường hợp "không có giá trị"
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(
+            title='SPIKE Prime', slug='spike-prime', kit_type='SPIKE_PRIME', status='PUBLISHED',
+        )
+        full = Subcourse.objects.create(
+            program=program, title='Module 1', slug='module-1', coding_language='PYTHON',
+            description='Mô tả có "ngoặc kép" & <thẻ>', level='ADVANCED', level_number=3, session_count=12,
+            status='PUBLISHED', sort_order=1,
+        )
+        drafts_only = Subcourse.objects.create(
+            program=program, title='Module 2', slug='module-2', coding_language='ICON_BLOCKS',
+            status='DRAFT', sort_order=2,
+        )
+        Subcourse.objects.create(
+            program=program, title='Module 3', slug='module-3', coding_language='WORD_BLOCKS', sort_order=3,
+        )
+        Lesson.objects.create(subcourse=full, title='Bài 1', slug='bai-1', status='PUBLISHED', sort_order=1)
+        Lesson.objects.create(subcourse=full, title='Bài 2', slug='bai-2', status='PUBLISHED', sort_order=2)
+        Lesson.objects.create(subcourse=full, title='Bài 3', slug='bai-3', status='ARCHIVED', sort_order=3)
+        Lesson.objects.create(subcourse=drafts_only, title='Nháp', slug='nhap', status='DRAFT')
+        legacy = Lesson.objects.create(subcourse=drafts_only, title='Cũ', slug='cu', status='DRAFT')
+
+        image = Media.objects.create(
+            url='https://cdn.example.com/a.png', media_type='image', caption='Ảnh', alt_text='mô tả', order=1,
+        )
+        video = Media.objects.create(url='https://cdn.example.com/b.mp4', media_type='video')
+        legacy_media = Media.objects.create(url='https://cdn.example.com/c.bin', media_type='file')
+
+        quiz = Quiz.objects.create(lesson=legacy, title='Kiểm tra')
+        question = QuizQuestion.objects.create(quiz=quiz, question_text='Câu 1')
+        first = QuestionOption.objects.create(question=question, option_text='Đúng', is_correct=True)
+        second = QuestionOption.objects.create(question=question, option_text='', order=1)
+
+        # Dữ liệu cũ: giá trị ngoài choices hiện tại (ghi thẳng, bỏ qua validate)
+        Lesson.objects.filter(pk=legacy.pk).update(status='LEGACY')
+        Subcourse.objects.filter(pk=drafts_only.pk).update(coding_language='SCRATCH', level='EXPERT')
+        Media.objects.filter(pk=legacy_media.pk).update(media_type='model3d')
+
+        with_microseconds = datetime(2024, 3, 1, 8, 30, 15, 123456)
+        whole_second = datetime(2024, 3, 1, 8, 30, 15)
+        Media.objects.filter(pk=image.pk).update(created_at=with_microseconds)
+        Media.objects.filter(pk=video.pk).update(created_at=whole_second)
+        QuestionOption.objects.filter(pk=first.pk).update(created_at=with_microseconds)
+        QuestionOption.objects.filter(pk=second.pk).update(created_at=whole_second)
+
+    def test_fast_serializers_render_identical_json(self):
+        renderer = JSONRenderer()
+        for name, fast_class, get_queryset in CASES:
+            with self.subTest(case=name):
+                fast = fast_class()
+                queryset = get_queryset()
+                expected = renderer.render(fast.serializer_class(list(queryset), many=True).data)
+                actual = renderer.render(fast.serialize(queryset.values(*fast.columns)))
+                self.assertEqual(actual.decode(), expected.decode())
+                self.assertGreater(queryset.count(), 1)
+
+
+class CatalogRevalidationTests(TestCase):
+    """Response nén (gzip / br) có ETag weak -> If-None-Match với ETag đó phải nhận 304"""
+    urls = ('/api/content/programs/', '/api/content/subcourses/', '/api/content/lessons/')
+
+    @classmethod
+    def setUpTestData(cls):
+        CurriculumGenerator(
+            seed=7, programs=1, subcourses=2, lessons=3, students=1, students_per_class=1, questions=1,
+        ).generate()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_compressed_response_revalidates_with_returned_etag(self):
+        for encoding in ('gzip, deflate, br', 'gzip'):
+            for url in self.urls:
+                with self.subTest(url=url, encoding=encoding):
+                    response = self.client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(response.has_header('Content-Encoding'))
+                    etag = response['ETag']
+                    self.assertTrue(etag.startswith('W/'), etag)
+
+                    response = self.client.get(url, HTTP_ACCEPT_ENCODING=encoding, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 304)
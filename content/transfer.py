@@ -0,0 +1,430 @@
+"""
+Export / import cây nội dung Program -> Subcourse -> Lesson -> nội dung con dạng NDJSON
+- Mỗi dòng 1 bản ghi JSON: {"type": "lesson", "id": 12, "subcourse": 3, "title": ...}
+  (khóa ngoại ghi id cũ, quan hệ media M2M ghi thành bản ghi riêng "lessonmodel.media")
+- Export đọc từng bảng bằng .values().iterator() -> bộ nhớ không phụ thuộc kích thước chương trình
+- Import đọc từng dòng, gom theo lô và bulk_create theo thứ tự phụ thuộc (cha trước con),
+  ánh xạ id cũ -> id mới (chỉ giữ bảng id, không giữ object)
+- Media trùng url và BuildBlock trùng (program, title, pdf_url) được dùng lại thay vì tạo mới
+- Tương thích MySQL (custom_db không trả id sau bulk insert): id được đọc lại theo cha + thứ tự id
+
+Sử dụng: python manage.py export_content / import_content (hoặc action Export nội dung trong admin)
+"""
+import json
+from collections import Counter, defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from user_auth import entitlements
+from . import catalog_cache, search_index
+from .models import (
+    Program, Subcourse, Lesson, Media, LessonObjective, LessonModel, AssemblyGuide,
+    Preparation, BuildBlock, PreparationBuildBlock, LessonContentBlock, LessonAttachment,
+    Challenge, Quiz, QuizQuestion, QuestionOption,
+)
+
+
+FORMAT = 'lms-content'
+VERSION = 1
+BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+
+# Model có quan hệ media M2M (bản ghi "<type>.media")
+MEDIA_OWNERS = (LessonModel, AssemblyGuide, LessonContentBlock, Challenge)
+
+
+class ContentImportError(Exception):
+    """File import không hợp lệ (sai định dạng, thiếu bản ghi cha, ...) -> rollback toàn bộ"""
+
+
+class Entity:
+    """
+    1 loại bản ghi trong file
+    scope: lookup tới Subcourse để lọc khi export (None = xử lý riêng)
+    id_parent: khóa ngoại dùng để đọc lại id sau bulk_create (None = không cần id mới)
+    unique_fields: attname tạo thành khóa duy nhất -> gộp bản ghi trùng sau khi ánh xạ id
+    """
+
+    def __init__(self, name, model, scope=None, id_parent=None, unique_fields=()):
+        self.name = name
+        self.model = model
+        self.scope = scope
+        self.id_parent = id_parent
+        self.unique_fields = unique_fields
+        self.fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key
+            and not getattr(field, 'auto_now', False)
+            and not getattr(field, 'auto_now_add', False)
+        ]
+
+
+def _media_entity(owner):
+    through = owner.media.through
+    owner_field = owner.media.field.m2m_field_name()
+    return Entity(
+        f'{owner._meta.model_name}.media', through,
+        scope=f'{owner_field}__lesson__subcourse',
+        unique_fields=(f'{owner_field}_id', 'media_id'),
+    )
+
+
+# Thứ tự trong file = thứ tự import (cha luôn đứng trước con)
+ENTITIES = [
+    Entity('program', Program),
+    Entity('media', Media),
+    Entity('buildblock', BuildBlock, id_parent='program'),
+    Entity('subcourse', Subcourse, id_parent='program'),
+    Entity('lesson', Lesson, scope='subcourse', id_parent='subcourse'),
+    Entity('lessonobjective', LessonObjective, scope='lesson__subcourse'),
+    Entity('lessonmodel', LessonModel, scope='lesson__subcourse', id_parent='lesson'),
+    Entity('assemblyguide', AssemblyGuide, scope='lesson__subcourse', id_parent='lesson'),
+    Entity('preparation', Preparation, scope='lesson__subcourse', id_parent='lesson'),
+    Entity(
+        'preparationbuildblock', PreparationBuildBlock, scope='preparation__lesson__subcourse',
+        unique_fields=('preparation_id', 'build_block_id'),
+    ),
+    Entity('lessoncontentblock', LessonContentBlock, scope='lesson__subcourse', id_parent='lesson'),
+    Entity('lessonattachment', LessonAttachment, scope='lesson__subcourse'),
+    Entity('challenge', Challenge, scope='lesson__subcourse', id_parent='lesson'),
+    Entity('quiz', Quiz, scope='lesson__subcourse', id_parent='lesson'),
+    Entity('quizquestion', QuizQuestion, scope='quiz__lesson__subcourse', id_parent='quiz'),
+    Entity('questionoption', QuestionOption, scope='question__quiz__lesson__subcourse'),
+] + [_media_entity(owner) for owner in MEDIA_OWNERS]
+
+ENTITY_BY_NAME = {entity.name: entity for entity in ENTITIES}
+ENTITY_NAME_BY_MODEL = {entity.model: entity.name for entity in ENTITIES}
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def _export_queryset(entity, subcourses):
+    """Queryset các dòng của entity thuộc các khóa con được export"""
+    model = entity.model
+    if entity.scope:
+        return model.objects.filter(**{f'{entity.scope}__in': subcourses})
+    if model is Program:
+        return model.objects.filter(pk__in=subcourses.values('program_id'))
+    if model is Subcourse:
+        return model.objects.filter(pk__in=subcourses)
+    if model is BuildBlock:
+        return model.objects.filter(pk__in=PreparationBuildBlock.objects.filter(
+            preparation__lesson__subcourse__in=subcourses
+        ).values('build_block_id'))
+    if model is Media:
+        condition = Q()
+        for owner in MEDIA_OWNERS:
+            owner_field = owner.media.field.m2m_field_name()
+            condition |= Q(pk__in=owner.media.through.objects.filter(
+                **{f'{owner_field}__lesson__subcourse__in': subcourses}
+            ).values('media_id'))
+        return model.objects.filter(condition)
+    raise ValueError(f'Không có phạm vi export cho {entity.name}')
+
+
+def iter_export(program_slugs=None, subcourse_ids=None, counts=None):
+    """
+    Các dòng NDJSON (str, kết thúc bằng \n) của cây nội dung, đọc dần từng bảng
+    Mặc định export mọi chương trình; program_slugs / subcourse_ids để giới hạn
+    counts (Counter) nếu truyền vào được cộng số bản ghi theo type
+    """
+    subcourses = Subcourse.objects.all()
+    if program_slugs:
+        subcourses = subcourses.filter(program__slug__in=program_slugs)
+    if subcourse_ids:
+        subcourses = subcourses.filter(pk__in=subcourse_ids)
+    subcourses = subcourses.values('pk')
+    if counts is None:
+        counts = Counter()
+
+    yield _dumps({'type': 'header', 'format': FORMAT, 'version': VERSION, 'exported_at': timezone.now()})
+    for entity in ENTITIES:
+        names = {field.attname: field.name for field in entity.fields}
+        rows = _export_queryset(entity, subcourses).order_by('pk').values('pk', *names)
+        for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            record = {'type': entity.name, 'id': row.pop('pk')}
+            record.update((names[attname], value) for attname, value in row.items())
+            yield _dumps(record)
+            counts[entity.name] += 1
+
+
+def _dumps(record):
+    return json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def export_content(stream, program_slugs=None, subcourse_ids=None):
+    """Ghi cây nội dung ra stream (text) dạng NDJSON, trả về {type: số bản ghi}"""
+    counts = Counter()
+    stream.writelines(iter_export(program_slugs, subcourse_ids, counts))
+    return counts
+
+
+# ============================================================================
+# IMPORT
+# ============================================================================
+
+class ContentImporter:
+    """
+    Đọc NDJSON từng dòng và tạo lại cây nội dung
+    into_program: gộp mọi khóa con vào chương trình có sẵn (copy khóa con giữa các chương trình)
+    Mặc định: Program trùng slug được dùng lại, chưa có thì tạo mới
+    Khóa con trùng slug trong chương trình đích được đổi slug (-copy, -copy-2, ...)
+    """
+
+    def __init__(self, into_program=None):
+        self.into_program = into_program
+        self.ids = defaultdict(dict)  # type -> {id cũ: id mới}
+        self.counts = Counter()
+        self.media_by_url = {}
+        self.build_blocks = {}  # (program_id, title, pdf_url) -> id
+        self.build_block_programs = set()
+        self.subcourse_slugs = {}  # program_id -> {slug}
+        self.lesson_ids = []
+        self._buffer = []
+        self._buffer_type = None
+        self._header = False
+
+    def run(self, lines, dry_run=False):
+        """Import trong 1 transaction (lỗi ở bất kỳ dòng nào -> không ghi gì), trả về thống kê"""
+        with transaction.atomic():
+            for number, line in enumerate(lines, start=1):
+                if line.strip():
+                    self._read(number, line)
+            self._flush()
+            if not self._header:
+                raise ContentImportError('File rỗng hoặc thiếu dòng header')
+            if dry_run:
+                transaction.set_rollback(True)
+            else:
+                # bulk_create không phát signals -> làm mới index tìm kiếm và cache
+                lesson_ids = self.lesson_ids
+                transaction.on_commit(lambda: search_index.rebuild_index(lesson_ids))
+                transaction.on_commit(catalog_cache.bump_version)
+                transaction.on_commit(entitlements.invalidate_all)
+        return self.counts
+
+    def _read(self, number, line):
+        try:
+            record = json.loads(line)
+            record_type = record['type']
+        except (ValueError, TypeError, KeyError):
+            raise ContentImportError(f'Dòng {number}: không phải bản ghi JSON hợp lệ')
+
+        if record_type == 'header':
+            if record.get('format') != FORMAT or record.get('version') != VERSION:
+                raise ContentImportError(
+                    f'Dòng {number}: định dạng {record.get("format")} v{record.get("version")} không được hỗ trợ'
+                )
+            self._header = True
+            return
+        if not self._header:
+            raise ContentImportError('Dòng đầu tiên phải là header')
+        if record_type not in ENTITY_BY_NAME:
+            raise ContentImportError(f'Dòng {number}: loại bản ghi không hỗ trợ "{record_type}"')
+
+        if record_type != self._buffer_type or len(self._buffer) >= BATCH_SIZE:
+            self._flush()
+            self._buffer_type = record_type
+        self._buffer.append(record)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        entity = ENTITY_BY_NAME[self._buffer_type]
+        handler = getattr(self, f'_import_{entity.name}', self._import_rows)
+        handler(entity, self._buffer)
+        self._buffer = []
+
+    # ------------------------------------------------------------------
+    # Dựng object / đọc lại id
+    # ------------------------------------------------------------------
+
+    def _new_id(self, record_type, old_id):
+        try:
+            return self.ids[record_type][old_id]
+        except KeyError:
+            raise ContentImportError(f'Thiếu bản ghi {record_type} id={old_id} (phải đứng trước bản ghi tham chiếu)')
+
+    def _build(self, entity, record, **overrides):
+        values = {}
+        for field in entity.fields:
+            if field.name not in record:
+                continue
+            value = record[field.name]
+            if field.is_relation and value is not None:
+                value = self._new_id(ENTITY_NAME_BY_MODEL[field.related_model], value)
+            values[field.attname] = value
+        values.update(overrides)
+        return entity.model(**values)
+
+    def _create(self, entity, objects, records=None):
+        """bulk_create; nếu records != None: ghi nhận id cũ -> id mới theo đúng thứ tự"""
+        model = entity.model
+        if records is None:
+            model.objects.bulk_create(objects)
+            self.counts[entity.name] += len(objects)
+            return objects
+
+        before = model.objects.aggregate(top=Max('pk'))['top'] or 0
+        model.objects.bulk_create(objects)
+        if any(obj.pk is None for obj in objects):
+            # Các dòng của 1 INSERT nhận id tăng dần theo thứ tự VALUES
+            parent = f'{entity.id_parent}_id'
+            new_ids = list(model.objects.filter(**{
+                f'{parent}__in': {getattr(obj, parent) for obj in objects},
+                'pk__gt': before,
+            }).order_by('pk').values_list('pk', flat=True))
+            if len(new_ids) != len(objects):
+                raise ContentImportError(f'Không đọc lại được id {entity.name} sau bulk_create')
+            for obj, pk in zip(objects, new_ids):
+                obj.pk = pk
+
+        id_map = self.ids[entity.name]
+        for record, obj in zip(records, objects):
+            id_map[record['id']] = obj.pk
+        self.counts[entity.name] += len(objects)
+        return objects
+
+    def _import_rows(self, entity, records):
+        objects = [self._build(entity, record) for record in records]
+        if entity.unique_fields:
+            objects = self._merge_duplicates(entity, objects)
+        self._create(entity, objects, records if entity.id_parent else None)
+
+    def _merge_duplicates(self, entity, objects):
+        """Gộp dòng trùng khóa (do Media / BuildBlock được dùng lại), cộng dồn quantity"""
+        merged = {}
+        for obj in objects:
+            key = tuple(getattr(obj, attname) for attname in entity.unique_fields)
+            if key in merged:
+                if hasattr(obj, 'quantity'):
+                    merged[key].quantity += obj.quantity
+                self.counts[f'{entity.name}_merged'] += 1
+            else:
+                merged[key] = obj
+        return list(merged.values())
+
+    # ------------------------------------------------------------------
+    # Bản ghi cần xử lý riêng
+    # ------------------------------------------------------------------
+
+    def _import_program(self, entity, records):
+        id_map = self.ids[entity.name]
+        if self.into_program is not None:
+            for record in records:
+                id_map[record['id']] = self.into_program.pk
+            self.counts['program_reused'] += len(records)
+            return
+
+        existing = dict(Program.objects.filter(
+            slug__in=[record.get('slug') for record in records]
+        ).values_list('slug', 'pk'))
+        new_records = []
+        for record in records:
+            if record.get('slug') in existing:
+                id_map[record['id']] = existing[record['slug']]
+                self.counts['program_reused'] += 1
+            else:
+                new_records.append(record)
+        if not new_records:
+            return
+
+        entity.model.objects.bulk_create([self._build(entity, record) for record in new_records])
+        created = dict(Program.objects.filter(
+            slug__in=[record['slug'] for record in new_records]
+        ).values_list('slug', 'pk'))
+        for record in new_records:
+            id_map[record['id']] = created[record['slug']]
+        self.counts[entity.name] += len(new_records)
+
+    def _import_media(self, entity, records):
+        urls = {record['url'] for record in records} - set(self.media_by_url)
+        for url, pk in Media.objects.filter(url__in=urls).order_by('pk').values_list('url', 'pk'):
+            self.media_by_url.setdefault(url, pk)
+
+        new_records = {}
+        for record in records:
+            if record['url'] in self.media_by_url or record['url'] in new_records:
+                self.counts['media_reused'] += 1
+            else:
+                new_records[record['url']] = record
+        if new_records:
+            before = Media.objects.aggregate(top=Max('pk'))['top'] or 0
+            Media.objects.bulk_create([self._build(entity, record) for record in new_records.values()])
+            for url, pk in Media.objects.filter(
+                url__in=list(new_records), pk__gt=before
+            ).order_by('pk').values_list('url', 'pk'):
+                self.media_by_url.setdefault(url, pk)
+            self.counts[entity.name] += len(new_records)
+
+        id_map = self.ids[entity.name]
+        for record in records:
+            id_map[record['id']] = self.media_by_url[record['url']]
+
+    def _build_block_key(self, obj):
+        return (obj.program_id, obj.title, obj.pdf_url)
+
+    def _import_buildblock(self, entity, records):
+        objects = [self._build(entity, record) for record in records]
+        program_ids = {obj.program_id for obj in objects} - self.build_block_programs
+        for program_id, title, pdf_url, pk in BuildBlock.objects.filter(
+            program_id__in=program_ids
+        ).order_by('pk').values_list('program_id', 'title', 'pdf_url', 'pk'):
+            self.build_blocks.setdefault((program_id, title, pdf_url), pk)
+        self.build_block_programs |= program_ids
+
+        new_objects, new_records, pending = [], [], {}
+        for record, obj in zip(records, objects):
+            key = self._build_block_key(obj)
+            if key in self.build_blocks or key in pending:
+                self.counts['buildblock_reused'] += 1
+            else:
+                pending[key] = record['id']
+                new_objects.append(obj)
+                new_records.append(record)
+        if new_objects:
+            self._create(entity, new_objects, new_records)
+            for obj in new_objects:
+                self.build_blocks[self._build_block_key(obj)] = obj.pk
+
+        id_map = self.ids[entity.name]
+        for record, obj in zip(records, objects):
+            id_map[record['id']] = self.build_blocks[self._build_block_key(obj)]
+
+    def _unique_slug(self, program_id, slug):
+        if program_id not in self.subcourse_slugs:
+            self.subcourse_slugs[program_id] = set(
+                Subcourse.objects.filter(program_id=program_id).values_list('slug', flat=True)
+            )
+        taken = self.subcourse_slugs[program_id]
+        candidate, number = slug, 1
+        while candidate in taken:
+            suffix = '-copy' if number == 1 else f'-copy-{number}'
+            candidate = f'{slug[:255 - len(suffix)]}{suffix}'
+            number += 1
+        if candidate != slug:
+            self.counts['subcourse_renamed'] += 1
+        taken.add(candidate)
+        return candidate
+
+    def _import_subcourse(self, entity, records):
+        objects = []
+        for record in records:
+            obj = self._build(entity, record)
+            obj.slug = self._unique_slug(obj.program_id, obj.slug)
+            objects.append(obj)
+        self._create(entity, objects, records)
+
+    def _import_lesson(self, entity, records):
+        objects = self._create(entity, [self._build(entity, record) for record in records], records)
+        self.lesson_ids.extend(obj.pk for obj in objects)
+
+
+def import_content(lines, into_program=None, dry_run=False):
+    """Import NDJSON (iterable các dòng), trả về thống kê {type: số dòng tạo / dùng lại}"""
+    return ContentImporter(into_program=into_program).run(lines, dry_run=dry_run)
@@ -19,7 +19,9 @@ from .views import (
     ChallengeViewSet,
     QuizViewSet,
     QuizSubmissionViewSet,
+    QuizAnalyticsViewSet,
     LessonDetailViewSet,
+    CatalogSnapshotView,
 )
 
 # Tạo router cho DRF
@@ -46,11 +48,13 @@ router.register(r'challenges', ChallengeViewSet, basename='challenge')
 # Quiz & Assessments
 router.register(r'quizzes', QuizViewSet, basename='quiz')
 router.register(r'quiz-submissions', QuizSubmissionViewSet, basename='quizsubmission')
+router.register(r'quiz-analytics', QuizAnalyticsViewSet, basename='quizanalytics')
 
 # Composite Endpoint (Full Lesson Detail)
 router.register(r'lesson-details', LessonDetailViewSet, basename='lessondetail')
 
 # URL patterns
 urlpatterns = [
+    path('catalog-snapshot/', CatalogSnapshotView.as_view(), name='catalog-snapshot'),
     path('', include(router.urls)),
 ]
@@ -2,21 +2,41 @@
 Views (ViewSets) cho Content API
 Read-only endpoints cho Program, Subcourse, Lesson
 """
+import os
+
 from rest_framework import viewsets, filters, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Prefetch
+from django.http import FileResponse
 from django.utils import timezone
-
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+from api.streaming import StreamingListMixin
+from user_auth.entitlements import get_entitlements
+from user_auth.roles import can_view_quiz_answers
+from . import catalog_snapshot, lesson_cache
+from .catalog_cache import CatalogCacheMixin
+from .fieldsets import SparseFieldsetMixin, prune_data, FIELDS_PARAM
+from .fast_serializers import (
+    FastListMixin, LessonListValuesSerializer, SubcourseListValuesSerializer, MediaValuesSerializer,
+)
+from . import attempts, quiz_analytics, quiz_cache
+from .attempts import AttemptError
+from .pagination import UserProgressPagination, QuizSubmissionPagination
+from .progress_summary import get_summary
+from .search_index import LessonSearchFilter
 from .models import (
-    Program, Subcourse, Lesson, UserProgress,
+    Program, Subcourse, Lesson, UserProgress, SubcourseProgress,
     Media, LessonObjective, LessonModel, Preparation,
     BuildBlock, PreparationBuildBlock, LessonContentBlock, LessonAttachment,
-    Challenge, Quiz, QuizQuestion, QuestionOption,
-    QuizSubmission, QuizAnswer
+    Challenge, Quiz,
+    QuizSubmission, QuizAnswer, QuizStats
 )
 from .serializers import (
     ProgramSerializer,
@@ -26,6 +46,7 @@ from .serializers import (
     LessonSerializer,
     LessonListSerializer,
     UserProgressSerializer,
+    SubcourseProgressSerializer,
     MediaSerializer,
     LessonObjectiveSerializer,
     LessonModelSerializer,
@@ -40,6 +61,7 @@ from .serializers import (
     QuestionOptionSerializer,
     QuizSubmissionSerializer,
     QuizAnswerSerializer,
+    QuizStatsSerializer,
     LessonDetailSerializer,
 )
 
@@ -51,15 +73,19 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class ProgramViewSet(viewsets.ReadOnlyModelViewSet):
+class ProgramViewSet(CatalogCacheMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet cho Program (Chương trình học)
     Read-only: Học viên chỉ xem, không sửa
+    List & detail được cache (ETag / 304), xem content/catalog_cache.py
+    Hỗ trợ ?fields= và ?expand=subcourses (list), xem content/fieldsets.py
     
     Endpoints:
     - GET /api/programs/ - List tất cả programs
     - GET /api/programs/{slug}/ - Chi tiết 1 program (có nested subcourses)
     """
+    query_budgets = {'list': 6, 'retrieve': 6}  # Số query tối đa / action (profiling)
+    cached_actions = ('list', 'retrieve')
     permission_classes = [AllowAny]  # Cho phép truy cập công khai
     lookup_field = 'slug'  # Sử dụng slug thay vì id để lookup
     pagination_class = StandardResultsSetPagination
@@ -68,17 +94,30 @@ class ProgramViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['title', 'description']
     ordering_fields = ['sort_order', 'created_at', 'title']
     ordering = ['sort_order', 'title']
+    expandable_fields = {
+        'subcourses': lambda: SubcourseListSerializer(many=True, read_only=True),
+    }
+    
+    def get_field_prefetches(self):
+        return {
+            'subcourses': (Prefetch(
+                'subcourses',
+                queryset=Subcourse.objects.filter(
+                    status='PUBLISHED'
+                ).with_catalog_counts().order_by('sort_order', 'title')
+            ),),
+        }
     
     def get_queryset(self):
         """
         Chỉ lấy các Program đã published
-        Tối ưu hóa với prefetch_related để tránh N+1 queries
+        Số khóa con / bài học được annotate sẵn (không COUNT theo từng dòng)
+        Detail (hoặc list ?expand=subcourses): prefetch các subcourses đã published kèm lesson_count
         """
-        return Program.objects.filter(
+        queryset = Program.objects.filter(
             status='PUBLISHED'
-        ).prefetch_related(
-            'subcourses'
-        )
+        ).with_catalog_counts()
+        return self.prefetch_for_fields(queryset)
     
     def get_serializer_class(self):
         """
@@ -97,22 +136,30 @@ class ProgramViewSet(viewsets.ReadOnlyModelViewSet):
         return super().retrieve(request, *args, **kwargs)
 
 
-class SubcourseViewSet(viewsets.ReadOnlyModelViewSet):
+class SubcourseViewSet(CatalogCacheMixin, FastListMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet cho Subcourse (Khóa học con)
     Read-only: Học viên chỉ xem
+    List được cache (ETag / 304), xem content/catalog_cache.py
+    Hỗ trợ ?fields= và ?expand=lessons (list, chỉ bài đã publish), xem content/fieldsets.py
+    List dùng fast path .values() (content/fast_serializers.py)
     
     Endpoints:
     - GET /api/subcourses/ - List tất cả subcourses (public)
     - GET /api/subcourses/{id}/ - Chi tiết 1 subcourse (requires authentication & authorization)
     """
+    query_budgets = {'list': 6, 'retrieve': 8}  # Số query tối đa / action (profiling)
     lookup_field = 'slug'  
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['program', 'coding_language', 'status', 'slug']
     search_fields = ['title', 'description']
-    ordering_fields = ['sort_order', 'created_at', 'price']
+    ordering_fields = ['sort_order', 'created_at', 'title']
     ordering = ['program', 'sort_order']
+    fast_serializer_class = SubcourseListValuesSerializer
+    expandable_fields = {
+        'lessons': lambda: LessonListSerializer(many=True, read_only=True),
+    }
     
     def get_permissions(self):
         """
@@ -128,12 +175,21 @@ class SubcourseViewSet(viewsets.ReadOnlyModelViewSet):
         Chỉ lấy subcourses của programs đã published
         Tối ưu hóa với select_related và prefetch_related
         """
-        return Subcourse.objects.filter(
+        queryset = Subcourse.objects.filter(
             status='PUBLISHED',
             program__status='PUBLISHED'
         ).select_related(
             'program'
-        )
+        ).with_catalog_counts()
+        return self.prefetch_for_fields(queryset)
+    
+    def get_field_prefetches(self):
+        if self.action == 'list':
+            # List công khai: chỉ expand bài học đã publish
+            lessons = Prefetch('lessons', queryset=Lesson.objects.filter(status='PUBLISHED'))
+        else:
+            lessons = 'lessons'
+        return {'lessons': (lessons,)}
     
     def get_serializer_class(self):
         """
@@ -146,27 +202,38 @@ class SubcourseViewSet(viewsets.ReadOnlyModelViewSet):
     
     def retrieve(self, request, *args, **kwargs):
         """
-        Chi tiết subcourse - public access
+        Chi tiết subcourse - chỉ user có quyền truy cập (entitlements)
         """
-        return super().retrieve(request, *args, **kwargs)
+        subcourse = self.get_object()
+        if not get_entitlements(request.user).can_access_subcourse(subcourse.id):
+            return Response(
+                {'error': 'Bạn chưa có quyền truy cập khóa học này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = self.get_serializer(subcourse)
+        return Response(serializer.data)
 
 
-class LessonViewSet(viewsets.ReadOnlyModelViewSet):
+class LessonViewSet(CatalogCacheMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet cho Lesson (Bài học)
     Read-only: Học viên chỉ xem
+    List được cache (ETag / 304), xem content/catalog_cache.py
+    List dùng fast path .values() (content/fast_serializers.py)
     
     Endpoints:
     - GET /api/lessons/ - List tất cả lessons (public)
+    - GET /api/lessons/?search=lap trinh - Tìm kiếm qua index (content/search_index.py)
     - GET /api/lessons/{id}/ - Chi tiết 1 lesson (requires authentication & authorization)
     """
+    query_budgets = {'list': 8, 'retrieve': 6, 'mark_complete': 10}  # Số query tối đa / action (profiling)
     lookup_field = 'slug'  # Sử dụng slug thay vì id để lookup
     pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, LessonSearchFilter]
     filterset_fields = ['subcourse', 'subcourse__program', 'status']
-    search_fields = ['title', 'subtitle', 'objective', 'content_text']
-    ordering_fields = ['sort_order', 'created_at', 'estimated_duration']
+    ordering_fields = ['sort_order', 'created_at', 'title']
     ordering = ['subcourse', 'sort_order']
+    fast_serializer_class = LessonListValuesSerializer
     
     def get_permissions(self):
         """
@@ -202,9 +269,16 @@ class LessonViewSet(viewsets.ReadOnlyModelViewSet):
     
     def retrieve(self, request, *args, **kwargs):
         """
-        Chi tiết lesson - public access
+        Chi tiết lesson - chỉ user có quyền truy cập khóa học chứa bài học
         """
-        return super().retrieve(request, *args, **kwargs)
+        lesson = self.get_object()
+        if not get_entitlements(request.user).can_access_subcourse(lesson.subcourse_id):
+            return Response(
+                {'error': 'Bạn chưa có quyền truy cập bài học này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = self.get_serializer(lesson)
+        return Response(serializer.data)
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def mark_complete(self, request, *args, **kwargs):
@@ -227,15 +301,8 @@ class LessonViewSet(viewsets.ReadOnlyModelViewSet):
             }
         )
         
-        # Tính phần trăm hoàn thành trong subcourse
-        total_lessons = lesson.subcourse.lessons.filter(status='PUBLISHED').count()
-        completed_lessons = UserProgress.objects.filter(
-            user=user,
-            lesson__subcourse=lesson.subcourse,
-            is_completed=True
-        ).count()
-        
-        completion_percentage = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
+        # Phần trăm hoàn thành lấy từ bảng tổng hợp (O(1))
+        summary = get_summary(user.id, lesson.subcourse_id)
         
         return Response({
             'success': True,
@@ -245,9 +312,9 @@ class LessonViewSet(viewsets.ReadOnlyModelViewSet):
                 'lesson_title': lesson.title,
                 'is_completed': progress.is_completed,
                 'completed_at': progress.completed_at,
-                'total_lessons': total_lessons,
-                'completed_lessons': completed_lessons,
-                'completion_percentage': round(completion_percentage, 2)
+                'total_lessons': summary.total_lessons,
+                'completed_lessons': summary.completed_lessons,
+                'completion_percentage': summary.completion_percentage
             }
         }, status=status.HTTP_200_OK)
 
@@ -259,13 +326,14 @@ class UserProgressViewSet(viewsets.ReadOnlyModelViewSet):
     
     Endpoints:
     - GET /api/progress/ - Tiến độ của user hiện tại
+    - GET /api/progress/subcourses/ - Tổng hợp tiến độ theo khóa học con
     """
+    query_budgets = {'list': 4, 'subcourses': 3}  # Số query tối đa / action (profiling)
     serializer_class = UserProgressSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    pagination_class = UserProgressPagination  # Keyset theo (created_at, id)
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_completed', 'lesson__subcourse__program']
-    ordering_fields = ['created_at', 'completed_at']
-    ordering = ['-created_at']
     
     def get_queryset(self):
         """
@@ -275,32 +343,47 @@ class UserProgressViewSet(viewsets.ReadOnlyModelViewSet):
         return UserProgress.objects.filter(
             user=user
         ).select_related(
+            'user',
             'lesson',
             'lesson__subcourse',
             'lesson__subcourse__program'
         )
 
+    @action(detail=False, methods=['get'])
+    def subcourses(self, request):
+        """
+        Tổng hợp tiến độ của user theo từng khóa học con (đọc từ SubcourseProgress)
+        GET /api/content/progress/subcourses/
+        """
+        summaries = SubcourseProgress.objects.filter(
+            user=request.user
+        ).select_related('subcourse').order_by('-last_activity_at', 'id')
+        serializer = SubcourseProgressSerializer(summaries, many=True)
+        return Response(serializer.data)
+
 
 # ========================
 # Media & Resource ViewSets
 # ========================
 
-class MediaViewSet(viewsets.ReadOnlyModelViewSet):
+class MediaViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet cho Media (Tài nguyên chia sẻ)
     Read-only: Admin quản lý qua admin panel
+    List dùng fast path .values() (content/fast_serializers.py)
     
     Endpoints:
     - GET /api/media/ - List tất cả media
     - GET /api/media/{id}/ - Chi tiết 1 media item
     """
     serializer_class = MediaSerializer
+    fast_serializer_class = MediaValuesSerializer
     permission_classes = [AllowAny]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['media_type', 'is_featured']
-    search_fields = ['title', 'description', 'tags']
-    ordering_fields = ['created_at', 'title']
+    filterset_fields = ['media_type']
+    search_fields = ['caption', 'alt_text']
+    ordering_fields = ['created_at', 'order']
     ordering = ['-created_at']
     
     def get_queryset(self):
@@ -326,9 +409,9 @@ class LessonObjectiveViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['lesson', 'objective_type']
-    search_fields = ['objective_text']
-    ordering_fields = ['sort_order', 'created_at']
-    ordering = ['lesson', 'sort_order']
+    search_fields = ['text']
+    ordering_fields = ['order', 'created_at']
+    ordering = ['lesson', 'order']
     
     def get_queryset(self):
         """Objectives của published lessons"""
@@ -350,9 +433,9 @@ class LessonModelViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['lesson']
-    search_fields = ['model_name', 'description']
-    ordering_fields = ['sort_order', 'created_at']
-    ordering = ['lesson', 'sort_order']
+    search_fields = ['title', 'description']
+    ordering_fields = ['order', 'created_at']
+    ordering = ['lesson', 'order']
     
     def get_queryset(self):
         """Models của published lessons với prefetch media"""
@@ -423,10 +506,10 @@ class LessonContentBlockViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['lesson', 'block_type']
-    search_fields = ['title', 'content_text', 'code_snippet']
-    ordering_fields = ['sort_order', 'created_at']
-    ordering = ['lesson', 'sort_order']
+    filterset_fields = ['lesson', 'content_type']
+    search_fields = ['title', 'subtitle', 'description']
+    ordering_fields = ['order', 'created_at']
+    ordering = ['lesson', 'order']
     
     def get_queryset(self):
         """Content blocks của published lessons với prefetch media"""
@@ -448,9 +531,9 @@ class LessonAttachmentViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['lesson', 'file_type']
-    search_fields = ['file_name', 'description']
-    ordering_fields = ['sort_order', 'created_at']
-    ordering = ['lesson', 'sort_order']
+    search_fields = ['name', 'description']
+    ordering_fields = ['order', 'created_at']
+    ordering = ['lesson', 'order']
     
     def get_queryset(self):
         """Attachments của published lessons"""
@@ -471,10 +554,10 @@ class ChallengeViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['lesson', 'difficulty_level']
-    search_fields = ['challenge_title', 'description', 'hint']
-    ordering_fields = ['sort_order', 'created_at']
-    ordering = ['lesson', 'sort_order']
+    filterset_fields = ['lesson', 'difficulty']
+    search_fields = ['title', 'subtitle', 'instructions']
+    ordering_fields = ['order', 'created_at']
+    ordering = ['lesson', 'order']
     
     def get_queryset(self):
         """Challenges của published lessons với prefetch media"""
@@ -494,21 +577,30 @@ class QuizViewSet(viewsets.ReadOnlyModelViewSet):
     Endpoints:
     - GET /api/quizzes/ - List quizzes (filtered by lesson)
     - GET /api/quizzes/{id}/ - Chi tiết quiz với questions
-    - POST /api/quizzes/{id}/submit/ - Nộp bài (tạo submission)
+      (học viên: đề đã bỏ đáp án từ cache; staff / ADMIN / TEACHER: kèm đáp án và giải thích)
+    - POST /api/quizzes/{id}/start/ - Bắt đầu (hoặc tiếp tục) lần làm bài, kèm đề đã xáo cho lần đó
+    - POST /api/quizzes/{id}/submit/ - Nộp bài 1 bước (start + submit; quiz có giới hạn thời gian: cần start trước)
     """
     permission_classes = [AllowAny]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['lesson', 'quiz_type']
-    search_fields = ['quiz_title', 'description']
-    ordering_fields = ['sort_order', 'created_at']
-    ordering = ['lesson', 'sort_order']
+    search_fields = ['title', 'description']
+    ordering_fields = ['order', 'created_at']
+    ordering = ['lesson', 'order']
     
     def get_queryset(self):
         """Quizzes của published lessons với prefetch questions"""
-        return Quiz.objects.filter(
+        queryset = Quiz.objects.filter(
             lesson__status='PUBLISHED'
-        ).select_related('lesson').prefetch_related(
+        ).select_related('lesson')
+        if self.action in ('start', 'submit') or (self.action == 'retrieve' and not self.include_answers):
+            # Answer key / đề đã bỏ đáp án lấy từ content/quiz_cache.py -> không prefetch
+            return queryset
+        if self.action == 'list':
+            # QuizListSerializer chỉ đếm câu hỏi -> không cần options
+            return queryset.prefetch_related('questions')
+        return queryset.prefetch_related(
             'questions',
             'questions__options'
         )
@@ -522,6 +614,16 @@ class QuizViewSet(viewsets.ReadOnlyModelViewSet):
             return QuizListSerializer
         return QuizDetailSerializer
     
+    @property
+    def include_answers(self):
+        return can_view_quiz_answers(self.request.user)
+    
+    def retrieve(self, request, *args, **kwargs):
+        if self.include_answers:
+            return super().retrieve(request, *args, **kwargs)
+        # Đề dùng chung cho mọi học viên, không có is_correct / explanation
+        return Response(quiz_cache.get_delivery_document(self.get_object()))
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def submit(self, request, pk=None):
         """
@@ -530,131 +632,313 @@ class QuizViewSet(viewsets.ReadOnlyModelViewSet):
         Body: {
             "answers": [
                 {"question_id": 1, "selected_option_id": 3},
-                {"question_id": 2, "selected_option_id": 7}
+                {"question_id": 2, "selected_option_ids": [7, 8]},
+                {"question_id": 3, "answer_text": "..."}
             ]
         }
+        Chấm điểm theo trọng số (points) bằng engine trong content/grading.py
+        Đang có lần làm dở -> nộp lần đó; hết max_attempts -> 403
+        Quiz có time_limit_minutes mà chưa start -> 409
         """
         quiz = self.get_object()
-        user = request.user
         answers_data = request.data.get('answers', [])
         
-        # Tạo QuizSubmission
-        from django.utils import timezone
-        submission = QuizSubmission.objects.create(
-            user=user,
-            quiz=quiz,
-            submitted_at=timezone.now()
-        )
-        
-        # Tạo QuizAnswers và tính điểm
-        correct_count = 0
-        total_questions = 0
+        if not isinstance(answers_data, list):
+            return Response(
+                {'error': 'answers phải là một danh sách'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for answer_data in answers_data:
-            question_id = answer_data.get('question_id')
-            selected_option_id = answer_data.get('selected_option_id')
-            
-            if not question_id or not selected_option_id:
-                continue
-            
-            try:
-                question = QuizQuestion.objects.get(id=question_id, quiz=quiz)
-                selected_option = QuestionOption.objects.get(id=selected_option_id, question=question)
-                
-                QuizAnswer.objects.create(
-                    submission=submission,
-                    question=question,
-                    selected_option=selected_option
-                )
-                
-                total_questions += 1
-                if selected_option.is_correct:
-                    correct_count += 1
-                    
-            except (QuizQuestion.DoesNotExist, QuestionOption.DoesNotExist):
-                continue
-        
-        # Tính điểm
-        if total_questions > 0:
-            submission.score = (correct_count / total_questions) * 100
-            submission.is_passed = submission.score >= quiz.passing_score
-            submission.save()
+        try:
+            submission = attempts.submit_quiz(quiz, request.user, answers_data)
+        except AttemptError as exc:
+            return Response({'error': exc.message, **exc.details}, status=exc.status_code)
         
         serializer = QuizSubmissionSerializer(submission)
         return Response(serializer.data)
-
-
-class QuizSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def start(self, request, pk=None):
+        """
+        Bắt đầu lần làm bài (giữ chỗ attempt_number), đang làm dở còn hạn -> trả lại lần đó
+        POST /api/quizzes/{id}/start/
+        Sau đó: POST /api/quiz-submissions/{id}/autosave/ và /api/quiz-submissions/{id}/submit/
+        """
+        quiz = self.get_object()
+        try:
+            submission, created = attempts.start_attempt(quiz, request.user)
+        except AttemptError as exc:
+            return Response({'error': exc.message, **exc.details}, status=exc.status_code)
+        
+        deadline = attempts.get_deadline(submission.started_at, quiz.time_limit_minutes)
+        return Response({
+            'id': submission.id,
+            'quiz': quiz.id,
+            'attempt_number': submission.attempt_number,
+            'max_attempts': quiz.max_attempts,
+            'status': submission.status,
+            'started_at': submission.started_at,
+            'expires_at': deadline,
+            'remaining_seconds': attempts.remaining_seconds(deadline),
+            'document': quiz_cache.get_attempt_document(quiz, submission),
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class QuizSubmissionViewSet(StreamingListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet cho QuizSubmission (Lần nộp bài)
     Chỉ xem submissions của chính user
+    List được stream theo lô (api/streaming.py)
     
     Endpoints:
     - GET /api/quiz-submissions/ - Submissions của user hiện tại
     - GET /api/quiz-submissions/{id}/ - Chi tiết 1 submission
+    - POST /api/quiz-submissions/{id}/autosave/ - Lưu tạm câu trả lời (upsert bản nháp, 1 câu lệnh / lô)
+    - POST /api/quiz-submissions/{id}/submit/ - Nộp lần làm bài đang làm
     """
+    query_budgets = {'list': 4, 'retrieve': 4, 'autosave': 2, 'submit': 14}  # Số query tối đa / action (profiling)
     serializer_class = QuizSubmissionSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    pagination_class = QuizSubmissionPagination  # Keyset theo (started_at, id)
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['quiz', 'is_passed']
-    ordering_fields = ['submitted_at', 'score']
-    ordering = ['-submitted_at']
     
     def get_queryset(self):
         """Chỉ submissions của user hiện tại"""
         return QuizSubmission.objects.filter(
             user=self.request.user
-        ).select_related('quiz', 'quiz__lesson').prefetch_related(
-            'answers',
-            'answers__question',
-            'answers__selected_option'
+        ).select_related('user', 'quiz', 'quiz__lesson').prefetch_related(
+            Prefetch('answers', queryset=QuizAnswer.objects.select_related('question'))
         )
+    
+    @action(detail=True, methods=['post'])
+    def autosave(self, request, pk=None):
+        """
+        Lưu tạm một lô câu trả lời (tối đa attempts.AUTOSAVE_MAX_ANSWERS câu), ghi đè theo câu hỏi
+        POST /api/quiz-submissions/{id}/autosave/
+        Body: {"answers": [{"question_id": 1, "selected_option_ids": [3]}, ...]}
+        """
+        try:
+            result = attempts.autosave(pk, request.user, request.data.get('answers'))
+        except AttemptError as exc:
+            return Response({'error': exc.message, **exc.details}, status=exc.status_code)
+        return Response(result)
+    
+    @action(detail=True, methods=['post'])
+    def submit(self, request, pk=None):
+        """
+        Nộp lần làm bài: chấm các câu đã autosave + answers gửi kèm (nếu còn hạn)
+        POST /api/quiz-submissions/{id}/submit/
+        Body (tùy chọn): {"answers": [...]}
+        """
+        answers_data = request.data.get('answers', [])
+        if not isinstance(answers_data, list):
+            return Response(
+                {'error': 'answers phải là một danh sách'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            submission = attempts.submit_attempt(pk, request.user, answers_data)
+        except AttemptError as exc:
+            return Response({'error': exc.message, **exc.details}, status=exc.status_code)
+        return Response(QuizSubmissionSerializer(submission).data)
+
+
+class QuizAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Thống kê quiz (chỉ staff / ADMIN / TEACHER), đọc từ bảng tổng hợp (content/quiz_analytics.py)
+    Không quét QuizAnswer: số liệu được cộng dồn khi chấm bài và tính lại hằng đêm
+    
+    Endpoints:
+    - GET /api/quiz-analytics/ - Pass rate, điểm trung bình của các quiz (?quiz__lesson=)
+    - GET /api/quiz-analytics/{quiz_id}/ - Histogram điểm, tỉ lệ đúng từng câu, tỉ lệ chọn từng lựa chọn
+    """
+    query_budgets = {'list': 3, 'retrieve': 8}  # Số query tối đa / action (profiling)
+    serializer_class = QuizStatsSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['quiz', 'quiz__lesson']
+    ordering_fields = ['submission_count', 'passed_count', 'updated_at']
+    ordering = ['-submission_count']
+    lookup_field = 'quiz'
+    
+    def get_queryset(self):
+        return QuizStats.objects.select_related('quiz')
+    
+    def _forbidden(self):
+        return Response(
+            {'error': 'Bạn không có quyền xem thống kê quiz'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    def list(self, request, *args, **kwargs):
+        if not can_view_quiz_answers(request.user):
+            return self._forbidden()
+        return super().list(request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        if not can_view_quiz_answers(request.user):
+            return self._forbidden()
+        return Response(quiz_analytics.get_report(self.get_object()))
 
 
 # ========================
 # Composite Lesson ViewSet
 # ========================
 
-class LessonDetailViewSet(viewsets.ReadOnlyModelViewSet):
+class LessonDetailViewSet(StreamingListMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet cho Lesson Detail với TẤT CẢ nội dung lồng nhau
     (Objectives, Models, Preparations, BuildBlocks, ContentBlocks, Attachments, Challenges, Quizzes)
+    ?fields= chỉ lấy một phần (vd: fields=id,title,objectives,content_blocks),
+    phần không yêu cầu không được prefetch
+    List được stream theo lô: mỗi lô stream_chunk_size lesson được prefetch + serialize rồi gửi ngay
+    Chỉ bài học thuộc khóa học con user có quyền truy cập (get_entitlements, như LessonViewSet)
+    Quizzes: học viên nhận đề đã bỏ đáp án; staff / ADMIN / TEACHER: kèm đáp án và giải thích
     
     Endpoints:
     - GET /api/lesson-details/ - List lessons với full content
     - GET /api/lesson-details/{slug}/ - Chi tiết 1 lesson với full content
+    - GET /api/lesson-details/{slug}/?fields=objectives,quizzes.title - Chỉ các phần cần thiết
     """
+    query_budgets = {'list': 80, 'retrieve': 20}  # Số query tối đa / action (profiling), list: prefetch theo từng lô stream
     serializer_class = LessonDetailSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'slug'
     pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, LessonSearchFilter]
     filterset_fields = ['subcourse', 'status']
-    search_fields = ['title', 'subtitle', 'objective']
     ordering_fields = ['sort_order', 'created_at']
     ordering = ['subcourse', 'sort_order']
+    # Field (đường dẫn trong payload) -> prefetch cần cho field đó
+    field_prefetches = {
+        'objectives': ('objectives',),
+        'objective_count': ('objectives',),
+        'models': ('models',),
+        'models.media': ('models__media',),
+        'model_count': ('models',),
+        'assembly_guides': ('assembly_guides',),
+        'assembly_guides.media': ('assembly_guides__media',),
+        'assembly_guides.media_count': ('assembly_guides__media',),
+        'assembly_guide_count': ('assembly_guides',),
+        'preparation': ('preparation',),
+        'content_blocks': ('content_blocks',),
+        'content_blocks.media': ('content_blocks__media',),
+        'attachments': ('attachments',),
+        'attachment_count': ('attachments',),
+        'challenges': ('challenges',),
+        'challenges.media': ('challenges__media',),
+        'challenge_count': ('challenges',),
+        'quizzes': ('quizzes',),
+        'quizzes.questions': ('quizzes__questions',),
+        'quizzes.questions.options': ('quizzes__questions__options',),
+        'quizzes.question_count': ('quizzes__questions',),
+        'quizzes.total_points': ('quizzes__questions',),
+        'quiz_count': ('quizzes',),
+    }
+    
+    def get_field_prefetches(self):
+        prefetches = dict(self.field_prefetches)
+        prefetches['preparation.build_blocks'] = (Prefetch(
+            'preparation__preparation_build_blocks',
+            queryset=PreparationBuildBlock.objects.select_related('build_block', 'build_block__program').order_by('build_block__order', 'id')
+        ),)
+        return prefetches
     
     def get_queryset(self):
         """
-        Lessons với full prefetch để tránh N+1 queries
+        Lessons với prefetch theo fieldset để tránh N+1 queries
+        (không có ?fields= -> prefetch toàn bộ nội dung)
+        List: chỉ các khóa học con user có quyền truy cập
         """
-        return Lesson.objects.filter(
+        queryset = Lesson.objects.filter(
             status='PUBLISHED',
             subcourse__status='PUBLISHED'
         ).select_related(
             'subcourse',
             'subcourse__program'
-        ).prefetch_related(
-            'objectives',
-            'models', 'models__media',
-            'assembly_guides', 'assembly_guides__media',
-            'preparation',
-            Prefetch(
-                'preparation__preparation_build_blocks',
-                queryset=PreparationBuildBlock.objects.select_related('build_block', 'build_block__program').order_by('build_block__order', 'id')
-            ),
-            'content_blocks', 'content_blocks__media',
-            'attachments',
-            'challenges', 'challenges__media',
-            'quizzes', 'quizzes__questions', 'quizzes__questions__options'
         )
+        if self.action == 'list':
+            entitlements = get_entitlements(self.request.user)
+            if not entitlements.full_access:
+                queryset = queryset.filter(subcourse_id__in=entitlements.subcourse_ids)
+        return self.prefetch_for_fields(queryset)
+    
+    @property
+    def include_answers(self):
+        return can_view_quiz_answers(self.request.user)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_quiz_answers'] = self.include_answers
+        return context
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Chi tiết lesson - chỉ user có quyền truy cập khóa học chứa bài học (như LessonViewSet.retrieve)
+        Phục vụ từ cache document nếu có, cache hit: không query DB
+        (?fields= được cắt trên document đã cache)
+        Có query params khác (filter): bỏ qua cache, đi đường thường
+        Cache tách theo người xem có được thấy đáp án quiz hay không
+        """
+        # Quyền được xác định trước khi đọc cache document
+        entitlements = get_entitlements(request.user)
+        slug = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        use_cache = not set(request.query_params) - {FIELDS_PARAM}
+        
+        if use_cache:
+            document = lesson_cache.get_document_by_slug(slug, self.include_answers)
+            if document is not None:
+                if not entitlements.can_access_subcourse(document['subcourse']):
+                    return self._forbidden()
+                return Response(prune_data(document, self.get_field_tree()))
+        
+        instance = self.get_object()
+        if not entitlements.can_access_subcourse(instance.subcourse_id):
+            return self._forbidden()
+        if not use_cache or FIELDS_PARAM in request.query_params:
+            # Chỉ query các phần được yêu cầu, không ghi cache document
+            return Response(self.get_serializer(instance).data)
+        
+        version = lesson_cache.get_version(instance.id)
+        data = self.get_serializer(instance).data
+        lesson_cache.set_document(instance, data, version, self.include_answers)
+        return Response(data)
+    
+    def _forbidden(self):
+        return Response(
+            {'error': 'Bạn chưa có quyền truy cập bài học này'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+
+class CatalogSnapshotView(APIView):
+    """
+    Snapshot catalog công khai: mọi Program / Subcourse / outline Lesson đã publish trong 1 file
+    File nén sẵn (brotli / gzip theo Accept-Encoding), ETag = content hash -> 304 khi không đổi
+    Xem content/catalog_snapshot.py
+    
+    Endpoints:
+    - GET /api/content/catalog-snapshot/ - Snapshot hiện tại
+    """
+    query_budgets = {'get': 6}  # Số query tối đa (chỉ khi phải dựng lại snapshot)
+    permission_classes = [AllowAny]
+    
+    def get(self, request, *args, **kwargs):
+        manifest = catalog_snapshot.get_snapshot()
+        etag = quote_etag(manifest['content_hash'])
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [value.strip() for value in if_none_match.split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            encoding = catalog_snapshot.choose_encoding(manifest, request.headers.get('Accept-Encoding'))
+            path = os.path.join(catalog_snapshot.get_root(), manifest['files'][encoding])
+            response = FileResponse(open(path, 'rb'), content_type='application/json; charset=utf-8')
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['X-Catalog-Version'] = manifest['content_hash'][:16]
+        patch_vary_headers(response, ['Accept-Encoding'])
+        patch_cache_control(response, public=True, max_age=catalog_snapshot.CLIENT_MAX_AGE)
+        return response
@@ -3,6 +3,7 @@
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import axios from '@/lib/axios';
+import { getAssignedModules } from '@/services/robotics';
 import Image from 'next/image';
 import { ArrowLeft, BookOpen, CheckCircle } from 'lucide-react';
 import Link from 'next/link';
@@ -20,9 +21,17 @@ interface Assignment {
   status: string;
 }
 
+interface SubcourseProgress {
+  subcourse: number;
+  completed_lessons: number;
+  total_lessons: number;
+  completion_percentage: number;
+}
+
 export default function MyCoursesPage() {
   const router = useRouter();
   const [assignments, setAssignments] = useState<Assignment[]>([]);
+  const [progressBySubcourse, setProgressBySubcourse] = useState<Record<number, SubcourseProgress>>({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
@@ -39,10 +48,13 @@ export default function MyCoursesPage() {
         return;
       }
 
-      const response = await axios.get('/auth/assignments/');
+      const [assignmentsResponse, progressResponse] = await Promise.all([
+        getAssignedModules(),
+        axios.get('/content/progress/subcourses/').catch(() => ({ data: [] })),
+      ]);
       
       // Get results from paginated response
-      const assignmentsData = response.data.results || response.data;
+      const assignmentsData = assignmentsResponse.results || assignmentsResponse;
       
       // Filter only ACTIVE assignments (already filtered by backend but double check)
       const activeAssignments = Array.isArray(assignmentsData) 
@@ -50,6 +62,13 @@ export default function MyCoursesPage() {
         : [];
       
       
+      // Tiến độ đã được tổng hợp sẵn ở backend (SubcourseProgress)
+      const progressMap: Record<number, SubcourseProgress> = {};
+      (progressResponse.data || []).forEach((item: SubcourseProgress) => {
+        progressMap[item.subcourse] = item;
+      });
+      setProgressBySubcourse(progressMap);
+
       // API đã trả về đủ thông tin và user đã có assignment = đã có quyền
       setAssignments(activeAssignments);
       setLoading(false);
@@ -181,6 +200,25 @@ export default function MyCoursesPage() {
                       <span>Đang học</span>
                     </div>
 
+                    {/* Progress */}
+                    {progressBySubcourse[assignment.subcourse] && (
+                      <div className="mb-3">
+                        <div className="flex justify-between text-xs text-gray-600 mb-1">
+                          <span>
+                            {progressBySubcourse[assignment.subcourse].completed_lessons}/
+                            {progressBySubcourse[assignment.subcourse].total_lessons} bài học
+                          </span>
+                          <span>{Math.round(progressBySubcourse[assignment.subcourse].completion_percentage)}%</span>
+                        </div>
+                        <div className="w-full h-2 bg-gray-200 rounded-full overflow-hidden">
+                          <div
+                            className="h-full bg-brandPurple-500 rounded-full"
+                            style={{ width: `${progressBySubcourse[assignment.subcourse].completion_percentage}%` }}
+                          />
+                        </div>
+                      </div>
+                    )}
+
                     {/* CTA */}
                     <div className="pt-3 border-t border-gray-200">
                       <p className="text-sm font-semibold text-brandPurple-600 group-hover:text-brandPurple-700">
@@ -7,7 +7,7 @@
 
 import { useEffect, useState } from 'react';
 import Image from 'next/image';
-import { getPrograms } from '@/services/robotics';
+import { getCatalogSnapshot } from '@/services/robotics';
 import CourseCard from '@/components/CourseCard';
 import SkeletonCard from '@/components/SkeletonCard';
 
@@ -31,8 +31,9 @@ export default function HomePage() {
     const fetchPrograms = async () => {
       try {
         setLoading(true);
-        const data = await getPrograms({ status: 'PUBLISHED' });
-        setPrograms(data.results || data); // Handle paginated or direct array response
+        // Snapshot catalog: toàn bộ chương trình đã publish trong 1 file đã cache
+        const snapshot = await getCatalogSnapshot();
+        setPrograms(snapshot.programs);
         setError(null);
       } catch (err) {
         console.error('Error fetching programs:', err);
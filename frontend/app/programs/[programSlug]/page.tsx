@@ -8,7 +8,7 @@
 
 import { useEffect, useState } from 'react';
 import { useParams, useRouter } from 'next/navigation';
-import { getProgramDetail, getMySubcourses, getSubcourses, getAssignedModules } from '@/services/robotics';
+import { getSnapshotProgram, getMySubcourses, getAssignedModules } from '@/services/robotics';
 import { ArrowLeft, BookOpen, Clock, Users, Lock, ChevronDown, ChevronUp } from 'lucide-react';
 import Image from 'next/image';
 import SubcourseCard from '@/components/SubcourseCard';
@@ -62,8 +62,8 @@ export default function ProgramDetailPage() {
         const validityMap = new Map<number, { valid_from?: string; valid_until?: string }>();
         let programValidity: { valid_from?: string; valid_until?: string } | null = null;
 
-        // Lấy thông tin program
-        const programData = await getProgramDetail(programSlug);
+        // Lấy program kèm subcourses đã publish từ snapshot catalog (1 file dùng chung mọi trang)
+        const programData = await getSnapshotProgram(programSlug);
         setProgram(programData);
 
         // Kiểm tra authentication
@@ -76,8 +76,7 @@ export default function ProgramDetailPage() {
           // Admin thấy tất cả subcourses
           if (userRole === 'ADMIN') {
             setIsAdmin(true);
-            const subcoursesData = await getSubcourses({ program: programData.id });
-            const allSubcourses = (subcoursesData.results || []).map((sc: Subcourse) => ({
+            const allSubcourses = (programData.subcourses || []).map((sc: Subcourse) => ({
               ...sc,
               has_access: true,
               valid_from: null,
@@ -112,9 +111,7 @@ export default function ProgramDetailPage() {
                 console.error('Error fetching assignment validity:', assignmentErr);
               }
               
-              const subcoursesData = await getSubcourses({ program: programData.id });
-              
-              const allSubcourses = (subcoursesData.results || []).map((sc: Subcourse) => ({
+              const allSubcourses = (programData.subcourses || []).map((sc: Subcourse) => ({
                 ...sc,
                 has_access: subcourseIds.includes(sc.id),
                 valid_from: validityMap.get(sc.id)?.valid_from || programValidity?.valid_from || null,
@@ -123,8 +120,7 @@ export default function ProgramDetailPage() {
               setSubcourses(allSubcourses);
             } catch (err) {
               console.error('Error fetching my subcourses:', err);
-              const subcoursesData = await getSubcourses({ program: programData.id });
-              const allSubcourses = (subcoursesData.results || []).map((sc: Subcourse) => ({
+              const allSubcourses = (programData.subcourses || []).map((sc: Subcourse) => ({
                 ...sc,
                 has_access: false,
                 valid_from: null,
@@ -135,8 +131,7 @@ export default function ProgramDetailPage() {
           }
         } else {
           // Không authenticated - hiển thị tất cả với has_access = false
-          const subcoursesData = await getSubcourses({ program: programData.id });
-          const allSubcourses = (subcoursesData.results || []).map((sc: Subcourse) => ({
+          const allSubcourses = (programData.subcourses || []).map((sc: Subcourse) => ({
             ...sc,
             has_access: false,
             valid_from: null,
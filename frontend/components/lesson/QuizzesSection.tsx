@@ -1,15 +1,17 @@
 /**
  * Quizzes Section Component
  * Hiển thị bài kiểm tra với các loại câu hỏi: single/multiple/open
+ * Học viên nhận đề không có đáp án: bắt đầu lần làm bài và chấm điểm ở backend
+ * (POST /quizzes/{id}/start/ -> POST /quiz-submissions/{id}/submit/)
  */
 
 import React, { useState } from 'react';
 import { ClipboardCheck, HelpCircle, CheckCircle2, XCircle, Clock, Award } from 'lucide-react';
+import { startQuizAttempt, submitQuizAttempt } from '@/services/robotics';
 
 interface QuestionOption {
   id: number;
   option_text: string;
-  is_correct: boolean;
   order: number;
 }
 
@@ -18,7 +20,7 @@ interface QuizQuestion {
   question_text: string;
   question_type: string;
   question_type_display: string;
-  explanation: string;
+  explanation?: string;
   points: number;
   options: QuestionOption[];
   order: number;
@@ -34,61 +36,72 @@ interface Quiz {
   max_attempts: number;
   time_limit_minutes: number | null;
   questions: QuizQuestion[];
-  questions_count: number;
-  total_points: number;
+  question_count?: number;
+  total_points?: number;
   status: string;
   order: number;
-  shuffle_questions?: number;
-  shuffle_options?: number;
+  shuffle_questions?: boolean;
+  shuffle_options?: boolean;
+}
+
+interface QuizAnswerResult {
+  question: number;
+  selected_option_ids: number[];
+  is_correct: boolean;
+  points_earned: number;
+}
+
+interface QuizSubmissionResult {
+  id: number;
+  score: number;
+  max_score: number;
+  percentage: number | null;
+  is_passed: boolean;
+  status: string;
+  answers: QuizAnswerResult[];
 }
 
 interface QuizzesSectionProps {
   quizzes: Quiz[];
 }
 
+const getErrorMessage = (error: any, fallback: string): string =>
+  error?.response?.data?.error || error?.response?.data?.detail || fallback;
+
 function QuizCard({ quiz }: { quiz: Quiz }) {
   const [isStarted, setIsStarted] = useState(false);
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
   const [answers, setAnswers] = useState<Record<number, number[]>>({});
   const [submitted, setSubmitted] = useState(false);
-  const [score, setScore] = useState(0);
-  const [shuffledQuestions, setShuffledQuestions] = useState<QuizQuestion[]>([]);
-
-  const currentQuestion = shuffledQuestions[currentQuestionIndex] || quiz.questions[currentQuestionIndex];
+  const [submissionId, setSubmissionId] = useState<number | null>(null);
+  const [result, setResult] = useState<QuizSubmissionResult | null>(null);
+  const [attemptQuestions, setAttemptQuestions] = useState<QuizQuestion[]>([]);
+  const [isLoading, setIsLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const currentQuestion = attemptQuestions[currentQuestionIndex];
+  const score = result?.percentage ?? 0;
   
   // Calculate totals from questions if not provided
-  const questionsCount = quiz.questions_count || quiz.questions.length;
+  const questionsCount = quiz.question_count || quiz.questions.length;
   const totalPoints = quiz.total_points || quiz.questions.reduce((sum, q) => sum + q.points, 0);
 
-  // Shuffle array utility
-  const shuffleArray = <T,>(array: T[]): T[] => {
-    const shuffled = [...array];
-    for (let i = shuffled.length - 1; i > 0; i--) {
-      const j = Math.floor(Math.random() * (i + 1));
-      [shuffled[i], shuffled[j]] = [shuffled[j], shuffled[i]];
-    }
-    return shuffled;
-  };
-
-  // Shuffle questions and options when starting quiz
-  const handleStartQuiz = () => {
-    let questionsToUse = quiz.questions;
-    
-    // Shuffle questions if enabled
-    if (quiz.shuffle_questions) {
-      questionsToUse = shuffleArray(questionsToUse);
-    }
-    
-    // Shuffle options for each question if enabled
-    if (quiz.shuffle_options) {
-      questionsToUse = questionsToUse.map((question) => ({
-        ...question,
-        options: shuffleArray(question.options),
-      }));
+  // Bắt đầu lần làm bài: backend trả đề đã xáo (shuffle_questions / shuffle_options) cho lần này
+  const handleStartQuiz = async () => {
+    setIsLoading(true);
+    setError(null);
+    try {
+      const attempt = await startQuizAttempt(quiz.id);
+      setSubmissionId(attempt.id);
+      setAttemptQuestions(attempt.document.questions);
+      setAnswers({});
+      setCurrentQuestionIndex(0);
+      setIsStarted(true);
+    } catch (err) {
+      setError(getErrorMessage(err, 'Không thể bắt đầu bài kiểm tra'));
+    } finally {
+      setIsLoading(false);
     }
-    
-    setShuffledQuestions(questionsToUse);
-    setIsStarted(true);
   };
 
   const handleOptionSelect = (questionId: number, optionId: number, isSingle: boolean) => {
@@ -111,7 +124,7 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
   };
 
   const handleNext = () => {
-    if (currentQuestionIndex < quiz.questions.length - 1) {
+    if (currentQuestionIndex < attemptQuestions.length - 1) {
       setCurrentQuestionIndex((prev) => prev + 1);
     }
   };
@@ -122,27 +135,24 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
     }
   };
 
-  const handleSubmit = () => {
-    // Calculate score
-    let totalScore = 0;
-    const questionsForReview = shuffledQuestions.length > 0 ? shuffledQuestions : quiz.questions;
-    questionsForReview.forEach((question) => {
-      const userAnswers = answers[question.id] || [];
-      const correctOptions = question.options.filter((opt) => opt.is_correct).map((opt) => opt.id);
-      
-      // Check if answer is correct
-      const isCorrect =
-        userAnswers.length === correctOptions.length &&
-        userAnswers.every((ans) => correctOptions.includes(ans));
-
-      if (isCorrect) {
-        totalScore += question.points;
-      }
-    });
-
-    setScore((totalScore / totalPoints) * 100);
-    setSubmitted(true);
-    setCurrentQuestionIndex(0);
+  // Nộp bài: backend chấm theo answer key, trả về điểm và kết quả từng câu
+  const handleSubmit = async () => {
+    if (submissionId === null) return;
+    setIsLoading(true);
+    setError(null);
+    try {
+      const payload = Object.entries(answers).map(([questionId, optionIds]) => ({
+        question_id: Number(questionId),
+        selected_option_ids: optionIds,
+      }));
+      setResult(await submitQuizAttempt(submissionId, payload));
+      setSubmitted(true);
+      setCurrentQuestionIndex(0);
+    } catch (err) {
+      setError(getErrorMessage(err, 'Không thể nộp bài, vui lòng thử lại'));
+    } finally {
+      setIsLoading(false);
+    }
   };
 
   if (!isStarted) {
@@ -181,18 +191,24 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
           )}
         </div>
 
+        {error && (
+          <p className="mb-4 text-sm text-red-600">{error}</p>
+        )}
+
         <button
           onClick={handleStartQuiz}
-          className="w-full py-3 px-6 bg-indigo-600 hover:bg-indigo-700 text-white font-semibold rounded-lg transition-colors shadow-md hover:shadow-lg"
+          disabled={isLoading}
+          className="w-full py-3 px-6 bg-indigo-600 hover:bg-indigo-700 text-white font-semibold rounded-lg transition-colors shadow-md hover:shadow-lg disabled:opacity-50 disabled:cursor-not-allowed"
         >
-          Bắt đầu làm bài
+          {isLoading ? 'Đang tải đề...' : 'Bắt đầu làm bài'}
         </button>
       </div>
     );
   }
 
   if (submitted) {
-    const passed = score >= quiz.passing_score;
+    const passed = result ? result.is_passed : false;
+    const resultByQuestion = new Map((result?.answers || []).map((answer) => [answer.question, answer]));
 
     return (
       <div className="bg-white rounded-lg border-2 border-gray-200 p-6">
@@ -219,12 +235,8 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
 
         {/* Review Answers */}
         <div className="space-y-4 mb-6">
-          {(shuffledQuestions.length > 0 ? shuffledQuestions : quiz.questions).map((question, idx) => {
-            const userAnswers = answers[question.id] || [];
-            const correctOptions = question.options.filter((opt) => opt.is_correct).map((opt) => opt.id);
-            const isCorrect =
-              userAnswers.length === correctOptions.length &&
-              userAnswers.every((ans) => correctOptions.includes(ans));
+          {attemptQuestions.map((question, idx) => {
+            const isCorrect = resultByQuestion.get(question.id)?.is_correct ?? false;
 
             return (
               <div key={question.id} className={`p-4 rounded-lg border-2 ${isCorrect ? 'border-green-300 bg-green-50' : 'border-red-300 bg-red-50'}`}>
@@ -252,6 +264,8 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
           onClick={() => {
             setIsStarted(false);
             setSubmitted(false);
+            setSubmissionId(null);
+            setResult(null);
             setAnswers({});
             setCurrentQuestionIndex(0);
           }}
@@ -269,7 +283,7 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
       <div className="mb-6">
         <div className="flex items-center justify-between mb-2">
           <span className="text-sm font-medium text-gray-700">
-            Câu {currentQuestionIndex + 1} / {shuffledQuestions.length}
+            Câu {currentQuestionIndex + 1} / {attemptQuestions.length}
           </span>
           <span className="text-sm text-gray-600">
             {currentQuestion.points} điểm
@@ -278,7 +292,7 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
         <div className="w-full bg-gray-200 rounded-full h-2">
           <div
             className="bg-indigo-600 h-2 rounded-full transition-all"
-            style={{ width: `${((currentQuestionIndex + 1) / shuffledQuestions.length) * 100}%` }}
+            style={{ width: `${((currentQuestionIndex + 1) / attemptQuestions.length) * 100}%` }}
           />
         </div>
       </div>
@@ -342,18 +356,23 @@ function QuizCard({ quiz }: { quiz: Quiz }) {
         </button>
         <button
           onClick={handleNext}
-          disabled={currentQuestionIndex === shuffledQuestions.length - 1}
+          disabled={currentQuestionIndex === attemptQuestions.length - 1}
           className="px-4 py-2 border-2 border-indigo-600 text-indigo-600 bg-white rounded-lg hover:bg-indigo-50 disabled:opacity-50 disabled:cursor-not-allowed transition-colors font-medium"
         >
           Sau →
         </button>
         <button
           onClick={handleSubmit}
-          className="ml-auto px-6 py-2 bg-indigo-600 hover:bg-indigo-700 text-white font-semibold rounded-lg transition-colors"
+          disabled={isLoading}
+          className="ml-auto px-6 py-2 bg-indigo-600 hover:bg-indigo-700 text-white font-semibold rounded-lg transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
         >
-          Nộp bài
+          {isLoading ? 'Đang nộp...' : 'Nộp bài'}
         </button>
       </div>
+
+      {error && (
+        <p className="mt-4 text-sm text-red-600">{error}</p>
+      )}
     </div>
   );
 }
@@ -5,6 +5,31 @@
 
 import axiosInstance from '@/lib/axios';
 
+/**
+ * Memo GET request trong bộ nhớ (dùng chung promise cho các request trùng nhau)
+ */
+const memoizedGet = (store, ttl, url, params = {}, scope = '') => {
+  const key = `${scope}|${url}|${JSON.stringify(params)}`;
+  const cached = store.get(key);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.promise;
+  }
+
+  const promise = axiosInstance.get(url, { params }).then((response) => response.data);
+  store.set(key, { promise, expiresAt: Date.now() + ttl });
+  promise.catch(() => store.delete(key));
+  return promise;
+};
+
+/**
+ * Catalog công khai (programs / subcourses / lessons) giống nhau với mọi user
+ * Backend đã cache + trả ETag; phía client giữ thêm 60s để không refetch mỗi lần chuyển trang
+ */
+const CATALOG_CACHE_TTL = 60 * 1000;
+const catalogCache = new Map();
+
+const cachedCatalogGet = (url, params = {}) => memoizedGet(catalogCache, CATALOG_CACHE_TTL, url, params);
+
 /**
  * CONTENT API SERVICES
  */
@@ -15,8 +40,7 @@ import axiosInstance from '@/lib/axios';
  */
 export const getPrograms = async (params = {}) => {
   try {
-    const response = await axiosInstance.get('/content/programs/', { params });
-    return response.data;
+    return await cachedCatalogGet('/content/programs/', params);
   } catch (error) {
     console.error('Error fetching programs:', error);
     throw error;
@@ -29,14 +53,37 @@ export const getPrograms = async (params = {}) => {
  */
 export const getProgramDetail = async (slug) => {
   try {
-    const response = await axiosInstance.get(`/content/programs/${slug}/`);
-    return response.data;
+    return await cachedCatalogGet(`/content/programs/${slug}/`);
   } catch (error) {
     console.error(`Error fetching program ${slug}:`, error);
     throw error;
   }
 };
 
+/**
+ * Snapshot catalog công khai: mọi program / subcourse / outline lesson đã publish trong 1 file
+ * GET /api/content/catalog-snapshot/
+ * Backend trả file nén sẵn (brotli / gzip) với ETag = content hash
+ */
+export const getCatalogSnapshot = async () => {
+  try {
+    return await cachedCatalogGet('/content/catalog-snapshot/');
+  } catch (error) {
+    console.error('Error fetching catalog snapshot:', error);
+    throw error;
+  }
+};
+
+/**
+ * Lấy 1 Program (kèm subcourses đã publish) từ snapshot catalog
+ * Không có trong snapshot -> gọi API chi tiết (trả 404 nếu không tồn tại)
+ */
+export const getSnapshotProgram = async (slug) => {
+  const snapshot = await getCatalogSnapshot();
+  const program = snapshot.programs.find((item) => item.slug === slug);
+  return program || getProgramDetail(slug);
+};
+
 /**
  * Lấy danh sách Subcourses (Khóa học con)
  * GET /api/content/subcourses/
@@ -44,8 +91,7 @@ export const getProgramDetail = async (slug) => {
  */
 export const getSubcourses = async (params = {}) => {
   try {
-    const response = await axiosInstance.get('/content/subcourses/', { params });
-    return response.data;
+    return await cachedCatalogGet('/content/subcourses/', params);
   } catch (error) {
     console.error('Error fetching subcourses:', error);
     throw error;
@@ -73,8 +119,7 @@ export const getSubcourseDetail = async (id) => {
  */
 export const getLessons = async (params = {}) => {
   try {
-    const response = await axiosInstance.get('/content/lessons/', { params });
-    return response.data;
+    return await cachedCatalogGet('/content/lessons/', params);
   } catch (error) {
     console.error('Error fetching lessons:', error);
     throw error;
@@ -99,10 +144,11 @@ export const getLessonDetail = async (slug) => {
  * Lấy chi tiết FULL Lesson (với tất cả content blocks)
  * GET /api/content/lesson-details/{slug}/
  * RECOMMENDED: Dùng endpoint này thay vì getLessonDetail để lấy full content
+ * @param {Object} params - { fields: 'id,title,objectives,content_blocks' } chỉ lấy các phần cần hiển thị
  */
-export const getLessonFullDetail = async (slug) => {
+export const getLessonFullDetail = async (slug, params = {}) => {
   try {
-    const response = await axiosInstance.get(`/content/lesson-details/${slug}/`);
+    const response = await axiosInstance.get(`/content/lesson-details/${slug}/`, { params });
     return response.data;
   } catch (error) {
     console.error(`Error fetching full lesson detail ${slug}:`, error);
@@ -166,6 +212,55 @@ export const markLessonCompleteForStudent = async (classId, studentId, lessonSlu
   }
 };
 
+/**
+ * Giáo viên/Quản trị: Ghi danh nhiều học viên vào lớp trong 1 request
+ * POST /api/classes/{classId}/bulk_enroll/
+ * @param {Array|File} students - Danh sách id / username / email, hoặc file CSV
+ * @param {Object} options - { status, notes, allow_partial }
+ * Response: { summary: { enrolled, already_enrolled, not_found, class_full, duplicate }, results: [...] }
+ */
+export const bulkEnrollStudents = async (classId, students, options = {}) => {
+  try {
+    const url = `/classes/${classId}/bulk_enroll/`;
+    let payload = { student_ids: students, ...options };
+    if (typeof File !== 'undefined' && students instanceof File) {
+      payload = new FormData();
+      payload.append('file', students);
+      Object.entries(options).forEach(([key, value]) => payload.append(key, value));
+    }
+    const response = await axiosInstance.post(url, payload);
+    return {
+      success: true,
+      data: response.data,
+      status: response.status,
+    };
+  } catch (error) {
+    console.error(`Error bulk enrolling students into class ${classId}:`, error);
+    return {
+      success: false,
+      error: error.response?.data?.detail || error.response?.data?.error || error.message,
+      data: error.response?.data,
+      status: error.response?.status,
+    };
+  }
+};
+
+/**
+ * Giáo viên: Lấy ma trận tiến độ (học viên × bài học) của lớp
+ * GET /api/classes/{classId}/progress_matrix/
+ * Response: { lessons: [...], students: [{ student_id, bitmap: '1010' }] }
+ * bitmap[i] === '1' nghĩa là học viên đã hoàn thành lessons[i]
+ */
+export const getClassProgressMatrix = async (classId) => {
+  try {
+    const response = await axiosInstance.get(`/classes/${classId}/progress_matrix/`);
+    return response.data;
+  } catch (error) {
+    console.error(`Error fetching progress matrix for class ${classId}:`, error);
+    throw error;
+  }
+};
+
 /**
  * Lấy tiến độ học tập của user
  * GET /api/content/progress/
@@ -180,6 +275,70 @@ export const getUserProgress = async (params = {}) => {
   }
 };
 
+/**
+ * Lấy tổng hợp tiến độ theo khóa học con của user
+ * GET /api/content/progress/subcourses/
+ */
+export const getSubcourseProgressSummaries = async () => {
+  try {
+    const response = await axiosInstance.get('/content/progress/subcourses/');
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching subcourse progress:', error);
+    throw error;
+  }
+};
+
+/**
+ * QUIZ API SERVICES
+ * Đề gửi cho học viên không có đáp án -> chấm điểm ở backend
+ */
+
+/**
+ * Bắt đầu (hoặc tiếp tục) lần làm bài, kèm đề đã xáo cho lần đó
+ * POST /api/content/quizzes/{id}/start/
+ * @returns { id, attempt_number, max_attempts, expires_at, remaining_seconds, document }
+ */
+export const startQuizAttempt = async (quizId) => {
+  try {
+    const response = await axiosInstance.post(`/content/quizzes/${quizId}/start/`);
+    return response.data;
+  } catch (error) {
+    console.error(`Error starting quiz ${quizId}:`, error);
+    throw error;
+  }
+};
+
+/**
+ * Lưu tạm câu trả lời của lần làm bài
+ * POST /api/content/quiz-submissions/{id}/autosave/
+ * @param {Array} answers - [{ question_id, selected_option_ids }]
+ */
+export const autosaveQuizAttempt = async (submissionId, answers) => {
+  try {
+    const response = await axiosInstance.post(`/content/quiz-submissions/${submissionId}/autosave/`, { answers });
+    return response.data;
+  } catch (error) {
+    console.error(`Error autosaving quiz attempt ${submissionId}:`, error);
+    throw error;
+  }
+};
+
+/**
+ * Nộp lần làm bài, trả về kết quả đã chấm (score, percentage, is_passed, answers[].is_correct)
+ * POST /api/content/quiz-submissions/{id}/submit/
+ * @param {Array} answers - [{ question_id, selected_option_ids }]
+ */
+export const submitQuizAttempt = async (submissionId, answers) => {
+  try {
+    const response = await axiosInstance.post(`/content/quiz-submissions/${submissionId}/submit/`, { answers });
+    return response.data;
+  } catch (error) {
+    console.error(`Error submitting quiz attempt ${submissionId}:`, error);
+    throw error;
+  }
+};
+
 /**
  * AUTH API SERVICES
  */
@@ -198,6 +357,20 @@ export const getCurrentProfile = async () => {
   }
 };
 
+/**
+ * Cache phía client cho dữ liệu phân quyền (theo access token)
+ * Tránh gọi lại các endpoint quyền truy cập ở mỗi lần chuyển trang
+ */
+const ACCESS_CACHE_TTL = 60 * 1000;
+const accessCache = new Map();
+
+const cachedAccessGet = (url, params = {}) => {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : '';
+  return memoizedGet(accessCache, ACCESS_CACHE_TTL, url, params, token);
+};
+
+export const clearAccessCache = () => accessCache.clear();
+
 /**
  * Lấy danh sách quyền truy cập của user (Assigned Modules)
  * GET /api/auth/assignments/
@@ -205,8 +378,7 @@ export const getCurrentProfile = async () => {
  */
 export const getAssignedModules = async (params = {}) => {
   try {
-    const response = await axiosInstance.get('/auth/assignments/', { params });
-    return response.data;
+    return await cachedAccessGet('/auth/assignments/', params);
   } catch (error) {
     console.error('Error fetching assigned modules:', error);
     throw error;
@@ -219,8 +391,7 @@ export const getAssignedModules = async (params = {}) => {
  */
 export const getMyPrograms = async () => {
   try {
-    const response = await axiosInstance.get('/auth/assignments/my_programs/');
-    return response.data;
+    return await cachedAccessGet('/auth/assignments/my_programs/');
   } catch (error) {
     console.error('Error fetching my programs:', error);
     throw error;
@@ -234,8 +405,7 @@ export const getMyPrograms = async () => {
  */
 export const getMySubcourses = async (params = {}) => {
   try {
-    const response = await axiosInstance.get('/auth/assignments/my_subcourses/', { params });
-    return response.data;
+    return await cachedAccessGet('/auth/assignments/my_subcourses/', params);
   } catch (error) {
     console.error('Error fetching my subcourses:', error);
     throw error;
@@ -284,6 +454,7 @@ export const logout = () => {
   // Import authHelpers từ axios.js
   const { authHelpers } = require('@/lib/axios');
   authHelpers.clearTokens();
+  clearAccessCache();
   
   // Redirect về login page
   if (typeof window !== 'undefined') {
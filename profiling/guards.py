@@ -0,0 +1,70 @@
+"""
+Guard phát hiện lazy query trong serializer
+- Các field tính từ dữ liệu đã prefetch (vd: đếm số objectives) không được chạm DB
+- Bật guard (settings.PROFILING['GUARD_SERIALIZER_QUERIES']) -> field chạy query sẽ raise LazyQueryError
+- Tắt guard (production): field vẫn chạy bình thường, chỉ tốn thêm query
+
+Dùng:
+    objective_count = GuardedMethodField()
+
+    def get_objective_count(self, obj):
+        return prefetched_count(obj, 'objectives')
+"""
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+
+class LazyQueryError(Exception):
+    """Serializer field chạy SQL query trong khi dữ liệu lẽ ra đã được prefetch"""
+
+
+def guard_enabled():
+    return getattr(settings, 'PROFILING', {}).get('GUARD_SERIALIZER_QUERIES', False)
+
+
+class _RaiseOnQuery:
+    """execute_wrapper: chặn mọi query, báo rõ field gây ra"""
+
+    def __init__(self, label):
+        self.label = label
+
+    def __call__(self, execute, sql, params, many, context):
+        raise LazyQueryError(
+            f'{self.label} chạy query ngoài prefetch: {sql[:200]} '
+            f'(thêm prefetch_related/annotate vào queryset của view)'
+        )
+
+
+@contextmanager
+def forbid_queries(label):
+    """Trong khối with, mọi SQL query raise LazyQueryError (no-op khi guard tắt)"""
+    if not guard_enabled():
+        yield
+        return
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(_RaiseOnQuery(label)))
+        yield
+
+
+class GuardedMethodField(serializers.SerializerMethodField):
+    """SerializerMethodField không được phép chạy query khi guard bật"""
+
+    def to_representation(self, value):
+        label = f'{type(self.parent).__name__}.{self.field_name}'
+        with forbid_queries(label):
+            return super().to_representation(value)
+
+
+def prefetched_count(obj, relation):
+    """
+    Số phần tử của relation, ưu tiên cache prefetch_related (không query)
+    Chưa prefetch -> fallback COUNT(*) (bị guard chặn khi bật)
+    """
+    cache = getattr(obj, '_prefetched_objects_cache', {})
+    if relation in cache:
+        return len(cache[relation])
+    return getattr(obj, relation).count()
@@ -0,0 +1,169 @@
+"""
+ProfilingMiddleware - Đo chi phí của từng request theo endpoint (ViewSet.action)
+- Số SQL query + tổng thời gian SQL (qua connection.execute_wrapper, không cần DEBUG)
+- Thời gian render response (serialize JSON), tổng thời gian, kích thước response
+- Response stream (StreamingHttpResponse): đo tiếp cho tới khi đọc hết stream (query trong lúc stream vẫn được đếm)
+- Ghi vào profiling.stats, trả header X-Query-Count / Server-Timing khi bật RESPONSE_HEADER
+- Kiểm tra query budget khai báo trên ViewSet (query_budgets) hoặc settings.PROFILING['QUERY_BUDGETS']
+
+Cấu hình (settings.PROFILING):
+    ENABLED: bật/tắt middleware
+    RESPONSE_HEADER: thêm header vào response
+    STRICT_BUDGETS: vượt budget -> raise QueryBudgetExceeded (dùng khi chạy test)
+    QUERY_BUDGETS: {'LessonDetailViewSet.retrieve': 20, ...} (ghi đè budget trên ViewSet)
+    GUARD_SERIALIZER_QUERIES: chặn lazy query trong serializer field (xem profiling/guards.py)
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse
+
+from . import stats
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Endpoint chạy nhiều query hơn budget đã khai báo"""
+
+
+def get_config():
+    return getattr(settings, 'PROFILING', {})
+
+
+class _QueryCounter:
+    """execute_wrapper: đếm số query và cộng dồn thời gian SQL"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def resolve_endpoint(request, view_func):
+    """
+    Tên endpoint dạng 'ViewSetClass.action' (vd: LessonDetailViewSet.retrieve)
+    Trả về (endpoint, view_class hoặc None, action hoặc None)
+    """
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{getattr(view_func, "__name__", "view")}', None, None
+
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(request.method.lower()) or request.method.lower()
+    return f'{view_class.__name__}.{action}', view_class, action
+
+
+def get_query_budget(endpoint, view_class, action):
+    budgets = get_config().get('QUERY_BUDGETS', {})
+    if endpoint in budgets:
+        return budgets[endpoint]
+    view_budgets = getattr(view_class, 'query_budgets', None) or {}
+    return view_budgets.get(action)
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_config()
+        if not config.get('ENABLED'):
+            return self.get_response(request)
+
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        endpoint = getattr(request, '_profiling_endpoint', None)
+        if endpoint is None:
+            # Không resolve được view (404, static...)
+            return response
+
+        if response.streaming and not response.is_async and not isinstance(response, FileResponse):
+            # Body (và query của nó) được tạo khi server đọc stream, header đã gửi đi trước đó
+            response.streaming_content = self._profile_stream(
+                request, endpoint, response.streaming_content, counter, start
+            )
+            return response
+
+        render_start = getattr(request, '_profiling_render_start', None)
+        render_end = getattr(request, '_profiling_render_end', None)
+        sample = {
+            'queries': counter.count,
+            'sql_ms': counter.duration * 1000,
+            'render_ms': (render_end - render_start) * 1000 if render_start and render_end else 0.0,
+            'total_ms': total * 1000,
+            'bytes': 0 if response.streaming else len(response.content),
+        }
+        self._record(request, endpoint, sample)
+
+        if config.get('RESPONSE_HEADER', True):
+            response['X-Query-Count'] = str(sample['queries'])
+            response['Server-Timing'] = (
+                f"sql;dur={sample['sql_ms']:.2f}, "
+                f"render;dur={sample['render_ms']:.2f}, "
+                f"total;dur={sample['total_ms']:.2f}"
+            )
+        return response
+
+    def _profile_stream(self, request, endpoint, content, counter, start):
+        size = 0
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        self._record(request, endpoint, {
+            'queries': counter.count,
+            'sql_ms': counter.duration * 1000,
+            'render_ms': 0.0,
+            'total_ms': (time.perf_counter() - start) * 1000,
+            'bytes': size,
+        })
+
+    def _record(self, request, endpoint, sample):
+        budget = request._profiling_budget
+        stats.record(endpoint, sample, budget)
+
+        if budget is not None and sample['queries'] > budget:
+            message = f'{endpoint}: {sample["queries"]} queries (budget {budget}) - {request.path}'
+            if get_config().get('STRICT_BUDGETS'):
+                raise QueryBudgetExceeded(message)
+            logger.warning('Vượt query budget %s', message)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not get_config().get('ENABLED'):
+            return None
+        endpoint, view_class, action = resolve_endpoint(request, view_func)
+        request._profiling_endpoint = endpoint
+        request._profiling_budget = get_query_budget(endpoint, view_class, action)
+        return None
+
+    def process_template_response(self, request, response):
+        # DRF Response được render sau bước này -> đo thời gian serialize JSON
+        if get_config().get('ENABLED'):
+            request._profiling_render_start = time.perf_counter()
+
+            def _render_done(rendered_response):
+                request._profiling_render_end = time.perf_counter()
+
+            response.add_post_render_callback(_render_done)
+        return response
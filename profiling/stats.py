@@ -0,0 +1,67 @@
+"""
+Bộ đếm thống kê hiệu năng theo endpoint (ViewSet.action)
+Lưu trong bộ nhớ của từng process (mỗi worker có số liệu riêng)
+"""
+import threading
+
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def record(endpoint, sample, budget=None):
+    """Cộng dồn 1 mẫu đo (dict từ ProfilingMiddleware) vào thống kê của endpoint"""
+    with _lock:
+        entry = _stats.setdefault(endpoint, {
+            'requests': 0,
+            'queries_total': 0,
+            'queries_max': 0,
+            'sql_ms_total': 0.0,
+            'render_ms_total': 0.0,
+            'total_ms_total': 0.0,
+            'total_ms_max': 0.0,
+            'bytes_total': 0,
+            'query_budget': budget,
+            'budget_violations': 0,
+        })
+        entry['requests'] += 1
+        entry['queries_total'] += sample['queries']
+        entry['queries_max'] = max(entry['queries_max'], sample['queries'])
+        entry['sql_ms_total'] += sample['sql_ms']
+        entry['render_ms_total'] += sample['render_ms']
+        entry['total_ms_total'] += sample['total_ms']
+        entry['total_ms_max'] = max(entry['total_ms_max'], sample['total_ms'])
+        entry['bytes_total'] += sample['bytes']
+        entry['query_budget'] = budget
+        if budget is not None and sample['queries'] > budget:
+            entry['budget_violations'] += 1
+
+
+def snapshot():
+    """Thống kê hiện tại kèm giá trị trung bình, sắp xếp theo số query trung bình giảm dần"""
+    with _lock:
+        items = [(endpoint, dict(entry)) for endpoint, entry in _stats.items()]
+
+    result = []
+    for endpoint, entry in items:
+        requests = entry['requests'] or 1
+        result.append({
+            'endpoint': endpoint,
+            'requests': entry['requests'],
+            'queries_avg': round(entry['queries_total'] / requests, 2),
+            'queries_max': entry['queries_max'],
+            'query_budget': entry['query_budget'],
+            'budget_violations': entry['budget_violations'],
+            'sql_ms_avg': round(entry['sql_ms_total'] / requests, 2),
+            'render_ms_avg': round(entry['render_ms_total'] / requests, 2),
+            'total_ms_avg': round(entry['total_ms_total'] / requests, 2),
+            'total_ms_max': round(entry['total_ms_max'], 2),
+            'bytes_avg': int(entry['bytes_total'] / requests),
+        })
+    result.sort(key=lambda item: item['queries_avg'], reverse=True)
+    return result
+
+
+def reset():
+    with _lock:
+        _stats.clear()
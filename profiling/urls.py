@@ -0,0 +1,10 @@
+"""
+URL Configuration cho Profiling (nội bộ)
+"""
+from django.urls import path
+
+from .views import profiling_stats
+
+urlpatterns = [
+    path('', profiling_stats, name='profiling-stats'),
+]
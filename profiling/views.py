@@ -0,0 +1,27 @@
+"""
+Endpoint nội bộ xem thống kê hiệu năng (chỉ admin)
+"""
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from . import stats
+from .middleware import get_config
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def profiling_stats(request):
+    """
+    GET /api/internal/profiling/ - Thống kê theo endpoint (process hiện tại)
+    DELETE /api/internal/profiling/ - Xóa thống kê
+    """
+    if request.method == 'DELETE':
+        stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    return Response({
+        'enabled': bool(get_config().get('ENABLED')),
+        'endpoints': stats.snapshot(),
+    })
@@ -34,6 +34,8 @@ INSTALLED_APPS = [
     'content.apps.ContentConfig',
     'user_auth.apps.UserAuthConfig',
     'classes.apps.ClassesConfig',
+    'profiling.apps.ProfilingConfig',
+    'benchmarks.apps.BenchmarksConfig',
     
     # Third party
     'rest_framework',
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.compression.CompressionMiddleware',  # brotli / gzip, đặt trước mọi middleware đọc/ghi body
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'profiling.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'urls'
@@ -92,6 +96,45 @@ DATABASES = {
 }
 
 
+# Cache
+# Dùng Redis khi có REDIS_URL (chia sẻ giữa các worker), mặc định LocMemCache cho dev
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'letcode-default',
+        }
+    }
+
+
+# Profiling: đo số query / thời gian SQL / thời gian render theo endpoint
+# Xem thống kê: GET /api/internal/profiling/ (admin)
+# Budget mặc định khai báo trên ViewSet (query_budgets), có thể ghi đè ở QUERY_BUDGETS
+PROFILING = {
+    'ENABLED': os.getenv('PROFILING_ENABLED', str(DEBUG)) == 'True',
+    'RESPONSE_HEADER': True,
+    'STRICT_BUDGETS': os.getenv('PROFILING_STRICT_BUDGETS', 'False') == 'True',
+    'QUERY_BUDGETS': {},
+    # Serializer field đếm từ prefetch mà chạy query -> raise LazyQueryError (profiling/guards.py)
+    'GUARD_SERIALIZER_QUERIES': os.getenv('PROFILING_GUARD_QUERIES', str(DEBUG)) == 'True',
+}
+
+
+# Snapshot catalog tĩnh cho frontend (content/catalog_snapshot.py)
+# Dựng lại: python manage.py build_catalog_snapshot
+CATALOG_SNAPSHOT = {
+    'ROOT': os.getenv('CATALOG_SNAPSHOT_ROOT', str(BASE_DIR / 'catalog_snapshots')),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 
@@ -148,8 +191,12 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     'PAGE_SIZE_QUERY_PARAM': 'page_size',  # Allow client to override page size
     'MAX_PAGE_SIZE': 100,  # Maximum allowed page size
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',  # orjson nếu có cài, output giống JSONRenderer
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user_auth.authentication.ProfileJWTAuthentication',  # User + profile trong 1 query
         'rest_framework.authentication.SessionAuthentication',
     ],
 }
@@ -163,4 +210,5 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': False,
     'UPDATE_LAST_LOGIN': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'user_auth.serializers.RoleTokenObtainPairSerializer',  # Thêm claim role
 }
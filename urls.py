@@ -16,6 +16,7 @@ urlpatterns = [
     path('api/content/', include('content.urls')),
     path('api/auth/', include('user_auth.urls')),
     path('api/', include('classes.urls')),  # Classes management
+    path('api/internal/profiling/', include('profiling.urls')),  # Thống kê hiệu năng (admin)
     
     # JWT Authentication
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -43,6 +44,7 @@ urlpatterns = [
 # /api/content/lessons/{id}/ - Chi tiết bài học (requires auth)
 # /api/content/lessons/{id}/mark_complete/ - Đánh dấu hoàn thành bài học
 # /api/content/progress/ - Tiến độ học tập của user
+# /api/content/progress/subcourses/ - Tổng hợp tiến độ theo khóa học con
 #
 # AUTH API:
 # /api/auth/profile/ - Thông tin profile
@@ -54,7 +56,8 @@ urlpatterns = [
 # /api/classes/ - Danh sách lớp học (filtered by role)
 # /api/classes/{id}/ - Chi tiết lớp
 # /api/classes/{id}/students/ - Danh sách học viên
-# /api/classes/{id}/progress/ - Tiến độ học viên trong lớp
+# /api/classes/{id}/student_progress/ - Tiến độ học viên trong lớp
+# /api/classes/{id}/progress_matrix/ - Ma trận tiến độ (học viên × bài học)
 # /api/classes/{id}/enroll_student/ - Ghi danh học viên (admin/teacher)
 # /api/enrollments/ - Danh sách ghi danh
 # /api/progress/ - Tiến độ học tập
@@ -62,6 +65,9 @@ urlpatterns = [
 # /api/auth/me/ - Thông tin user đầy đủ
 # /api/auth/me/info/ - GET user info
 #
+# INTERNAL:
+# /api/internal/profiling/ - Thống kê query/latency theo endpoint (admin)
+#
 # DRF AUTH:
 # /api-auth/login/ - Login trong Browsable API
 # /api-auth/logout/ - Logout trong Browsable API
@@ -7,9 +7,10 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from django.utils.html import format_html
 from django.urls import reverse
-from django.utils import timezone
 
-from .models import UserProfile, AuthAssignment
+from . import entitlements
+from .expiry import expire_assignments
+from .models import UserProfile, AuthAssignment, AssignmentExpiryLog
 
 
 # ============================================================================
@@ -308,7 +309,9 @@ class AuthAssignmentAdmin(admin.ModelAdmin):
     
     def activate_assignments(self, request, queryset):
         """Kích hoạt các phân quyền đã chọn"""
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(status='ACTIVE')
+        entitlements.invalidate_users(user_ids)
         self.message_user(
             request,
             f'✅ Đã kích hoạt {updated} phân quyền.',
@@ -318,7 +321,9 @@ class AuthAssignmentAdmin(admin.ModelAdmin):
     
     def revoke_assignments(self, request, queryset):
         """Thu hồi các phân quyền đã chọn"""
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(status='REVOKED')
+        entitlements.invalidate_users(user_ids)
         self.message_user(
             request,
             f'⛔ Đã thu hồi {updated} phân quyền.',
@@ -327,16 +332,9 @@ class AuthAssignmentAdmin(admin.ModelAdmin):
     revoke_assignments.short_description = '⛔ Thu hồi các phân quyền đã chọn'
     
     def check_expired(self, request, queryset):
-        """Kiểm tra và cập nhật các phân quyền hết hạn"""
-        now = timezone.now()
-        expired_count = 0
-        
-        for assignment in queryset:
-            if assignment.valid_until and now > assignment.valid_until:
-                if assignment.status == 'ACTIVE':
-                    assignment.status = 'EXPIRED'
-                    assignment.save()
-                    expired_count += 1
+        """Kiểm tra và cập nhật các phân quyền hết hạn (cùng đường xử lý với lệnh expire_assignments)"""
+        log = expire_assignments(queryset, source='ADMIN', triggered_by=request.user)
+        expired_count = log.expired_count
         
         if expired_count > 0:
             self.message_user(
@@ -351,3 +349,23 @@ class AuthAssignmentAdmin(admin.ModelAdmin):
                 level='SUCCESS'
             )
     check_expired.short_description = '⏰ Kiểm tra phân quyền hết hạn'
+
+
+@admin.register(AssignmentExpiryLog)
+class AssignmentExpiryLogAdmin(admin.ModelAdmin):
+    """
+    Admin cho AssignmentExpiryLog (Nhật ký hết hạn phân quyền)
+    Chỉ xem - được ghi bởi python manage.py expire_assignments và action Admin
+    """
+    list_display = ['created_at', 'source', 'triggered_by', 'expired_count', 'cutoff']
+    list_filter = ['source', 'created_at']
+    list_select_related = ['triggered_by']
+    readonly_fields = [
+        'source', 'triggered_by', 'expired_count', 'assignment_ids', 'user_ids', 'cutoff', 'created_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
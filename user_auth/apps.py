@@ -5,3 +5,7 @@ class UserAuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_auth'
     verbose_name = 'Quản lý Người dùng & Phân quyền'
+
+    def ready(self):
+        # Đăng ký signals (vô hiệu hóa cache quyền truy cập)
+        from . import signals  # noqa: F401
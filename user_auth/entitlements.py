@@ -0,0 +1,139 @@
+"""
+Entitlement Resolver - Tính quyền truy cập thực tế của user
+- Gom các AuthAssignment ACTIVE của user thành danh sách grant (program + subcourse ids)
+- Grant cấp Program được mở rộng thành toàn bộ subcourses của program
+- valid_from / valid_until được kiểm tra lúc ĐỌC; status được đồng bộ bởi python manage.py expire_assignments
+- Kết quả được cache theo user, vô hiệu hóa khi AuthAssignment / UserProfile / Subcourse thay đổi
+"""
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AuthAssignment
+from .roles import get_role
+
+
+KEY_PREFIX = 'entitlements'
+CACHE_TIMEOUT = 60 * 15
+
+# Vai trò được xem mọi nội dung (không cần phân quyền)
+FULL_ACCESS_ROLES = ('ADMIN', 'TEACHER')
+
+
+def valid_assignment_q(now=None, prefix=''):
+    """Điều kiện assignment còn hiệu lực tại thời điểm now"""
+    now = now or timezone.now()
+    return (
+        Q(**{f'{prefix}status': 'ACTIVE'})
+        & Q(**{f'{prefix}valid_from__lte': now})
+        & (Q(**{f'{prefix}valid_until__isnull': True}) | Q(**{f'{prefix}valid_until__gte': now}))
+    )
+
+
+def _generation_key():
+    return f'{KEY_PREFIX}:generation'
+
+
+def _get_generation():
+    return cache.get_or_set(_generation_key(), 1, None)
+
+
+def _user_key(user_id, generation):
+    return f'{KEY_PREFIX}:{generation}:user:{user_id}'
+
+
+def _load(user_id, role):
+    """Tính grants của user từ DB (tối đa 2 queries)"""
+
+    assignments = list(AuthAssignment.objects.filter(
+        user_id=user_id, status='ACTIVE'
+    ).values_list('program_id', 'subcourse_id', 'subcourse__program_id', 'valid_from', 'valid_until'))
+
+    program_grant_ids = {program_id for program_id, _, _, _, _ in assignments if program_id}
+    program_subcourses = {}
+    if program_grant_ids:
+        from content.models import Subcourse
+        for subcourse_id, program_id in Subcourse.objects.filter(
+            program_id__in=program_grant_ids
+        ).values_list('id', 'program_id'):
+            program_subcourses.setdefault(program_id, []).append(subcourse_id)
+
+    grants = []
+    for program_id, subcourse_id, subcourse_program_id, valid_from, valid_until in assignments:
+        if program_id:
+            grants.append((program_id, tuple(program_subcourses.get(program_id, ())), valid_from, valid_until))
+        elif subcourse_id:
+            grants.append((subcourse_program_id, (subcourse_id,), valid_from, valid_until))
+
+    return {
+        'full_access': role in FULL_ACCESS_ROLES,
+        'grants': grants,
+    }
+
+
+class Entitlements:
+    """Tập program/subcourse ids mà user được phép truy cập tại thời điểm now"""
+
+    def __init__(self, data, full_access=False, now=None):
+        self.full_access = full_access or data['full_access']
+        self.program_ids = set()
+        self.subcourse_ids = set()
+        self._subcourses_by_program = {}
+
+        now = now or timezone.now()
+        for program_id, subcourse_ids, valid_from, valid_until in data['grants']:
+            if valid_from and valid_from > now:
+                continue
+            if valid_until and now > valid_until:
+                continue
+            self.program_ids.add(program_id)
+            self.subcourse_ids.update(subcourse_ids)
+            self._subcourses_by_program.setdefault(program_id, set()).update(subcourse_ids)
+
+    def subcourse_ids_for_program(self, program_id):
+        return set(self._subcourses_by_program.get(program_id, ()))
+
+    def can_access_subcourse(self, subcourse_id):
+        return self.full_access or subcourse_id in self.subcourse_ids
+
+    def can_access_program(self, program_id):
+        return self.full_access or program_id in self.program_ids
+
+
+def get_entitlements(user):
+    """
+    Lấy Entitlements của user (cache hit = 2 cache reads, 0 query)
+    Staff/superuser luôn có toàn quyền
+    Ghi nhớ trên object user -> gọi nhiều lần trong 1 request chỉ đọc cache 1 lần
+    """
+    entitlements = getattr(user, '_entitlements', None)
+    if entitlements is not None:
+        return entitlements
+
+    full_access = user.is_staff or user.is_superuser
+    key = _user_key(user.id, _get_generation())
+    data = cache.get(key)
+    if data is None:
+        data = _load(user.id, get_role(user))
+        cache.set(key, data, CACHE_TIMEOUT)
+    user._entitlements = Entitlements(data, full_access=full_access)
+    return user._entitlements
+
+
+def invalidate_user(user_id):
+    """Xóa cache quyền của 1 user"""
+    cache.delete(_user_key(user_id, _get_generation()))
+
+
+def invalidate_users(user_ids):
+    """Xóa cache quyền của nhiều user (sau khi cập nhật hàng loạt bằng queryset.update())"""
+    generation = _get_generation()
+    cache.delete_many([_user_key(user_id, generation) for user_id in user_ids])
+
+
+def invalidate_all():
+    """Vô hiệu hóa cache quyền của mọi user (khi cấu trúc Program -> Subcourse thay đổi)"""
+    try:
+        cache.incr(_generation_key())
+    except ValueError:
+        cache.set(_generation_key(), 2, None)
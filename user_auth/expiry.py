@@ -0,0 +1,55 @@
+"""
+Quét hết hạn phân quyền (AuthAssignment ACTIVE có valid_until đã qua -> EXPIRED)
+- 1 SELECT ... FOR UPDATE lấy id + user_id, UPDATE theo lô id (không save() từng dòng)
+- Ghi 1 dòng AssignmentExpiryLog cho mỗi lần quét có thay đổi
+- Vô hiệu hóa cache entitlements của các user bị ảnh hưởng sau khi commit
+Dùng chung cho lệnh định kỳ (python manage.py expire_assignments) và action Admin
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import entitlements
+from .models import AuthAssignment, AssignmentExpiryLog
+
+
+UPDATE_BATCH_SIZE = 1000
+
+
+def due_assignments(now=None):
+    """AuthAssignment còn ACTIVE nhưng đã quá valid_until"""
+    return AuthAssignment.objects.filter(status='ACTIVE', valid_until__lt=now or timezone.now())
+
+
+def expire_assignments(queryset=None, now=None, source='COMMAND', triggered_by=None, dry_run=False):
+    """
+    Chuyển các phân quyền đến hạn sang EXPIRED
+    queryset: giới hạn trong các phân quyền này (vd: dòng được chọn trong Admin)
+    Trả về AssignmentExpiryLog (chưa lưu khi dry_run hoặc không có gì thay đổi)
+    """
+    now = now or timezone.now()
+    due = due_assignments(now)
+    if queryset is not None:
+        due = due.filter(pk__in=list(queryset.values_list('pk', flat=True)))
+
+    with transaction.atomic():
+        rows = list(due.select_for_update().order_by('pk').values_list('pk', 'user_id'))
+        assignment_ids = [pk for pk, _ in rows]
+        user_ids = sorted({user_id for _, user_id in rows})
+        log = AssignmentExpiryLog(
+            source=source,
+            triggered_by=triggered_by,
+            expired_count=len(assignment_ids),
+            assignment_ids=assignment_ids,
+            user_ids=user_ids,
+            cutoff=now,
+        )
+        if dry_run or not assignment_ids:
+            return log
+
+        for start in range(0, len(assignment_ids), UPDATE_BATCH_SIZE):
+            AuthAssignment.objects.filter(
+                pk__in=assignment_ids[start:start + UPDATE_BATCH_SIZE], status='ACTIVE'
+            ).update(status='EXPIRED', updated_at=now)
+        log.save()
+        transaction.on_commit(lambda: entitlements.invalidate_users(user_ids))
+    return log
@@ -0,0 +1,34 @@
+"""
+Chuyển các phân quyền (AuthAssignment) đã quá valid_until sang EXPIRED
+Chạy định kỳ để các filter status='ACTIVE' luôn đúng, vd cron mỗi 15 phút:
+    */15 * * * * cd /path/to/project && python manage.py expire_assignments
+
+Sử dụng:
+    python manage.py expire_assignments
+    python manage.py expire_assignments --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from user_auth.expiry import expire_assignments
+
+
+class Command(BaseCommand):
+    help = 'Đánh dấu EXPIRED các phân quyền đã hết hạn (1 UPDATE, ghi nhật ký, xóa cache quyền)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Chỉ liệt kê số phân quyền sẽ hết hạn, không ghi gì vào DB',
+        )
+
+    def handle(self, *args, **options):
+        log = expire_assignments(source='COMMAND', dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(
+                f"{log.expired_count} phân quyền sẽ hết hạn ({len(log.user_ids)} người dùng)"
+            )
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã chuyển {log.expired_count} phân quyền sang EXPIRED ({len(log.user_ids)} người dùng)"
+        ))
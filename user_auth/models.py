@@ -187,3 +187,51 @@ class AuthAssignment(models.Model):
         if self.valid_until and timezone.now() > self.valid_until:
             self.status = 'EXPIRED'
         super().save(*args, **kwargs)
+
+
+class AssignmentExpiryLog(models.Model):
+    """
+    Nhật ký mỗi lần quét hết hạn phân quyền (user_auth/expiry.py)
+    Ghi lại các AuthAssignment đã chuyển ACTIVE -> EXPIRED
+    """
+    SOURCE_CHOICES = [
+        ('COMMAND', 'Lệnh định kỳ'),
+        ('ADMIN', 'Thao tác Admin'),
+    ]
+
+    source = models.CharField(
+        max_length=20,
+        choices=SOURCE_CHOICES,
+        default='COMMAND',
+        verbose_name='Nguồn'
+    )
+    triggered_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='assignment_expiry_logs',
+        verbose_name='Người thực hiện'
+    )
+    expired_count = models.PositiveIntegerField(default=0, verbose_name='Số phân quyền hết hạn')
+    assignment_ids = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='ID phân quyền đã hết hạn'
+    )
+    user_ids = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='ID người dùng bị ảnh hưởng'
+    )
+    cutoff = models.DateTimeField(verbose_name='Thời điểm xét hết hạn')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Ngày tạo')
+
+    class Meta:
+        db_table = 'auth_assignment_expiry_log'
+        verbose_name = 'Nhật ký hết hạn phân quyền'
+        verbose_name_plural = 'Nhật ký hết hạn phân quyền'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.created_at:%d/%m/%Y %H:%M} - {self.expired_count} phân quyền hết hạn ({self.get_source_display()})"
@@ -0,0 +1,35 @@
+"""
+Vai trò người dùng (UserProfile.role) trong 1 request
+- User nạp bởi ProfileJWTAuthentication đã kèm profile (select_related) -> 0 query
+- User nạp cách khác (session / admin) -> 1 query lần đầu, profile (hoặc "không có profile")
+  được Django ghi nhớ trên chính object user cho các lần đọc sau
+"""
+from .models import UserProfile
+
+
+# Vai trò được ghi danh / cập nhật tiến độ học viên trong lớp
+CLASS_MANAGER_ROLES = ('ADMIN', 'TEACHER')
+
+
+def get_role(user):
+    """Role của user (None nếu chưa đăng nhập hoặc chưa có profile)"""
+    if user is None or not user.is_authenticated:
+        return None
+    try:
+        return user.profile.role
+    except UserProfile.DoesNotExist:
+        return None
+
+
+def has_role(user, *roles):
+    return get_role(user) in roles
+
+
+def can_manage_classes(user):
+    """Staff hoặc ADMIN / TEACHER"""
+    return user.is_staff or has_role(user, *CLASS_MANAGER_ROLES)
+
+
+def can_view_quiz_answers(user):
+    """Staff hoặc ADMIN / TEACHER: xem đề quiz kèm đáp án và giải thích"""
+    return user.is_staff or has_role(user, *CLASS_MANAGER_ROLES)
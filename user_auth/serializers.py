@@ -3,8 +3,26 @@ Serializers cho ứng dụng User Auth
 Quản lý UserProfile và AuthAssignment (Phân quyền)
 """
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.models import User
 from .models import UserProfile, AuthAssignment
+from .roles import get_role
+
+
+ROLE_CLAIM = 'role'
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    POST /api/token/ - như SimpleJWT, access / refresh token có thêm claim role
+    (frontend biết role mà không cần gọi /api/me/; server không tin claim này)
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ROLE_CLAIM] = get_role(user)
+        return token
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
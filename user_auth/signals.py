@@ -0,0 +1,27 @@
+"""
+Signals cho ứng dụng User Auth
+Vô hiệu hóa cache quyền truy cập (entitlements) khi dữ liệu phân quyền thay đổi
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from . import entitlements
+from .models import UserProfile, AuthAssignment
+
+
+def invalidate_user_entitlements(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: entitlements.invalidate_user(user_id))
+
+
+def invalidate_all_entitlements(sender, instance, **kwargs):
+    # Grant cấp Program được mở rộng thành danh sách subcourses -> thêm/xóa subcourse làm cache cũ
+    transaction.on_commit(entitlements.invalidate_all)
+
+
+for _model in (AuthAssignment, UserProfile):
+    post_save.connect(invalidate_user_entitlements, sender=_model)
+    post_delete.connect(invalidate_user_entitlements, sender=_model)
+
+post_save.connect(invalidate_all_entitlements, sender='content.Subcourse')
+post_delete.connect(invalidate_all_entitlements, sender='content.Subcourse')
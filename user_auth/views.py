@@ -9,6 +9,7 @@ from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.models import User
 
+from .entitlements import get_entitlements, valid_assignment_q
 from .models import UserProfile, AuthAssignment
 from .serializers import (
     UserProfileSerializer,
@@ -129,7 +130,7 @@ class AuthAssignmentViewSet(viewsets.ReadOnlyModelViewSet):
         """
         LOGIC QUAN TRỌNG:
         - Chỉ trả về assignments của user hiện tại (self.request.user)
-        - Chỉ lấy các assignment có status='ACTIVE'
+        - Chỉ lấy các assignment ACTIVE và đang trong thời gian hiệu lực
         - Sắp xếp theo created_at giảm dần (mới nhất trước)
         - Tối ưu với select_related để giảm queries
         """
@@ -140,11 +141,12 @@ class AuthAssignmentViewSet(viewsets.ReadOnlyModelViewSet):
             return AuthAssignment.objects.none()
         
         return AuthAssignment.objects.filter(
-            user=user,
-            status='ACTIVE'
+            valid_assignment_q(),
+            user=user
         ).select_related(
             'program',
             'subcourse',
+            'subcourse__program',
             'user__profile',
             'assigned_by'
         ).order_by('-created_at')
@@ -164,21 +166,7 @@ class AuthAssignmentViewSet(viewsets.ReadOnlyModelViewSet):
         Custom action: Lấy danh sách Programs mà user có quyền truy cập
         GET /api/assignments/my_programs/
         """
-        user = request.user
-        
-        # Lấy các assignments active của user
-        assignments = AuthAssignment.objects.filter(
-            user=user,
-            status='ACTIVE'
-        ).select_related('program', 'subcourse')
-        
-        # Tập hợp các program IDs
-        program_ids = set()
-        for assignment in assignments:
-            if assignment.program:
-                program_ids.add(assignment.program.id)
-            elif assignment.subcourse:
-                program_ids.add(assignment.subcourse.program.id)
+        program_ids = get_entitlements(request.user).program_ids
         
         return Response({
             'program_ids': list(program_ids),
@@ -192,36 +180,16 @@ class AuthAssignmentViewSet(viewsets.ReadOnlyModelViewSet):
         GET /api/assignments/my_subcourses/
         GET /api/assignments/my_subcourses/?program_id=1  # Filter theo program
         """
-        user = request.user
+        entitlements = get_entitlements(request.user)
         program_id = request.query_params.get('program_id')
         
-        # Lấy các assignments active của user
-        assignments = AuthAssignment.objects.filter(
-            user=user,
-            status='ACTIVE'
-        ).select_related('program', 'subcourse').prefetch_related('program__subcourses')
-        
-        # Tập hợp các subcourse IDs
-        subcourse_ids = set()
-        for assignment in assignments:
-            if assignment.subcourse:
-                # Gán trực tiếp 1 subcourse
-                if program_id:
-                    # Filter theo program nếu có
-                    if str(assignment.subcourse.program_id) == program_id:
-                        subcourse_ids.add(assignment.subcourse.id)
-                else:
-                    subcourse_ids.add(assignment.subcourse.id)
-            elif assignment.program:
-                # Gán cả program -> có quyền tất cả subcourses
-                if program_id:
-                    # Filter theo program nếu có
-                    if str(assignment.program.id) == program_id:
-                        for subcourse in assignment.program.subcourses.all():
-                            subcourse_ids.add(subcourse.id)
-                else:
-                    for subcourse in assignment.program.subcourses.all():
-                        subcourse_ids.add(subcourse.id)
+        if program_id:
+            try:
+                subcourse_ids = entitlements.subcourse_ids_for_program(int(program_id))
+            except ValueError:
+                subcourse_ids = set()
+        else:
+            subcourse_ids = entitlements.subcourse_ids
         
         return Response({
             'subcourse_ids': list(subcourse_ids),